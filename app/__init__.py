@@ -1,10 +1,89 @@
+import os
 from flask import Flask
 
-def create_app():
+def create_app(config=None):
     app = Flask(__name__)
     app.config['SECRET_KEY'] = 'uma-chave-secreta-muito-segura'  
+    if config:
+        app.config.update(config)
+
+    from .logging_config import configure_logging
+    configure_logging()
+
+    # Perfilamento sob demanda ('?profile=text|store' ou cabeçalho 'X-Profile').
+    app.config.setdefault('PROFILING_ENABLED', os.environ.get('PROFILING_ENABLED', '0') == '1')
+    app.config.setdefault('PROFILE_DIR', None)
+
+    # Limite de memória do cache de relatórios processados (despejo LRU).
+    app.config.setdefault('REPORT_CACHE_MAX_BYTES', 512 * 1024 * 1024)
+
+    # Gravação dos snapshots processados no histórico de taxas (history/).
+    app.config.setdefault('HISTORY_ENABLED', os.environ.get('HISTORY_ENABLED', '1') == '1')
+    # Pasta do histórico (None = REPORTS_HISTORY_DIR ou 'history/' na raiz do projeto).
+    app.config.setdefault('HISTORY_DIR', os.environ.get('REPORTS_HISTORY_DIR'))
+
+    # Precedência entre arquivos na deduplicação do consolidado ('recente' ou 'nome');
+    # DEDUPE_SOURCE_ORDER lista arquivos que vencem sempre, na ordem dada.
+    app.config.setdefault('DEDUPE_PRECEDENCE', os.environ.get('DEDUPE_PRECEDENCE', 'recente'))
+    app.config.setdefault('DEDUPE_SOURCE_ORDER', [])
+
+    # Premissas (% a.a.) de CDI, IPCA e SELIC usadas pelo motor de taxas.
+    app.config.setdefault('RATE_ASSUMPTIONS', {})
+
+    # Apelidos extras de emissores: {id: {"nome": ..., "apelidos": [...], "slug": ...}}.
+    app.config.setdefault('ISSUER_ALIASES', {})
 
     from . import routes
+    from .report_cache import report_cache
+    report_cache.max_bytes = app.config['REPORT_CACHE_MAX_BYTES']
+    # Histórico, premissas, emissores e deduplicação: aplicados aqui e repassados
+    # aos processos auxiliares dos pools (worker_pool).
+    from . import worker_pool
+    worker_pool.apply_settings(worker_pool.settings_from_config(app.config))
     app.register_blueprint(routes.main_bp)
 
+    # Compressão (brotli/gzip) das respostas HTML/JSON acima de COMPRESSION_MIN_SIZE bytes.
+    app.config.setdefault('COMPRESSION_ENABLED', os.environ.get('COMPRESSION_ENABLED', '1') == '1')
+    app.config.setdefault('COMPRESSION_MIN_SIZE', 1024)
+    from . import compression
+    compression.ENABLED = app.config['COMPRESSION_ENABLED']
+    compression.MIN_SIZE = app.config['COMPRESSION_MIN_SIZE']
+    compression.install_compression(app)
+
+    # Processos usados na renderização dos PDFs em lote e no processamento de
+    # uploads com várias planilhas (None = nº de CPUs).
+    app.config.setdefault('BATCH_REPORT_WORKERS', None)
+    app.config.setdefault('UPLOAD_WORKERS', None)
+
+    # Limites de um .zip enviado em '/add-data', conferidos antes de descompactar.
+    app.config.setdefault('UPLOAD_ZIP_MAX_MEMBERS', 200)
+    app.config.setdefault('UPLOAD_ZIP_MAX_MEMBER_BYTES', 100 * 1024 * 1024)
+    app.config.setdefault('UPLOAD_ZIP_MAX_TOTAL_BYTES', 500 * 1024 * 1024)
+    from . import uploads
+    uploads.ZIP_MAX_MEMBERS = app.config['UPLOAD_ZIP_MAX_MEMBERS']
+    uploads.ZIP_MAX_MEMBER_BYTES = app.config['UPLOAD_ZIP_MAX_MEMBER_BYTES']
+    uploads.ZIP_MAX_TOTAL_BYTES = app.config['UPLOAD_ZIP_MAX_TOTAL_BYTES']
+
+    # Observador opcional da pasta 'data' (DATA_WATCH=1): listagem em memória e
+    # reprocessamento automático de planilhas novas/alteradas (intervalo em segundos).
+    # Cada create_app() inicia a sua thread de polling, ou seja, uma por worker do
+    # servidor: todos varrem a pasta e recarregam a planilha alterada na própria
+    # memória. A leitura da planilha em si acontece uma vez só (os demais esperam o
+    # resultado pelo cache_store), mas a varredura e a recarga custam em cada worker.
+    app.config.setdefault('DATA_WATCH', os.environ.get('DATA_WATCH', '0') == '1')
+    app.config.setdefault('DATA_WATCH_INTERVAL', float(os.environ.get('DATA_WATCH_INTERVAL', '5')))
+    # Nunca dentro de um processo auxiliar de pool (ele não serve requisições).
+    in_worker = worker_pool.in_worker_process()
+    if app.config['DATA_WATCH'] and not in_worker:
+        from . import data_watcher
+        data_watcher.start_watcher(routes.get_data_dir(), interval=app.config['DATA_WATCH_INTERVAL'])
+
+    # Pré-carregamento opcional de todos os relatórios ao iniciar (CACHE_WARMUP=1).
+    app.config.setdefault('CACHE_WARMUP', os.environ.get('CACHE_WARMUP', '0') == '1')
+    app.config.setdefault('CACHE_WARMUP_WORKERS', None)
+    if app.config['CACHE_WARMUP'] and not in_worker:
+        from . import warmup
+        warmup.start_warmup(routes.get_data_dir(), routes.get_available_reports(),
+                            max_workers=app.config['CACHE_WARMUP_WORKERS'])
+
     return app
@@ -0,0 +1,149 @@
+"""
+Pipeline em lote pela linha de comando, sem subir o servidor Flask.
+
+    python -m app ingest [--data-dir data] [--workers 4] [--saida consolidado.parquet]
+    python -m app rank   [--relatorio arquivo.xlsx] [filtros...] [--csv ranking.csv]
+    python -m app export [--relatorio arquivo.xlsx] [filtros...] --formato pdf|xlsx -o relatorio.pdf
+
+ingest   processa em paralelo todas as planilhas da pasta e grava o resultado no
+         cache compartilhado (cache/), de onde o servidor e os demais comandos leem;
+         opcionalmente grava também o consolidado em .parquet ou .pkl.
+rank     imprime (ou grava em CSV) o ranking dos melhores ativos.
+export   gera o PDF ou a planilha do ranking, como '/download/<formato>'.
+
+Sem --relatorio, rank e export usam o consolidado de todos os relatórios.
+"""
+import argparse
+import logging
+import os
+import sys
+from concurrent.futures import as_completed
+
+logger = logging.getLogger('app.cli')
+
+def _add_filter_arguments(parser):
+    parser.add_argument('--relatorio', help="Arquivo da pasta data/ (padrão: consolidado).")
+    parser.add_argument('--tipo', choices=['cliente', 'assessor'], default='cliente')
+    parser.add_argument('--anos', type=int, nargs='+')
+    parser.add_argument('--produtos', nargs='+')
+    parser.add_argument('--taxas', nargs='+')
+    parser.add_argument('--emissores', nargs='+')
+    parser.add_argument('--ir', nargs='+')
+    parser.add_argument('--liquidez-diaria', action='store_true')
+    parser.add_argument('--aplicacao-maxima', type=float)
+    parser.add_argument('--ordenacao', choices=['bruta', 'liquida', 'equivalente'], default='bruta')
+    parser.add_argument('--max-por-emissor', type=int)
+
+def _profile_from_args(args):
+    return {
+        'cliente': args.relatorio or 'consolidado', 'relatorio': args.relatorio, 'tipo': args.tipo,
+        'anos': args.anos, 'produtos': args.produtos, 'taxas': args.taxas,
+        'emissores': args.emissores, 'ir': args.ir, 'liquidez_diaria': args.liquidez_diaria,
+        'aplicacao_maxima': args.aplicacao_maxima, 'ordenacao': args.ordenacao,
+        'max_por_emissor': args.max_por_emissor,
+    }
+
+def _ranked(args):
+    from .batch_reports import rank_profiles
+    tasks, errors = rank_profiles([_profile_from_args(args)])
+    if errors:
+        raise SystemExit(f"Erro: {errors[0]}")
+    _, analysis, include_roa = tasks[0]
+    return analysis, include_roa
+
+def cmd_ingest(args):
+    from .warmup import warm_report
+    from .worker_pool import process_pool
+    from .report_cache import get_processed_report
+    from .dedupe import consolidate
+
+    data_dir = os.path.abspath(args.data_dir)
+    reports = sorted(f for f in os.listdir(data_dir) if f.endswith('.xlsx'))
+    if not reports:
+        print(f"Nenhuma planilha .xlsx em {data_dir}.", file=sys.stderr)
+        return 1
+
+    failed = []
+    with process_pool(args.workers) as executor:
+        futures = {executor.submit(warm_report, os.path.join(data_dir, r), r): r for r in reports}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Falha ao processar: {e}", extra={"fields": {"arquivo": futures[future]}})
+                failed.append(futures[future])
+
+    frames = [(os.path.join(data_dir, r), get_processed_report(os.path.join(data_dir, r), key=r))
+              for r in reports if r not in failed]
+    consolidated = consolidate(frames)
+    print(f"{len(reports) - len(failed)} de {len(reports)} planilhas processadas; consolidado com {len(consolidated)} linhas.")
+
+    if args.saida:
+        if args.saida.endswith('.parquet'):
+            consolidated.to_parquet(args.saida, index=False)
+        else:
+            consolidated.to_pickle(args.saida)
+        print(args.saida)
+    return 1 if failed else 0
+
+def cmd_rank(args):
+    analysis, _ = _ranked(args)
+    columns = ['Produto', 'Emissor_Display', 'Vencimento', 'Taxa_str', 'Taxa_Anual', 'Taxa_Liquida', 'IR', 'Aplicacao_Minima']
+    if args.csv:
+        analysis[columns].to_csv(args.csv, index=False)
+        print(args.csv)
+    else:
+        print(analysis[columns].to_string(index=False))
+    return 0
+
+def cmd_export(args):
+    analysis, include_roa = _ranked(args)
+    if args.formato == 'xlsx':
+        from .excel_export import create_excel_report
+        data = create_excel_report(analysis)
+    else:
+        from .pdf_generator import create_pdf_report
+        from .batch_reports import LOGO_PATH
+        data = create_pdf_report(analysis, include_roa=include_roa, logo_path=LOGO_PATH)
+    output = args.output or f"relatorio_{args.tipo}.{args.formato}"
+    with open(output, 'wb') as f:
+        f.write(data)
+    print(output)
+    return 0
+
+def main(argv=None):
+    from .logging_config import configure_logging
+    from .data_manager import get_data_dir
+    from .worker_pool import apply_settings, settings_from_config
+
+    parser = argparse.ArgumentParser(prog='python -m app', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-q', '--quiet', action='store_true', help="Só mostra avisos e erros no log.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    ingest = sub.add_parser('ingest', help="Processa as planilhas em paralelo e atualiza o cache.")
+    ingest.add_argument('--data-dir', default=get_data_dir())
+    ingest.add_argument('--workers', type=int, default=None)
+    ingest.add_argument('--saida', help="Grava o consolidado (.parquet exige pyarrow; outro sufixo grava pickle).")
+    ingest.set_defaults(func=cmd_ingest)
+
+    rank = sub.add_parser('rank', help="Mostra o ranking dos melhores ativos.")
+    _add_filter_arguments(rank)
+    rank.add_argument('--csv', help="Grava o ranking neste CSV em vez de imprimir.")
+    rank.set_defaults(func=cmd_rank)
+
+    export = sub.add_parser('export', help="Gera o PDF ou a planilha do ranking.")
+    _add_filter_arguments(export)
+    export.add_argument('--formato', choices=['pdf', 'xlsx'], default='pdf')
+    export.add_argument('-o', '--output')
+    export.set_defaults(func=cmd_export)
+
+    args = parser.parse_args(argv)
+    configure_logging(logging.WARNING if args.quiet else logging.INFO)
+    # Sem create_app: as mesmas configurações do servidor (lidas do ambiente),
+    # aplicadas aqui e repassadas aos processos do pool.
+    apply_settings(settings_from_config({}))
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
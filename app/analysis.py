@@ -1,11 +1,111 @@
+import math
 import pandas as pd
 
-def find_best_assets(df: pd.DataFrame, top_n: int = 5) -> pd.DataFrame:
+# Opções de ordenação aceitas em '?ordenacao=' -> coluna usada no ranking.
+RANK_BY_OPTIONS = {
+    'bruta': 'Taxa_Anual',
+    'liquida': 'Taxa_Liquida',
+    'equivalente': 'Taxa_Bruta_Equivalente',
+}
+
+# Critérios da pontuação ponderada. Cada critério vira um percentil em [0, 1]
+# (1 = melhor) e a pontuação é a média ponderada desses percentis.
+#   taxa         -> maior taxa na coluna de ranking
+#   aplicacao    -> menor aplicação mínima
+#   roa          -> maior ROA
+#   liquidez     -> entre os de liquidez diária, sem carência; entre os demais,
+#                   vencimento mais próximo (o ranking compara ativos do mesmo
+#                   grupo, então "ter liquidez diária" sozinho não diferenciaria nada)
+#   concentracao -> emissor com menos ativos no conjunto filtrado
+SCORE_CRITERIA = ('taxa', 'aplicacao', 'roa', 'liquidez', 'concentracao')
+SCORE_COLUMN = 'Pontuacao'
+
+def rank_column(ordenacao):
+    """Coluna de ranking para a opção `ordenacao` (padrão: taxa anual bruta)."""
+    return RANK_BY_OPTIONS.get(ordenacao or 'bruta', RANK_BY_OPTIONS['bruta'])
+
+def parse_scoring(raw_weights, raw_max_per_issuer):
+    """
+    Valida pesos ({critério: valor}) e limite por emissor vindos do usuário.
+    Retorna (pesos ou None, limite ou None, problemas): valores inválidos e
+    critérios desconhecidos são deixados de fora, cada um com uma mensagem em
+    `problemas` para quem chamou decidir se avisa ou rejeita.
+    """
+    problems, weights = [], {}
+    if not isinstance(raw_weights, dict):
+        problems.append("Os pesos devem ser um objeto {critério: peso}.")
+        raw_weights = {}
+    for criterion, value in raw_weights.items():
+        if criterion not in SCORE_CRITERIA:
+            problems.append(f"Critério de peso desconhecido: '{criterion}' (aceitos: {', '.join(SCORE_CRITERIA)}).")
+            continue
+        if value in (None, ''):
+            continue
+        try:
+            weight = float(str(value).replace(',', '.'))
+        except ValueError:
+            weight = math.nan
+        if not math.isfinite(weight):
+            problems.append(f"Peso inválido para '{criterion}': '{value}'. Informe um número.")
+            continue
+        weights[criterion] = weight
+    max_per_issuer = None
+    if raw_max_per_issuer not in (None, ''):
+        try:
+            max_per_issuer = int(str(raw_max_per_issuer))
+        except ValueError:
+            problems.append(f"Máximo por emissor inválido: '{raw_max_per_issuer}'. Informe um número inteiro.")
+        else:
+            max_per_issuer = max_per_issuer if max_per_issuer > 0 else None
+    return (weights if any(weights.values()) else None), max_per_issuer, problems
+
+def scoring_from_args(args):
+    """
+    Lê da query string os pesos ('peso_<critério>') e o limite por emissor
+    ('max_por_emissor'). Retorna (pesos ou None, limite ou None, problemas);
+    ver parse_scoring.
+    """
+    raw_weights = {key[len('peso_'):]: value for key, value in args.items() if key.startswith('peso_')}
+    return parse_scoring(raw_weights, args.get('max_por_emissor'))
+
+def score_assets(df: pd.DataFrame, weights: dict, rank_by: str = 'Taxa_Anual') -> pd.Series:
+    """Pontuação ponderada (0 a 1) de cada linha de `df`, calculada de forma vetorizada."""
+    def pct(series, higher_is_better=True):
+        return pd.to_numeric(series, errors='coerce').rank(pct=True, ascending=higher_is_better).fillna(0.0)
+
+    issuer_share = df.groupby('Emissor', sort=False)['Emissor'].transform('size')
+    criteria = {
+        'taxa': lambda: pct(df[rank_by]),
+        'aplicacao': lambda: pct(df['Aplicacao_Minima'], higher_is_better=False),
+        'roa': lambda: pct(df['Roa']),
+        'liquidez': lambda: df['Vencimento'].rank(pct=True, ascending=False).fillna(0.0)
+                            .where(~df['Liquidez_Diaria'], df['Sem_Carencia'].astype(float)),
+        'concentracao': lambda: pct(issuer_share, higher_is_better=False),
+    }
+    total = sum(abs(w) for w in weights.values()) or 1.0
+    score = pd.Series(0.0, index=df.index)
+    for criterion, weight in weights.items():
+        if weight:
+            score += weight * criteria[criterion]()
+    return score / total
+
+def find_best_assets(df: pd.DataFrame, top_n: int = 5, rank_by: str = 'Taxa_Anual',
+                     weights: dict = None, max_per_issuer: int = None) -> pd.DataFrame:
     """
     Recebe um DataFrame JÁ FILTRADO, limpa os dados inválidos e encontra os melhores ativos.
+    Por padrão ordena pela taxa anual estimada (ver rates.py), que é comparável
+    entre CDI, IPCA+ e pré-fixados. 'Taxa_Liquida' e 'Taxa_Bruta_Equivalente'
+    põem isentos e tributados na mesma base; `rank_by='Taxa'` usa o número bruto da planilha.
+
+    Com `weights` (ver SCORE_CRITERIA) a ordem passa a ser a da pontuação ponderada,
+    gravada na coluna 'Pontuacao'. Com `max_per_issuer`, cada emissor aparece no
+    máximo essa quantidade de vezes por grupo (liquidez diária ou ano de vencimento).
     """
     if df.empty:
         return df
+    if rank_by not in df.columns:
+        from .rates import add_yield_columns
+        df = add_yield_columns(df.copy())
     
     # **INÍCIO DA CORREÇÃO**
     # Pré-limpeza: Remove quaisquer linhas onde a 'Taxa' não pôde ser convertida para número.
@@ -13,8 +113,19 @@ def find_best_assets(df: pd.DataFrame, top_n: int = 5) -> pd.DataFrame:
     df_cleaned = df.dropna(subset=['Taxa'])
     # **FIM DA CORREÇÃO**
     
+    if weights:
+        df_cleaned = df_cleaned.assign(**{SCORE_COLUMN: score_assets(df_cleaned, weights, rank_by)})
+        rank_by = SCORE_COLUMN
+
     # A análise agora usa o DataFrame limpo (df_cleaned)
-    df_sorted = df_cleaned.sort_values(by='Taxa', ascending=False)
+    df_sorted = df_cleaned.sort_values(by=rank_by, ascending=False, na_position='last')
+
+    if max_per_issuer:
+        # Posição de cada ativo dentro do seu emissor e grupo, na ordem do ranking
+        # (sem valor de ranking = por último, mas ainda contam); só os K primeiros ficam.
+        grupo = df_sorted['Ano_Vencimento'].where(~df_sorted['Liquidez_Diaria'], -1)
+        posicao = df_sorted.groupby([grupo, df_sorted['Emissor']], dropna=False).cumcount()
+        df_sorted = df_sorted[posicao < max_per_issuer]
     
     daily_assets = df_sorted[df_sorted['Liquidez_Diaria']].head(top_n)
     
@@ -22,7 +133,7 @@ def find_best_assets(df: pd.DataFrame, top_n: int = 5) -> pd.DataFrame:
     term_assets = term_assets_df.groupby('Ano_Vencimento').head(top_n)
     
     analysis_result = pd.concat([daily_assets, term_assets]).sort_values(
-        by=['Liquidez_Diaria', 'Ano_Vencimento', 'Taxa'], 
-        ascending=[False, True, False]
+        by=['Liquidez_Diaria', 'Ano_Vencimento', rank_by],
+        ascending=[False, True, False], na_position='last'
     )
     return analysis_result
\ No newline at end of file
@@ -0,0 +1,162 @@
+"""
+Geração em lote de relatórios de clientes.
+
+Cada perfil descreve os filtros de um cliente; todos os PDFs saem numa única
+execução, compartilhando os dados carregados e um índice de filtros, com a
+renderização distribuída num pool de processos. O resultado é um arquivo zip.
+
+Formato de um perfil (JSON):
+    {
+        "cliente": "Maria Souza",                  # nome do PDF no zip
+        "relatorio": "credito_bancario0509.xlsx",  # opcional; sem ele usa o consolidado
+        "tipo": "cliente",                         # ou "assessor" (inclui ROA)
+        "anos": [2026, 2027], "produtos": ["CDB"], "taxas": ["Pré-fixado"],
+        "emissores": [...], "ir": ["Isento"],
+        "liquidez_diaria": false,
+        "aplicacao_maxima": 5000,                  # só ativos com aplicação mínima até este valor
+        "ordenacao": "liquida", "pesos": {"taxa": 2, "aplicacao": 1}, "max_por_emissor": 2
+    }
+
+Uso pela linha de comando:
+    python -m app.batch_reports perfis.json -o relatorios.zip [--workers 4]
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import re
+import sys
+import unicodedata
+import zipfile
+import pandas as pd
+from .filter_index import FilterIndex
+
+logger = logging.getLogger(__name__)
+
+LOGO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'logo.png')
+
+def load_profiles(source):
+    """Aceita uma lista de perfis ou {"perfis": [...]}; valida o mínimo necessário."""
+    profiles = source.get('perfis') if isinstance(source, dict) else source
+    if not isinstance(profiles, list) or not profiles:
+        raise ValueError("Informe uma lista não vazia de perfis de clientes.")
+    for i, profile in enumerate(profiles):
+        if not isinstance(profile, dict) or not profile.get('cliente'):
+            raise ValueError(f"O perfil {i + 1} precisa de um campo 'cliente'.")
+    return profiles
+
+def _load_frame(report):
+    from .report_cache import get_processed_report
+    from .data_manager import get_all_processed_data, get_data_dir
+    if not report:
+        return get_all_processed_data()
+    df = get_processed_report(os.path.join(get_data_dir(), report), key=report)
+    return df if df is not None else pd.DataFrame()
+
+def _file_name(cliente, used):
+    text = unicodedata.normalize('NFKD', str(cliente)).encode('ascii', 'ignore').decode('ascii')
+    base = re.sub(r'[^A-Za-z0-9]+', '_', text).strip('_').lower() or 'cliente'
+    name, n = f"{base}.pdf", 1
+    while name in used:
+        n += 1
+        name = f"{base}_{n}.pdf"
+    used.add(name)
+    return name
+
+def _render_pdf(analysis, include_roa, logo_path):
+    """Executado nos processos do pool: só a renderização do PDF."""
+    from .pdf_generator import create_pdf_report
+    return create_pdf_report(analysis, include_roa=include_roa, logo_path=logo_path)
+
+def rank_profiles(profiles):
+    """
+    Carrega cada relatório uma única vez, filtra pelo índice e ranqueia cada
+    perfil. Retorna (tarefas, erros), com tarefas = [(cliente, análise, inclui_roa)].
+    """
+    from .analysis import find_best_assets, rank_column, parse_scoring
+    indexes, tasks, errors = {}, [], []
+    for profile in profiles:
+        cliente = profile['cliente']
+        weights, max_per_issuer, problems = parse_scoring(profile.get('pesos') or {}, profile.get('max_por_emissor'))
+        if problems:
+            errors.extend(f"{cliente}: {problem}" for problem in problems)
+            continue
+        report = profile.get('relatorio') or None
+        if report not in indexes:
+            df = _load_frame(report)
+            indexes[report] = FilterIndex(df) if not df.empty else None
+        index = indexes[report]
+        if index is None:
+            errors.append(f"{cliente}: relatório '{report or 'consolidado'}' sem dados processáveis.")
+            continue
+
+        is_advisor = profile.get('tipo') == 'assessor' and not (report and 'compromissada' in report.lower())
+        analysis = find_best_assets(index.select(profile), top_n=8 if is_advisor else 5,
+                                    rank_by=rank_column(profile.get('ordenacao')),
+                                    weights=weights, max_per_issuer=max_per_issuer)
+        if analysis.empty:
+            errors.append(f"{cliente}: nenhum ativo atende aos filtros.")
+            continue
+        tasks.append((cliente, analysis, is_advisor))
+    return tasks, errors
+
+def render_all(tasks, max_workers=None, logo_path=LOGO_PATH):
+    """Renderiza os PDFs num pool 'spawn'; com uma tarefa só (ou se o pool falhar) renderiza aqui mesmo."""
+    from .worker_pool import process_pool
+    if len(tasks) > 1 and max_workers != 1:
+        try:
+            with process_pool(max_workers) as executor:
+                futures = [executor.submit(_render_pdf, analysis, include_roa, logo_path)
+                           for _, analysis, include_roa in tasks]
+                return [future.result() for future in futures]
+        except Exception as e:
+            logger.warning(f"Pool de renderização falhou ({e}). Renderizando localmente.")
+    return [_render_pdf(analysis, include_roa, logo_path) for _, analysis, include_roa in tasks]
+
+def generate_batch(profiles, max_workers=None, logo_path=LOGO_PATH):
+    """Gera o zip com um PDF por perfil (e 'erros.txt' se algum perfil falhar). Retorna os bytes do zip."""
+    profiles = load_profiles(profiles)
+    tasks, errors = rank_profiles(profiles)
+    pdfs = render_all(tasks, max_workers=max_workers, logo_path=logo_path)
+
+    output, used = io.BytesIO(), set()
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for (cliente, _, _), pdf_bytes in zip(tasks, pdfs):
+            zf.writestr(_file_name(cliente, used), pdf_bytes)
+        if errors:
+            zf.writestr('erros.txt', "\n".join(errors) + "\n")
+    logger.info("Lote de relatórios gerado.", extra={"fields": {
+        "perfis": len(profiles), "pdfs": len(pdfs), "erros": len(errors)}})
+    return output.getvalue()
+
+def main(argv=None):
+    from .logging_config import configure_logging
+    parser = argparse.ArgumentParser(prog='python -m app.batch_reports',
+                                     description="Gera um zip com os PDFs de vários perfis de clientes.")
+    parser.add_argument('perfis', help="Arquivo JSON com a lista de perfis.")
+    parser.add_argument('-o', '--output', default='relatorios_clientes.zip')
+    parser.add_argument('--workers', type=int, default=None, help="Processos de renderização (padrão: nº de CPUs).")
+    args = parser.parse_args(argv)
+
+    from .worker_pool import apply_settings, settings_from_config
+    configure_logging()
+    # Sem create_app: as mesmas configurações do servidor, lidas do ambiente.
+    apply_settings(settings_from_config({}))
+    with open(args.perfis, encoding='utf-8') as f:
+        profiles = json.load(f)
+    try:
+        data = generate_batch(profiles, max_workers=args.workers)
+    except ValueError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 2
+    with open(args.output, 'wb') as f:
+        f.write(data)
+    print(args.output)
+    return 0
+
+if __name__ == '__main__':
+    # Reimporta pelo nome do pacote: o logger fica sob 'app' e o pool de processos
+    # consegue localizar _render_pdf como app.batch_reports._render_pdf.
+    from app.batch_reports import main as _main
+    sys.exit(_main())
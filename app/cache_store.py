@@ -0,0 +1,251 @@
+import os
+import hashlib
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# --- Cache compartilhado entre processos ---
+# Cada worker (gunicorn, por exemplo) mantém seu próprio cache em memória, mas
+# os relatórios já processados ficam gravados neste banco SQLite local. Um
+# contador de geração permite que todos os workers invalidem seus caches juntos
+# quando um deles executa '/add-data' ou '/clear-data'.
+#
+# Além disso, os resultados são endereçados pelo conteúdo: a tabela 'contents'
+# guarda o DataFrame processado por hash SHA-256 da planilha, e 'digests'
+# lembra o hash de cada arquivo (por nome + assinatura). Uma planilha idêntica a
+# outra já processada (reenvio, cópia com outro nome, ou qualquer arquivo após
+# uma troca de geração) é recuperada sem novo processamento.
+#
+# A tabela 'claims' marca os conteúdos que algum processo está processando
+# agora: quem chega depois (outro worker, o observador da pasta, um upload)
+# espera o resultado em vez de ler a mesma planilha de novo.
+
+CHUNK_SIZE = 1024 * 1024
+
+# Após quantos segundos uma marcação de processamento é considerada abandonada
+# (processo que morreu no meio) e intervalo entre consultas de quem espera.
+CLAIM_TTL = 600
+CLAIM_POLL_INTERVAL = 0.25
+
+# Versão da saída de process_data. Incrementar quando o processamento mudar de
+# resultado para a mesma planilha: ao abrir um banco gravado por outra versão,
+# os relatórios e conteúdos processados são descartados (os hashes continuam valendo).
+PROCESSING_VERSION = 2
+
+def get_cache_dir():
+    """Retorna o caminho para a pasta 'cache', ao lado da pasta 'data' (ou a indicada em REPORTS_CACHE_DIR)."""
+    return os.environ.get('REPORTS_CACHE_DIR') or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache')
+
+def get_cache_db_path():
+    return os.path.join(get_cache_dir(), 'reports.sqlite3')
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready = set()
+
+def _create_schema(conn):
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS frames ("
+        " key TEXT PRIMARY KEY, signature TEXT NOT NULL,"
+        " generation INTEGER NOT NULL, payload BLOB NOT NULL)"
+    )
+    conn.execute("CREATE TABLE IF NOT EXISTS contents (digest TEXT PRIMARY KEY, payload BLOB NOT NULL)")
+    conn.execute("CREATE TABLE IF NOT EXISTS digests (key TEXT PRIMARY KEY, signature TEXT NOT NULL, digest TEXT NOT NULL)")
+    conn.execute("CREATE TABLE IF NOT EXISTS claims (digest TEXT PRIMARY KEY, pid INTEGER NOT NULL, claimed_at REAL NOT NULL)")
+    conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', 0)")
+    # Bancos anteriores ao controle de versão não têm a linha: contam como versão 1.
+    conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('processing_version', 1)")
+    version = conn.execute("SELECT value FROM meta WHERE key = 'processing_version'").fetchone()[0]
+    if version != PROCESSING_VERSION:
+        logger.info("Cache gravado por outra versão do processamento; descartando os resultados.",
+                    extra={"fields": {"versao_gravada": version, "versao_atual": PROCESSING_VERSION}})
+        conn.execute("DELETE FROM frames")
+        conn.execute("DELETE FROM contents")
+        conn.execute("UPDATE meta SET value = ? WHERE key = 'processing_version'", (PROCESSING_VERSION,))
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+    conn.commit()
+
+def _connect():
+    """
+    Conexão desta thread com o banco do cache. A conexão é reaproveitada entre
+    requisições (uma por thread e por processo, refeita após um fork ou se a
+    pasta do cache mudar) e o esquema é criado uma única vez por processo, então
+    o caminho quente faz só a consulta em si.
+    """
+    path = get_cache_db_path()
+    pid = os.getpid()
+    cached = getattr(_local, 'conn', None)
+    if cached is not None and cached[0] == path and cached[1] == pid:
+        return cached[2]
+    os.makedirs(get_cache_dir(), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    with _schema_lock:
+        if (path, pid) not in _schema_ready:
+            _create_schema(conn)
+            _schema_ready.add((path, pid))
+    _local.conn = (path, pid, conn)
+    return conn
+
+def get_file_signature(file_path):
+    """
+    Assinatura barata do arquivo de origem (mtime + tamanho). Se o arquivo for
+    substituído, a assinatura muda e a entrada gravada deixa de ser usada.
+    """
+    stat = os.stat(file_path)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+def get_generation():
+    """Retorna a geração atual do cache compartilhado."""
+    conn = _connect()
+    row = conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+    return row[0]
+
+def bump_generation(purge_contents=False):
+    """
+    Avança a geração e descarta todos os relatórios gravados. Os demais workers
+    percebem a mudança na próxima requisição e limpam seus caches locais.
+    Os resultados por conteúdo só são apagados com `purge_contents=True`.
+    """
+    conn = _connect()
+    with conn:
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+        conn.execute("DELETE FROM frames")
+        if purge_contents:
+            conn.execute("DELETE FROM contents")
+            conn.execute("DELETE FROM digests")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+    return row[0]
+
+def load_frame(key, signature):
+    """
+    Carrega um DataFrame processado por qualquer worker, desde que tenha sido
+    gravado na geração atual e a partir do mesmo arquivo de origem.
+    Retorna None se não houver entrada válida.
+    """
+    conn = _connect()
+    row = conn.execute(
+        "SELECT f.payload FROM frames f JOIN meta m ON m.key = 'generation'"
+        " WHERE f.key = ? AND f.signature = ? AND f.generation = m.value",
+        (key, signature)
+    ).fetchone()
+    if row is None:
+        return None
+    try:
+        return pickle.loads(row[0])
+    except Exception as e:
+        logger.warning(f"Entrada corrompida descartada: {e}", extra={"fields": {"chave": key}})
+        return None
+
+def store_frame(key, signature, df, generation):
+    """
+    Grava um DataFrame processado. Se a geração mudou enquanto o arquivo era
+    processado (alguém limpou o cache), o resultado é descartado.
+    """
+    payload = pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+    conn = _connect()
+    with conn:
+        current = conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()[0]
+        if current != generation:
+            return False
+        conn.execute(
+            "INSERT OR REPLACE INTO frames (key, signature, generation, payload) VALUES (?, ?, ?, ?)",
+            (key, signature, generation, sqlite3.Binary(payload))
+        )
+    return True
+
+def hash_stream(stream, sink=None):
+    """
+    SHA-256 de um fluxo binário lido em blocos de CHUNK_SIZE. Se `sink` for
+    informado, cada bloco também é escrito nele (cópia e hash numa só passada).
+    """
+    digest = hashlib.sha256()
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+        if sink is not None:
+            sink.write(chunk)
+    return digest.hexdigest()
+
+def get_digest(key, signature):
+    """Hash já conhecido do arquivo `key`, se a assinatura ainda for a mesma."""
+    conn = _connect()
+    row = conn.execute("SELECT digest FROM digests WHERE key = ? AND signature = ?", (key, signature)).fetchone()
+    return row[0] if row else None
+
+def record_digest(key, signature, digest):
+    conn = _connect()
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO digests (key, signature, digest) VALUES (?, ?, ?)", (key, signature, digest))
+
+def file_digest(key, file_path):
+    """Hash do arquivo: reaproveita o registrado para a assinatura atual ou lê o arquivo uma vez."""
+    signature = get_file_signature(file_path)
+    digest = get_digest(key, signature)
+    if digest is None:
+        with open(file_path, 'rb') as f:
+            digest = hash_stream(f)
+        record_digest(key, signature, digest)
+    return digest
+
+def load_content(digest):
+    """DataFrame processado de uma planilha com este conteúdo, ou None."""
+    conn = _connect()
+    row = conn.execute("SELECT payload FROM contents WHERE digest = ?", (digest,)).fetchone()
+    if row is None:
+        return None
+    try:
+        return pickle.loads(row[0])
+    except Exception as e:
+        logger.warning(f"Entrada corrompida descartada: {e}", extra={"fields": {"digest": digest}})
+        return None
+
+def has_content(digest):
+    conn = _connect()
+    return conn.execute("SELECT 1 FROM contents WHERE digest = ?", (digest,)).fetchone() is not None
+
+def store_content(digest, df):
+    payload = pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+    conn = _connect()
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO contents (digest, payload) VALUES (?, ?)", (digest, sqlite3.Binary(payload)))
+
+def claim_content(digest):
+    """
+    Marca o conteúdo `digest` como em processamento por este processo. Retorna
+    False se outro (processo ou thread) já o marcou e a marcação não expirou.
+    """
+    now = time.time()
+    conn = _connect()
+    with conn:
+        conn.execute("DELETE FROM claims WHERE digest = ? AND claimed_at < ?", (digest, now - CLAIM_TTL))
+        cursor = conn.execute("INSERT OR IGNORE INTO claims (digest, pid, claimed_at) VALUES (?, ?, ?)",
+                              (digest, os.getpid(), now))
+    return cursor.rowcount == 1
+
+def release_content(digest):
+    conn = _connect()
+    with conn:
+        conn.execute("DELETE FROM claims WHERE digest = ?", (digest,))
+
+def wait_for_content(digest):
+    """
+    Espera quem marcou `digest` terminar. Retorna o DataFrame gravado, ou None
+    se a marcação sumiu (ou expirou) sem resultado: aí cabe a quem chamou processar.
+    """
+    conn = _connect()
+    while True:
+        df = load_content(digest)
+        if df is not None:
+            return df
+        row = conn.execute("SELECT claimed_at FROM claims WHERE digest = ?", (digest,)).fetchone()
+        if row is None or row[0] < time.time() - CLAIM_TTL:
+            return None
+        time.sleep(CLAIM_POLL_INTERVAL)
@@ -0,0 +1,63 @@
+import gzip
+
+from flask import request
+
+# --- Compressão das respostas ---
+# Páginas HTML (resultados com dezenas de tabelas) e respostas JSON das APIs de
+# facetas e busca são texto bem repetitivo e encolhem de 5 a 10 vezes. O gancho
+# comprime o corpo já pronto quando o cliente aceita: brotli se o pacote estiver
+# instalado (opcional), senão gzip da biblioteca padrão. PDFs, planilhas,
+# arquivos estáticos e respostas em streaming passam intactos.
+
+ENABLED = True
+MIN_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+COMPRESSIBLE_MIMETYPES = ('text/html', 'application/json', 'text/plain')
+
+_brotli = None
+
+def _load_brotli():
+    global _brotli
+    if _brotli is None:
+        try:
+            import brotli
+            _brotli = brotli
+        except ImportError:
+            _brotli = False
+    return _brotli
+
+def choose_encoding(accept_encodings):
+    """'br', 'gzip' ou None conforme o Accept-Encoding do cliente e o que está disponível."""
+    if accept_encodings['br'] and _load_brotli():
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return _load_brotli().compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+def _after_request(response):
+    if (not ENABLED or response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+    body = response.get_data()
+    if len(body) < MIN_SIZE:
+        return response
+    response.set_data(compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+def install_compression(app):
+    """Registra a compressão como último gancho da aplicação (depois dos do blueprint)."""
+    app.after_request(_after_request)
@@ -1,55 +1,60 @@
-import pandas as pd
 import os
-from .data_processor import process_data
+import logging
+from .report_cache import report_cache, get_processed_report
+from .dedupe import consolidate
 
-# --- Variável de Cache ---
-_cached_data = None
+logger = logging.getLogger(__name__)
+
+# Chave do DataFrame consolidado no cache de relatórios.
+CONSOLIDATED_KEY = '__consolidado__'
 
 def get_data_dir():
-    """Retorna o caminho para a pasta 'data'."""
+    """Retorna o caminho para a pasta 'data' (ou a indicada em REPORTS_DATA_DIR)."""
     # O caminho é relativo à localização deste arquivo
-    return os.path.join(os.path.dirname(__file__), '..', 'data')
+    return os.environ.get('REPORTS_DATA_DIR') or os.path.join(os.path.dirname(__file__), '..', 'data')
+
+def list_data_files():
+    """Planilhas .xlsx da pasta 'data', pela listagem em memória do data_watcher quando ele está ativo."""
+    from . import data_watcher
+    reports = data_watcher.list_reports()
+    if reports is not None:
+        return list(reports)
+    data_dir = get_data_dir()
+    if os.path.exists(data_dir):
+        return sorted(f for f in os.listdir(data_dir) if f.endswith('.xlsx'))
+    return []
 
 def clear_caches():
     """Limpa o cache de dados para forçar uma releitura dos arquivos."""
-    global _cached_data
-    _cached_data = None
-    print("INFO: Cache de dados limpo.")
+    report_cache.clear()
+    logger.info("Cache de dados limpo.")
+
+def _build_consolidated_data(generation):
+    logger.info("Cache vazio. Processando todos os relatórios da pasta 'data'...")
+    data_dir = get_data_dir()
+    reports = []
+
+    for filename in list_data_files():
+        logger.info("Lendo o arquivo.", extra={"fields": {"arquivo": filename}})
+        file_path = os.path.join(data_dir, filename)
+        reports.append((file_path, get_processed_report(file_path, key=filename)))
+
+    # Consolida todos os DataFrames em um só, mantendo uma linha por ativo
+    final_df = consolidate(reports)
+    if not final_df.empty:
+        logger.info("Processamento concluído. Dados consolidados e limpos.", extra={"fields": {"linhas": len(final_df)}})
+        return final_df
+
+    logger.warning("Nenhum dado processável foi encontrado nos arquivos.")
+    import pandas as pd
+    return pd.DataFrame()
 
 def get_all_processed_data():
     """
     Função principal do orquestrador. Lê todos os arquivos .xlsx, os processa,
     consolida, limpa e armazena em cache.
     """
-    global _cached_data
-    if _cached_data is not None:
-        return _cached_data
-
-    print("INFO: Cache vazio. Processando todos os relatórios da pasta 'data'...")
-    data_dir = get_data_dir()
-    all_dfs = []
-    
-    if os.path.exists(data_dir):
-        for filename in os.listdir(data_dir):
-            if filename.endswith('.xlsx'):
-                file_path = os.path.join(data_dir, filename)
-                print(f"INFO: [Data Manager] Lendo o arquivo: {filename}")
-                df = process_data(file_path)
-                if not df.empty:
-                    all_dfs.append(df)
-    
-    if all_dfs:
-        # Consolida todos os DataFrames em um só
-        final_df = pd.concat(all_dfs, ignore_index=True)
-        # **Etapa crucial de limpeza:** remove quaisquer linhas duplicadas
-        final_df.drop_duplicates(inplace=True)
-        _cached_data = final_df
-        print(f"INFO: Processamento concluído. {len(_cached_data)} linhas de dados consolidadas e limpas.")
-    else:
-        _cached_data = pd.DataFrame()
-        print("WARN: Nenhum dado processável foi encontrado nos arquivos.")
-        
-    return _cached_data
+    return report_cache.get_or_load(CONSOLIDATED_KEY, _build_consolidated_data)
 
 def get_filter_options():
     """
@@ -60,7 +65,7 @@ def get_filter_options():
         return {
             "categorias": [], "anos": [], "tipos_produto": [],
             "tipos_taxa": [], "emissores": [], "tipos_ir": [],
-            "loaded_files": [f for f in os.listdir(get_data_dir()) if f.endswith('.xlsx')]
+            "loaded_files": list_data_files()
         }
 
     # Extrai os valores únicos para cada filtro
@@ -70,7 +75,7 @@ def get_filter_options():
     tipos_taxa = sorted(df['Tipo_Taxa'].unique())
     emissores = sorted(df[df['Emissor'] != 'N/A']['Emissor'].unique())
     tipos_ir = sorted(df['IR'].unique())
-    loaded_files = [f for f in os.listdir(get_data_dir()) if f.endswith('.xlsx')]
+    loaded_files = list_data_files()
 
     return {
         "categorias": categorias, "anos": anos, "tipos_produto": tipos_produto,
@@ -1,8 +1,13 @@
 import pandas as pd
 import re
 import os
+import logging
 # Importa todos os processadores especialistas
 from .processors import bancario_processor, privado_processor, debenture_processor, compromissada_processor, titulos_publicos_processor
+from .metrics import timer, record_rows, INGESTION_STAGE_SECONDS, INGESTION_PROCESSOR_SECONDS, INGESTION_FILES
+from .issuers import canonical_names, issuer_keywords
+
+logger = logging.getLogger(__name__)
 
 def find_data_start_and_keywords(df):
     """
@@ -91,24 +96,37 @@ def process_data(file_path: str):
     """
     Gerenciador principal com lógica de seleção hierárquica e forçada.
     """
+    file_name = os.path.basename(file_path)
+    timings = {}
+    processor_name = 'nenhum'
     try:
-        df_temp = pd.read_excel(file_path, header=None, dtype=str)
-        header_row_index, keywords = find_data_start_and_keywords(df_temp)
+        with timer(INGESTION_STAGE_SECONDS, stage='read_excel') as t:
+            df_temp = pd.read_excel(file_path, header=None, dtype=str)
+        timings['read_excel'] = t.elapsed
+        with timer(INGESTION_STAGE_SECONDS, stage='header_detection') as t:
+            header_row_index, keywords = find_data_start_and_keywords(df_temp)
+        timings['header_detection'] = t.elapsed
 
         if header_row_index is None:
-            print(f"WARN: Cabeçalho não identificado em {os.path.basename(file_path)}. Pulando.")
+            logger.warning("Cabeçalho não identificado. Pulando.", extra={"fields": {"arquivo": file_name}})
+            INGESTION_FILES.inc(processor=processor_name, status='sem_cabecalho')
             return pd.DataFrame()
             
         # **NOVA LÓGICA PARA TÍTULOS PÚBLICOS**
         if any(k in keywords for k in ['tesouro', 'lft', 'ltn', 'ntn', 'preçounitário']):
-             print(f"INFO: Arquivo '{os.path.basename(file_path)}' identificado como Títulos Públicos. Realizando alinhamento especial.")
-             df_raw = find_and_align_data_for_public_bonds(df_temp)
+             logger.info("Arquivo identificado como Títulos Públicos. Realizando alinhamento especial.", extra={"fields": {"arquivo": file_name}})
+             with timer(INGESTION_STAGE_SECONDS, stage='public_bonds_alignment') as t:
+                 df_raw = find_and_align_data_for_public_bonds(df_temp)
+             timings['public_bonds_alignment'] = t.elapsed
         else:
-            df_raw = pd.read_excel(file_path, header=header_row_index, dtype=str)
+            with timer(INGESTION_STAGE_SECONDS, stage='read_excel_data') as t:
+                df_raw = pd.read_excel(file_path, header=header_row_index, dtype=str)
+            timings['read_excel_data'] = t.elapsed
 
         df_raw.dropna(axis=1, how='all', inplace=True)
+        record_rows('read_excel', len(df_temp), len(df_raw))
         
-        print(f"INFO: Arquivo '{os.path.basename(file_path)}' lido. Palavras-chave de identificação: {keywords}")
+        logger.info("Arquivo lido.", extra={"fields": {"arquivo": file_name, "linhas": len(df_raw), "palavras_chave": ','.join(sorted(keywords))}})
 
         # **INÍCIO DA LÓGICA DE SELEÇÃO HIERÁRQUICA**
         selected_processor = None
@@ -128,22 +146,45 @@ def process_data(file_path: str):
                 selected_processor = bancario_processor.process
         # **FIM DA LÓGICA DE SELEÇÃO**
 
-        processed_df = selected_processor(df_raw.copy())
-        print(f"INFO: Arquivo processado por: {selected_processor.__module__}")
+        processor_name = selected_processor.__module__.rsplit('.', 1)[-1].replace('_processor', '')
+        with timer(INGESTION_STAGE_SECONDS, stage='processor') as t:
+            processed_df = selected_processor(df_raw.copy())
+        timings['processor'] = t.elapsed
+        INGESTION_PROCESSOR_SECONDS.observe(t.elapsed, processor=processor_name)
+        record_rows('processor', len(df_raw), 0 if processed_df is None else len(processed_df))
 
         if processed_df is None or processed_df.empty:
-            print(f"WARN: O processador não retornou dados processáveis.")
+            logger.warning("O processador não retornou dados processáveis.", extra={"fields": {"arquivo": file_name, "processador": processor_name}})
+            INGESTION_FILES.inc(processor=processor_name, status='vazio')
             return pd.DataFrame()
             
         df = processed_df
 
     except Exception as e:
-        print(f"ERROR: Falha crítica ao processar {os.path.basename(file_path)}: {e}")
+        logger.error(f"Falha crítica ao processar o arquivo: {e}", extra={"fields": {"arquivo": file_name, "processador": processor_name}})
+        INGESTION_FILES.inc(processor=processor_name, status='erro')
         return pd.DataFrame()
 
     if df.empty: return pd.DataFrame()
-        
+
+    with timer(INGESTION_STAGE_SECONDS, stage='enrichment') as t:
+        df = _enrich(df)
+    timings['enrichment'] = t.elapsed
+    record_rows('enrichment', len(processed_df), len(df))
+    INGESTION_FILES.inc(processor=processor_name, status='ok')
+
+    logger.info("Arquivo processado.", extra={"fields": {
+        "arquivo": file_name, "processador": processor_name,
+        "linhas_entrada": len(df_raw), "linhas_saida": len(df),
+        **{f"t_{stage}": elapsed for stage, elapsed in timings.items()},
+    }})
+    return df
+
+def _enrich(df):
+    """Etapa de enriquecimento: deriva produto, emissor, categorias, liquidez, datas e taxas numéricas."""
     df[['Produto', 'Emissor']] = df['Produto_Completo'].apply(lambda x: pd.Series(extract_product_and_issuer(x)))
+    # Variações do mesmo emissor entre planilhas viram um só nome (ver issuers.py).
+    df['Emissor'] = canonical_names(df['Emissor'])
     df['Tipo_Produto_Base'] = df['Produto'].apply(classify_product_type)
     df['Categoria'] = df['Tipo_Produto_Base'].apply(assign_top_level_category)
     df['IR'] = df['IR'].fillna('N/A')
@@ -185,6 +226,23 @@ def process_data(file_path: str):
     return df
 
 # --- Funções Auxiliares ---
+# Palavras que marcam o início do emissor em 'Produto_Completo' ("CDB - PÓS-FIXADOBanco
+# BTG Pactual..."), além dos nomes e apelidos do registro de emissores (issuers.py).
+ISSUER_KEYWORDS = ['Banco', 'Agibank', 'BDMG', 'genial', 'XP', 'Daycoval', 'C6', 'Bmg', 'FIBRA', 'Haitong', 'Master', 'Omni', 'Pine', 'Rodobens', 'Voiter', 'Digimais', 'Facta', 'Agrolend', 'Tesouro Nacional']
+
+_issuer_regex = (None, None)
+
+def _issuer_pattern():
+    """Regex produto + emissor, recompilada só quando o registro de emissores muda."""
+    global _issuer_regex
+    keywords = issuer_keywords()
+    if _issuer_regex[0] is not keywords:
+        alternatives = sorted({*ISSUER_KEYWORDS, *keywords}, key=lambda k: (-len(k), k.lower()))
+        # O grupo (?:...) faz o '.*' valer para todas as alternativas, não só para a última.
+        pattern = r'^(.*?)\s?((?:' + '|'.join(re.escape(k) for k in alternatives) + r').*)'
+        _issuer_regex = (keywords, re.compile(pattern, re.IGNORECASE | re.DOTALL))
+    return _issuer_regex[1]
+
 def extract_product_and_issuer(full_product):
     if not isinstance(full_product, str): return 'N/A', 'N/A'
     produto_limpo, emissor = 'N/A', 'N/A'
@@ -199,16 +257,11 @@ def extract_product_and_issuer(full_product):
         emissor = match_privado.group(2).strip()
         if len(emissor) <= 2: emissor = full_product
         return produto_limpo, emissor
-    issuer_keywords = ['Banco', 'Agibank', 'BDMG', 'genial', 'XP', 'Daycoval', 'C6', 'Bmg', 'FIBRA', 'Haitong', 'Master', 'Omni', 'Pine', 'Rodobens', 'Voiter', 'Digimais', 'Facta', 'Agrolend', 'Tesouro Nacional']
-    pattern = r'^(.*?)\s?(' + '|'.join(issuer_keywords) + r'.*)'
-    match_bancario = re.search(pattern, full_product, re.IGNORECASE)
+    match_bancario = _issuer_pattern().search(full_product)
     if match_bancario:
         produto_limpo = match_bancario.group(1).strip()
-        emissor = match_bancario.group(2).strip()
-        abbreviations = {"Banco BTG Pactual": "BTG Pactual", "Banco Daycoval": "Daycoval", "Banco C6 Consignado": "C6", "Banco BMG": "BMG", "Banco Agibank": "Agibank"}
-        for full, abbr in abbreviations.items():
-            if full in emissor: emissor = abbr
-        emissor = re.sub(r'Diária.*', '', emissor).strip()
+        # O texto do emissor vem colado à liquidez ("Banco PineNo vencimento", "...Diária Carência 30d").
+        emissor = re.sub(r'(?:Diária|No vencimento).*', '', match_bancario.group(2), flags=re.IGNORECASE | re.DOTALL).strip()
         return produto_limpo, emissor
     type_match = re.search(r'^(CRA|CRI|CDCA|DEBENTURE|LCA|LCI|CDB|LF)', full_product, re.IGNORECASE)
     if type_match:
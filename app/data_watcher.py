@@ -0,0 +1,97 @@
+import os
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# --- Observador da pasta 'data' ---
+# Uma thread de fundo varre a pasta a cada `interval` segundos (polling com
+# os.scandir, sem dependências extras) e mantém em memória a lista de planilhas
+# e a assinatura (mtime + tamanho) de cada uma. Assim:
+#   - a listagem de relatórios não precisa de os.listdir a cada requisição;
+#   - arquivos novos ou alterados (ex.: sincronização noturna) são reprocessados
+#     em segundo plano, e só eles;
+#   - arquivos apagados saem do cache em memória.
+# Em qualquer mudança o consolidado também é descartado.
+
+_lock = threading.Lock()
+_state = {"data_dir": None, "reports": None, "signatures": {}, "thread": None, "stop": None}
+
+def scan(data_dir):
+    """Retorna {nome: assinatura} das planilhas .xlsx em `data_dir`."""
+    signatures = {}
+    try:
+        with os.scandir(data_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.xlsx') and entry.is_file():
+                    stat = entry.stat()
+                    signatures[entry.name] = f"{stat.st_mtime_ns}:{stat.st_size}"
+    except FileNotFoundError:
+        pass
+    return signatures
+
+def list_reports():
+    """Lista ordenada de planilhas conhecida pelo observador, ou None se ele não estiver ativo."""
+    return _state["reports"]
+
+def refresh(data_dir, reprocess=True):
+    """
+    Varre a pasta uma vez e aplica as mudanças desde a última varredura.
+    Retorna (criados, alterados, removidos). Com `reprocess=False` só atualiza
+    a listagem e invalida o cache (o processamento fica para o próximo acesso).
+    """
+    from .report_cache import report_cache, get_processed_report
+    from .data_manager import CONSOLIDATED_KEY
+
+    current = scan(data_dir)
+    with _lock:
+        previous = _state["signatures"] if _state["data_dir"] == data_dir else {}
+        _state.update(data_dir=data_dir, signatures=current, reports=sorted(current))
+
+    created = [name for name in current if name not in previous]
+    modified = [name for name in current if name in previous and current[name] != previous[name]]
+    deleted = [name for name in previous if name not in current]
+    if not (created or modified or deleted):
+        return created, modified, deleted
+
+    report_cache.invalidate(CONSOLIDATED_KEY, *modified, *deleted)
+    logger.info("Mudanças na pasta de dados.", extra={"fields": {
+        "criados": len(created), "alterados": len(modified), "removidos": len(deleted)}})
+    if reprocess:
+        for name in created + modified:
+            try:
+                get_processed_report(os.path.join(data_dir, name), key=name)
+            except Exception as e:
+                logger.error(f"Falha ao reprocessar: {e}", extra={"fields": {"arquivo": name}})
+    return created, modified, deleted
+
+def _poll(data_dir, interval, stop):
+    while not stop.wait(interval):
+        try:
+            refresh(data_dir)
+        except Exception as e:
+            logger.error(f"Falha na varredura da pasta de dados: {e}")
+
+def start_watcher(data_dir, interval=5.0):
+    """
+    Faz a primeira varredura (sem reprocessar nada) e inicia a thread de
+    polling. Chamadas repetidas não criam uma segunda thread.
+    """
+    with _lock:
+        if _state["thread"] is not None and _state["thread"].is_alive():
+            return _state["thread"]
+    refresh(data_dir, reprocess=False)
+    stop = threading.Event()
+    thread = threading.Thread(target=_poll, args=(data_dir, interval, stop), name="data-watcher", daemon=True)
+    with _lock:
+        _state.update(thread=thread, stop=stop)
+    thread.start()
+    return thread
+
+def stop_watcher():
+    with _lock:
+        stop, thread = _state["stop"], _state["thread"]
+        _state.update(thread=None, stop=None, reports=None)
+    if stop is not None:
+        stop.set()
+        thread.join()
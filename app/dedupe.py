@@ -0,0 +1,108 @@
+import os
+import re
+import logging
+import unicodedata
+from .metrics import timer, record_rows, INGESTION_STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# --- Deduplicação do consolidado ---
+# Um ativo é identificado pelo produto, emissor, vencimento e tipo de taxa
+# (textos normalizados: sem acentos, maiúsculos, espaços colapsados). Essa
+# identidade vira uma chave de 64 bits por linha, e a deduplicação trabalha só
+# sobre essa chave em vez de comparar todas as colunas do DataFrame.
+
+KEY_COLUMNS = ['Produto_Completo', 'Emissor', 'Vencimento', 'Tipo_Taxa']
+
+# Regra de precedência entre arquivos quando o mesmo ativo aparece em mais de um:
+#   'recente' -> vence o arquivo com o snapshot mais recente (data no nome ou modificação)
+#   'nome'    -> vence o primeiro arquivo em ordem alfabética
+# Arquivos listados em SOURCE_ORDER vencem sempre, na ordem dada.
+PRECEDENCE = 'recente'
+SOURCE_ORDER = []
+PRECEDENCE_RULES = ('recente', 'nome')
+
+def _normalize_text(value):
+    text = unicodedata.normalize('NFKD', str(value)).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'\s+', ' ', text).strip().upper()
+
+def _text_hashes(series):
+    # Normaliza e faz o hash apenas dos valores distintos; as linhas recebem o
+    # hash do seu valor pelo código do factorize.
+    import pandas as pd
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    normalized = pd.Index([_normalize_text(v) for v in uniques], dtype=object)
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy()[codes]
+
+def row_keys(df):
+    """Chave de 64 bits (uint64) da identidade de negócio de cada linha de `df`."""
+    import pandas as pd
+    parts = {}
+    for col in KEY_COLUMNS:
+        if col == 'Vencimento':
+            parts[col] = pd.to_datetime(df[col], errors='coerce').to_numpy(dtype='datetime64[ns]').view('int64')
+        else:
+            parts[col] = _text_hashes(df[col])
+    return pd.util.hash_pandas_object(pd.DataFrame(parts, index=df.index), index=False).to_numpy()
+
+def source_ranks(source_paths, precedence=None, source_order=None):
+    """
+    Posição de cada arquivo na precedência (0 = vence). `source_paths` são os
+    caminhos dos arquivos; a ordem explícita compara apenas o nome do arquivo.
+    """
+    from .history_store import snapshot_date_for
+    precedence = precedence or PRECEDENCE
+    if precedence not in PRECEDENCE_RULES:
+        raise ValueError(f"Regra de precedência desconhecida: '{precedence}'. Use uma de {PRECEDENCE_RULES}.")
+    explicit = {name: i for i, name in enumerate(SOURCE_ORDER if source_order is None else source_order)}
+
+    def sort_key(path):
+        name = os.path.basename(path)
+        if name in explicit:
+            return (0, explicit[name], '')
+        if precedence == 'recente':
+            return (1, -snapshot_date_for(path).toordinal(), name)
+        return (1, 0, name)
+
+    return {path: rank for rank, path in enumerate(sorted(source_paths, key=sort_key))}
+
+def consolidate(reports, precedence=None, source_order=None):
+    """
+    Concatena os relatórios processados e remove ativos repetidos.
+
+    `reports` é uma lista de (caminho_do_arquivo, DataFrame). Um ativo presente
+    em vários arquivos fica só com a linha do arquivo de maior precedência;
+    dentro de um mesmo arquivo fica a linha de maior 'Taxa' (e, no empate, a de
+    menor 'Aplicacao_Minima').
+    """
+    import numpy as np
+    import pandas as pd
+    reports = [(path, df) for path, df in reports if df is not None and not df.empty]
+    if not reports:
+        return pd.DataFrame()
+
+    ranks = source_ranks([path for path, _ in reports], precedence, source_order)
+    # Colunas inteiramente vazias num relatório (ex.: 'Roa' nos títulos públicos)
+    # ficam fora do concat, para não influenciarem o tipo da coluna resultante
+    # (o pandas deixará de ignorá-las); o reindex devolve as que faltarem.
+    columns = list(dict.fromkeys(column for _, df in reports for column in df.columns))
+    combined = pd.concat([df.dropna(axis=1, how='all') for _, df in reports], ignore_index=True).reindex(columns=columns)
+    with timer(INGESTION_STAGE_SECONDS, stage='dedupe'):
+        rank = np.concatenate([np.full(len(df), ranks[path], dtype=np.int32) for path, df in reports])
+        keys = row_keys(combined)
+        # Ordena por chave, precedência do arquivo, maior taxa e menor aplicação;
+        # a primeira linha de cada chave é a que fica.
+        order = np.lexsort((
+            pd.to_numeric(combined['Aplicacao_Minima'], errors='coerce').fillna(np.inf).to_numpy(dtype=float),
+            -pd.to_numeric(combined['Taxa'], errors='coerce').fillna(-np.inf).to_numpy(dtype=float),
+            rank,
+            keys,
+        ))
+        sorted_keys = keys[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        result = combined.iloc[np.sort(order[first])].reset_index(drop=True)
+    record_rows('dedupe', len(combined), len(result))
+    logger.info("Consolidado deduplicado.", extra={"fields": {
+        "arquivos": len(reports), "linhas_entrada": len(combined), "linhas_saida": len(result)}})
+    return result
@@ -0,0 +1,25 @@
+import io
+import pandas as pd
+
+def create_excel_report(data) -> bytes:
+    """
+    Planilha do relatório de assessores (mesmas colunas do PDF, com ROA e taxa anual estimada).
+    `data` é o DataFrame de find_best_assets ou o ResultView já montado (view_models);
+    as linhas seguem a ordem do resultado de find_best_assets.
+    """
+    from .view_models import as_result_view
+    view = as_result_view(data, include_roa=True)
+    rows = sorted((row for section in view.secoes for row in section.linhas), key=lambda row: row.ordem)
+    df_excel = pd.DataFrame({
+        'Produto': [row.produto for row in rows],
+        'Emissor': [row.emissor for row in rows],
+        'Vencimento': [row.vencimento for row in rows],
+        'Taxa': [row.taxa for row in rows],
+        'Taxa Anual Estimada (%)': pd.Series([row.taxa_anual_valor for row in rows], dtype=float).round(2),
+        'IR': [row.ir for row in rows],
+        'Aplicação Mínima': [row.aplicacao_minima_valor for row in rows],
+        'Roa': (pd.Series([row.roa_valor for row in rows], dtype=float) * 100).map('{:,.2f}%'.format),
+    })
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer: df_excel.to_excel(writer, index=False, sheet_name='Relatorio')
+    return output.getvalue()
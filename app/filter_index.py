@@ -0,0 +1,115 @@
+import threading
+import numpy as np
+import pandas as pd
+
+# --- Índice de filtros ---
+# Cada coluna de FILTER_COLUMNS é fatorada uma única vez por DataFrame carregado;
+# a partir daí o filtro de um perfil vira comparações de códigos inteiros e as
+# contagens por faceta saem de um np.bincount sobre esses códigos, sem 'isin'
+# nem groupby sobre textos a cada requisição.
+
+# Chave do perfil -> coluna filtrada por pertencimento.
+FILTER_COLUMNS = {
+    'anos': 'Ano_Vencimento',
+    'produtos': 'Tipo_Produto_Base',
+    'taxas': 'Tipo_Taxa',
+    'emissores': 'Emissor',
+    'ir': 'IR',
+}
+
+# Quantos índices manter em memória (um por relatório, mais o consolidado).
+MAX_INDEXES = 16
+
+class FilterIndex:
+    """
+    Índice de filtros sobre um DataFrame carregado: cada coluna de FILTER_COLUMNS
+    é fatorada uma única vez, e o filtro de um perfil vira comparações de códigos
+    inteiros em vez de 'isin' sobre textos a cada cliente.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self._codes = {}
+        for key, column in FILTER_COLUMNS.items():
+            codes, uniques = pd.factorize(df[column])
+            self._codes[key] = (codes, uniques, {value: i for i, value in enumerate(uniques)})
+        self._daily = df['Liquidez_Diaria'].to_numpy(dtype=bool)
+        self._ticket = pd.to_numeric(df['Aplicacao_Minima'], errors='coerce').to_numpy(dtype=float)
+
+    def _facet_mask(self, key, profile):
+        """Máscara de uma faceta, ou None se o perfil não a restringe."""
+        wanted = profile.get(key)
+        if not wanted or (key == 'anos' and profile.get('liquidez_diaria')):
+            return None
+        codes, _, lookup = self._codes[key]
+        values = [int(v) for v in wanted] if key == 'anos' else wanted
+        return np.isin(codes, [lookup[v] for v in values if v in lookup])
+
+    def _base_mask(self, profile):
+        mask = self._daily.copy() if profile.get('liquidez_diaria') else ~self._daily
+        if profile.get('aplicacao_maxima') is not None:
+            mask &= np.nan_to_num(self._ticket, nan=0.0) <= float(profile['aplicacao_maxima'])
+        return mask
+
+    def mask(self, profile):
+        """Máscara booleana das linhas que atendem ao perfil (mesma regra de routes.filter_dataframe)."""
+        mask = self._base_mask(profile)
+        for key in FILTER_COLUMNS:
+            facet = self._facet_mask(key, profile)
+            if facet is not None:
+                mask &= facet
+        return mask
+
+    def select(self, profile):
+        return self.df[self.mask(profile)]
+
+    def facet_counts(self, profile):
+        """
+        Contagens por valor de cada faceta dada a seleção do perfil. Cada faceta
+        é contada sob os filtros de todas as *outras* (a própria seleção não zera
+        as opções desmarcadas). Retorna (total, {chave: {valor: contagem}}).
+        """
+        base = self._base_mask(profile)
+        facets = {key: self._facet_mask(key, profile) for key in FILTER_COLUMNS}
+        total_mask = base.copy()
+        for facet in facets.values():
+            if facet is not None:
+                total_mask &= facet
+
+        counts = {}
+        for key in FILTER_COLUMNS:
+            mask = base.copy()
+            for other, facet in facets.items():
+                if other != key and facet is not None:
+                    mask &= facet
+            codes, uniques, _ = self._codes[key]
+            selected = codes[mask]
+            # Código -1 marca valores ausentes (NaN), que não viram opção do formulário.
+            bins = np.bincount(selected[selected >= 0], minlength=len(uniques))
+            counts[key] = {_label(value): int(n) for value, n in zip(uniques, bins)}
+        return int(total_mask.sum()), counts
+
+def _label(value):
+    # Anos vêm como inteiros numpy; as chaves do JSON são o texto exibido no formulário.
+    return str(int(value)) if isinstance(value, (int, np.integer)) else str(value)
+
+_lock = threading.Lock()
+_indexes = {}
+
+def get_filter_index(key, df):
+    """
+    Índice de `df` reaproveitado entre requisições. O cache de relatórios devolve
+    o mesmo objeto até o arquivo mudar; um DataFrame novo para a mesma chave
+    (recarga, upload, observador) reconstrói o índice.
+    """
+    with _lock:
+        cached = _indexes.get(key)
+        if cached is not None and cached.df is df:
+            return cached
+    index = FilterIndex(df)
+    with _lock:
+        _indexes.pop(key, None)
+        _indexes[key] = index
+        while len(_indexes) > MAX_INDEXES:
+            _indexes.pop(next(iter(_indexes)))
+    return index
@@ -0,0 +1,153 @@
+import os
+import re
+import logging
+import unicodedata
+from datetime import date, datetime
+
+logger = logging.getLogger(__name__)
+
+# --- Histórico de taxas (snapshots diários) ---
+# Cada relatório processado é gravado uma única vez por dia, em partições
+#   history/data=AAAA-MM-DD/categoria=<categoria>/<arquivo>.pkl
+# As colunas de texto repetitivo são gravadas como 'category' (codificação por
+# dicionário), o que deixa os snapshots compactos e rápidos de recarregar.
+# Partições nunca são reescritas: o histórico é somente de acréscimo.
+
+ENABLED = True
+
+# Pasta do histórico definida pela configuração (HISTORY_DIR); sem ela vale
+# REPORTS_HISTORY_DIR ou a pasta 'history' ao lado da pasta 'data'.
+HISTORY_DIR = None
+
+HISTORY_COLUMNS = ['Produto_Completo', 'Produto', 'Emissor', 'Tipo_Produto_Base', 'Categoria', 'Tipo_Taxa', 'IR',
+                   'Taxa_str', 'Taxa', 'Vencimento', 'Aplicacao_Minima', 'Roa', 'Liquidez_Diaria']
+CATEGORICAL_COLUMNS = ['Produto_Completo', 'Produto', 'Emissor', 'Tipo_Produto_Base', 'Categoria', 'Tipo_Taxa', 'IR',
+                       'Taxa_str']
+
+def get_history_dir():
+    """Retorna o caminho para a pasta 'history' (ou a indicada em HISTORY_DIR / REPORTS_HISTORY_DIR)."""
+    return (HISTORY_DIR or os.environ.get('REPORTS_HISTORY_DIR')
+            or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'history'))
+
+def _slug(text):
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^A-Za-z0-9]+', '_', text).strip('_').lower() or 'sem_nome'
+
+def snapshot_date_for(file_path):
+    """
+    Data do snapshot: usa o sufixo DDMM(AAAA) do nome do arquivo quando existir
+    (ex.: 'credito_bancario0509.xlsx' -> 05/09), senão a data de modificação.
+    """
+    modified = datetime.fromtimestamp(os.path.getmtime(file_path)).date()
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    match = re.search(r'(\d{2})(\d{2})(\d{4})?$', stem)
+    if match:
+        day, month, year = int(match.group(1)), int(match.group(2)), match.group(3)
+        try:
+            return date(int(year) if year else modified.year, month, day)
+        except ValueError:
+            pass
+    return modified
+
+def _partition_dir(snapshot_date, categoria):
+    return os.path.join(get_history_dir(), f"data={snapshot_date.isoformat()}", f"categoria={_slug(categoria)}")
+
+def append_snapshot(df, source_name, snapshot_date):
+    """
+    Grava o DataFrame processado no histórico, uma partição por categoria.
+    Partições já existentes para o mesmo dia e arquivo de origem são mantidas.
+    Retorna o número de linhas gravadas.
+    """
+    if df is None or df.empty:
+        return 0
+    columns = [c for c in HISTORY_COLUMNS if c in df.columns]
+    written = 0
+    for categoria, group in df[columns].groupby('Categoria', sort=False):
+        partition = _partition_dir(snapshot_date, categoria)
+        path = os.path.join(partition, f"{_slug(os.path.splitext(source_name)[0])}.pkl")
+        if os.path.exists(path):
+            continue
+        os.makedirs(partition, exist_ok=True)
+        snapshot = group.reset_index(drop=True)
+        for col in CATEGORICAL_COLUMNS:
+            if col in snapshot.columns:
+                snapshot[col] = snapshot[col].astype('category')
+        snapshot['Arquivo_Origem'] = source_name
+        snapshot['Arquivo_Origem'] = snapshot['Arquivo_Origem'].astype('category')
+        # Grava em arquivo temporário e renomeia, para nunca expor uma partição pela metade.
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        snapshot.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+        written += len(snapshot)
+    if written:
+        logger.info("Snapshot gravado no histórico.", extra={"fields": {
+            "arquivo": source_name, "data": snapshot_date.isoformat(), "linhas": written}})
+    return written
+
+def record_report(file_path, df):
+    """Registra no histórico o resultado de process_data para `file_path` (falhas só geram log)."""
+    if not ENABLED:
+        return 0
+    try:
+        return append_snapshot(df, os.path.basename(file_path), snapshot_date_for(file_path))
+    except Exception as e:
+        logger.error(f"Falha ao gravar snapshot no histórico: {e}", extra={"fields": {"arquivo": os.path.basename(file_path)}})
+        return 0
+
+def _iter_partitions(start=None, end=None, categorias=None):
+    root = get_history_dir()
+    if not os.path.isdir(root):
+        return
+    wanted = {_slug(c) for c in categorias} if categorias else None
+    for date_dir in sorted(os.listdir(root)):
+        if not date_dir.startswith('data='):
+            continue
+        snapshot_date = date.fromisoformat(date_dir[len('data='):])
+        if (start and snapshot_date < start) or (end and snapshot_date > end):
+            continue
+        for cat_dir in sorted(os.listdir(os.path.join(root, date_dir))):
+            if wanted is not None and cat_dir[len('categoria='):] not in wanted:
+                continue
+            partition = os.path.join(root, date_dir, cat_dir)
+            for name in sorted(os.listdir(partition)):
+                if name.endswith('.pkl'):
+                    yield snapshot_date, os.path.join(partition, name)
+
+def load_history(start=None, end=None, categorias=None, columns=None):
+    """
+    Carrega os snapshots no intervalo [start, end] (datas), apenas das
+    partições necessárias. Acrescenta a coluna 'Data_Snapshot'.
+    """
+    import pandas as pd
+    frames = []
+    for snapshot_date, path in _iter_partitions(start, end, categorias):
+        frame = pd.read_pickle(path)
+        if columns:
+            frame = frame[[c for c in columns if c in frame.columns]]
+        frame['Data_Snapshot'] = pd.Timestamp(snapshot_date)
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=(columns or HISTORY_COLUMNS) + ['Data_Snapshot'])
+    history = pd.concat(frames, ignore_index=True)
+    # O concat de categorias diferentes vira 'object'; recodifica para manter a compactação.
+    for col in CATEGORICAL_COLUMNS + ['Arquivo_Origem']:
+        if col in history.columns and history[col].dtype == object:
+            history[col] = history[col].astype('category')
+    return history
+
+def rate_history(produto_completo=None, produto=None, emissor=None, start=None, end=None):
+    """Série histórica de 'Taxa' de um produto (filtros combinados com E), ordenada por data."""
+    import pandas as pd
+    history = load_history(start, end, columns=['Produto_Completo', 'Produto', 'Emissor', 'Vencimento', 'Taxa_str', 'Taxa'])
+    if history.empty:
+        return history
+    mask = pd.Series(True, index=history.index)
+    if produto_completo:
+        mask &= history['Produto_Completo'] == produto_completo
+    if produto:
+        mask &= history['Produto'] == produto
+    if emissor:
+        # Snapshots antigos podem ter o nome bruto: compara pelo emissor canônico.
+        from .issuers import canonical_name, canonical_names
+        mask &= canonical_names(history['Emissor'].astype(object)) == canonical_name(emissor)
+    return history[mask].sort_values(['Data_Snapshot', 'Vencimento']).reset_index(drop=True)
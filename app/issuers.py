@@ -0,0 +1,184 @@
+import re
+import threading
+import unicodedata
+
+# --- Registro canônico de emissores ---
+# O mesmo emissor aparece como "Banco Daycoval", "Daycoval" ou "BANCO DAYCOVAL
+# S.A." conforme a planilha. Aqui cada nome bruto é mapeado para um emissor
+# canônico (id + nome de exibição), usado pelo data_processor, pelo scraper, e
+# portanto pelos filtros, pela deduplicação e pelo limite por emissor.
+#
+# A resolução de um nome segue, nesta ordem:
+#   1. chave normalizada (sem acentos, pontuação, "Banco", "S.A." etc.) igual à
+#      de um apelido registrado;
+#   2. o mais longo apelido registrado que seja prefixo, em palavras, da chave
+#      ("C6 CONSIGNADO" -> C6);
+#   3. similaridade de trigramas (Jaccard) com um apelido registrado, acima de
+#      SIMILARITY_THRESHOLD, pelo índice invertido trigrama -> apelidos.
+# Nomes sem correspondência viram o próprio emissor, identificado pela chave
+# normalizada; assim "VALE S.A." e "Vale SA" já se juntam. O nome de exibição
+# desse emissor é o primeiro nome bruto visto com aquela chave (a chave só serve
+# para comparar). O resultado de cada nome bruto fica memorizado: depois do
+# aquecimento a consulta é um acesso a dict.
+
+# id -> (nome de exibição, apelidos, slug em bancodata.com.br ou None)
+REGISTRY = {
+    'btg-pactual': ('BTG Pactual', ['Banco BTG Pactual', 'BTG'], None),
+    'daycoval': ('Daycoval', ['Banco Daycoval'], None),
+    'c6': ('C6', ['Banco C6', 'Banco C6 Consignado', 'C6 Bank', 'C6 Consignado'], 'banco-c6'),
+    'bmg': ('BMG', ['Banco BMG'], None),
+    'agibank': ('Agibank', ['Banco Agibank'], None),
+    'abc-brasil': ('ABC Brasil', ['Banco ABC', 'Banco ABC Brasil'], 'banco-abc-brasil'),
+    'randon': ('Randon', ['Banco Randon'], 'banco-randon'),
+    'bndes': ('BNDES', ['Banco Nacional de Desenvolvimento Econômico e Social',
+                        'BANCO NACIONAL DE DESENVOLVIMENTO ECONOMICO E SOCI'], 'bndes'),
+    'agrolend': ('Agrolend', ['Agrolend SCFI'], 'agrolend'),
+    'bdmg': ('BDMG', ['Banco de Desenvolvimento de Minas Gerais'], None),
+    'genial': ('Genial', ['Banco Genial'], None),
+    'xp': ('XP', ['Banco XP', 'XP Investimentos'], None),
+    'fibra': ('Fibra', ['Banco Fibra'], None),
+    'haitong': ('Haitong', ['Banco Haitong'], None),
+    'master': ('Master', ['Banco Master'], None),
+    'omni': ('Omni', ['Omni Banco', 'Omni CFI'], None),
+    'pine': ('Pine', ['Banco Pine'], None),
+    'rodobens': ('Rodobens', ['Banco Rodobens'], None),
+    'voiter': ('Voiter', ['Banco Voiter'], None),
+    'digimais': ('Digimais', ['Banco Digimais'], None),
+    'facta': ('Facta', ['Facta Financeira'], None),
+    'will-bank': ('Will Bank', ['Will Bank CFI'], None),
+    'tesouro-nacional': ('Tesouro Nacional', [], None),
+    'andbank': ('Andbank', [], None),
+}
+
+SIMILARITY_THRESHOLD = 0.6
+
+# Palavras que não distinguem um emissor de outro.
+_STOPWORDS = {'BANCO', 'BCO', 'S', 'A', 'SA', 'CFI', 'SCFI', 'LTDA', 'CIA', 'COMPANHIA',
+              'DE', 'DO', 'DA', 'DOS', 'DAS', 'E'}
+
+_lock = threading.Lock()
+_aliases = {}      # chave normalizada do apelido -> id
+_trigrams = {}     # trigrama -> {chave de apelido}
+_gram_counts = {}  # chave de apelido -> nº de trigramas
+_resolved = {}     # nome bruto -> (id, nome de exibição)
+_unmatched = {}    # chave de um emissor fora do registro -> (id, primeiro nome bruto visto)
+_keywords = None   # nomes e apelidos registrados, para localizar o emissor no texto do produto
+
+def normalize_issuer(name):
+    """Chave de comparação: maiúsculas, sem acentos, pontuação nem palavras genéricas."""
+    text = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode('ascii').upper()
+    tokens = re.sub(r'[^A-Z0-9]+', ' ', text).split()
+    return ' '.join(t for t in tokens if t not in _STOPWORDS)
+
+def _grams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _index_alias(issuer_id, alias):
+    key = normalize_issuer(alias)
+    if not key:
+        return
+    _aliases[key] = issuer_id
+    grams = _grams(key)
+    _gram_counts[key] = len(grams)
+    for gram in grams:
+        _trigrams.setdefault(gram, set()).add(key)
+
+def register(issuer_id, name, aliases=(), slug=None):
+    """Acrescenta (ou amplia) um emissor canônico. Limpa as resoluções memorizadas."""
+    global _keywords
+    with _lock:
+        if not _aliases:
+            _build_index()
+        current = REGISTRY.get(issuer_id)
+        merged = list(current[1]) if current else []
+        merged += [a for a in aliases if a not in merged]
+        REGISTRY[issuer_id] = (name, merged, slug or (current[2] if current else None))
+        for alias in [name, *merged]:
+            _index_alias(issuer_id, alias)
+        _resolved.clear()
+        _keywords = None
+
+def _build_index():
+    for issuer_id, (name, aliases, _) in REGISTRY.items():
+        for alias in [name, *aliases]:
+            _index_alias(issuer_id, alias)
+
+def _match(key):
+    if key in _aliases:
+        return _aliases[key]
+    tokens = key.split()
+    for n in range(len(tokens) - 1, 0, -1):
+        prefix = ' '.join(tokens[:n])
+        if prefix in _aliases:
+            return _aliases[prefix]
+    grams = _grams(key)
+    shared = {}
+    for gram in grams:
+        for alias_key in _trigrams.get(gram, ()):
+            shared[alias_key] = shared.get(alias_key, 0) + 1
+    best, best_score = None, SIMILARITY_THRESHOLD
+    for alias_key, common in shared.items():
+        score = common / (len(grams) + _gram_counts[alias_key] - common)
+        if score >= best_score:
+            best, best_score = alias_key, score
+    return _aliases[best] if best else None
+
+def resolve(name):
+    """Retorna (id, nome de exibição) do emissor canônico de `name`."""
+    cached = _resolved.get(name)
+    if cached is not None:
+        return cached
+    if not isinstance(name, str) or name.strip() in ('', 'N/A'):
+        return (None, name)
+    key = normalize_issuer(name)
+    with _lock:
+        if not _aliases:
+            _build_index()
+        issuer_id = _match(key) if key else None
+        if issuer_id is not None:
+            result = (issuer_id, REGISTRY[issuer_id][0])
+        else:
+            # Só palavras genéricas ("Banco", "BANCO") não têm chave: compara a grafia.
+            key = key or name.strip().upper()
+            result = _unmatched.get(key)
+            if result is None:
+                result = _unmatched[key] = (key.lower().replace(' ', '-'), ' '.join(name.split()))
+        _resolved[name] = result
+    return result
+
+def issuer_keywords():
+    """
+    Nomes de exibição e apelidos registrados, usados pelo data_processor para
+    achar onde o emissor começa em 'Produto_Completo'. A tupla só muda quando
+    register() amplia o registro.
+    """
+    global _keywords
+    keywords = _keywords
+    if keywords is None:
+        with _lock:
+            names = {alias for name, aliases, _ in REGISTRY.values() for alias in [name, *aliases]}
+            keywords = _keywords = tuple(sorted(names, key=lambda n: (-len(n), n)))
+    return keywords
+
+def canonical_name(name):
+    return resolve(name)[1]
+
+def canonical_names(names):
+    """Versão em lote para uma Series: cada nome distinto é resolvido uma única vez."""
+    import numpy as np
+    import pandas as pd
+    codes, uniques = pd.factorize(names, use_na_sentinel=False)
+    resolved = np.array([canonical_name(v) for v in uniques] or [None], dtype=object)
+    return pd.Series(resolved[codes], index=names.index)
+
+def issuer_slug(name):
+    """Slug do emissor em bancodata.com.br: o registrado, ou derivado do nome canônico."""
+    issuer_id, display = resolve(name)
+    slug = REGISTRY[issuer_id][2] if issuer_id in REGISTRY else None
+    if slug:
+        return slug
+    text = unicodedata.normalize('NFKD', str(display)).encode('ascii', 'ignore').decode('ascii').lower()
+    text = re.sub(r'banco', '', text).strip()
+    text = re.sub(r'[^a-z0-9\s-]', '', text)
+    return re.sub(r'\s+', '-', text)
@@ -0,0 +1,92 @@
+import math
+import numpy as np
+import pandas as pd
+
+# --- Escada de vencimentos ---
+# Dado um valor a investir e os anos-alvo, divide o valor igualmente entre os
+# anos (os "degraus") e, em cada degrau, aloca nos ativos de maior taxa que
+# vencem naquele ano, respeitando a aplicação mínima de cada ativo e um limite
+# opcional por emissor (ex.: R$ 250 mil de cobertura do FGC), somado em toda a
+# escada.
+#
+# A parte pesada é vetorizada: elegibilidade (ano-alvo, taxa válida, aplicação
+# mínima que cabe no degrau) e a ordenação por (ano, -taxa) saem de máscaras e
+# de um único np.lexsort sobre o DataFrame filtrado. O preenchimento guloso de
+# cada degrau percorre os candidatos já ordenados e para assim que o degrau está
+# cheio, normalmente depois de um ou dois ativos.
+
+ALLOCATION_COLUMN = 'Valor_Alocado'
+
+def _floor_cents(value):
+    return math.floor(value * 100) / 100
+
+def build_ladder(df, amount, years, rank_by='Taxa_Anual', issuer_limit=None):
+    """
+    Monta a escada sobre `df` (já filtrado). Retorna (alocações, resumo):
+    alocações é um DataFrame com as linhas escolhidas de `df` mais a coluna
+    'Valor_Alocado', ordenado por vencimento; resumo é um dict com o total
+    alocado, o que sobrou sem ativo elegível e a taxa média ponderada
+    (em `rank_by`), no geral e por ano.
+    """
+    years = sorted({int(y) for y in years})
+    if amount <= 0 or not years:
+        raise ValueError("Informe um valor positivo e ao menos um ano de vencimento.")
+    # Degraus iguais; os centavos do arredondamento ficam no último.
+    rung = _floor_cents(amount / len(years))
+    rungs = [rung] * (len(years) - 1) + [round(amount - rung * (len(years) - 1), 2)]
+
+    if df.empty or rank_by not in df.columns:
+        candidates = df.iloc[0:0]
+    else:
+        rate = pd.to_numeric(df[rank_by], errors='coerce').to_numpy(dtype=float)
+        minimum = np.nan_to_num(pd.to_numeric(df['Aplicacao_Minima'], errors='coerce').to_numpy(dtype=float), nan=0.0)
+        year = df['Ano_Vencimento'].to_numpy()
+        eligible = (~df['Liquidez_Diaria'].to_numpy(dtype=bool) & np.isin(year, years)
+                    & ~np.isnan(rate) & (minimum <= max(rungs)))
+        positions = np.flatnonzero(eligible)
+        order = positions[np.lexsort((-rate[positions], year[positions]))]
+        candidates = df.iloc[order]
+
+    issuer_room = {}
+    chosen, allocated = [], []
+    per_year = []
+    if not candidates.empty:
+        year_values = candidates['Ano_Vencimento'].to_numpy()
+        minimums = np.nan_to_num(pd.to_numeric(candidates['Aplicacao_Minima'], errors='coerce').to_numpy(dtype=float), nan=0.0)
+        issuers = candidates['Emissor'].to_numpy()
+        bounds = np.searchsorted(year_values, years + [years[-1] + 1])
+    for i, (target, rung) in enumerate(zip(years, rungs)):
+        remaining = rung
+        rung_rows, rung_values = [], []
+        if not candidates.empty:
+            for pos in range(bounds[i], bounds[i + 1]):
+                if remaining < 0.01:
+                    break
+                room = issuer_room.get(issuers[pos], issuer_limit if issuer_limit else math.inf)
+                value = _floor_cents(min(remaining, room))
+                if value <= 0 or value < minimums[pos]:
+                    continue
+                rung_rows.append(pos)
+                rung_values.append(value)
+                remaining = round(remaining - value, 2)
+                issuer_room[issuers[pos]] = room - value
+        chosen += rung_rows
+        allocated += rung_values
+        rates = candidates[rank_by].iloc[rung_rows].to_numpy(dtype=float) if rung_rows else np.empty(0)
+        total = sum(rung_values)
+        per_year.append({
+            'ano': target, 'alocado': round(total, 2), 'nao_alocado': round(rung - total, 2),
+            'taxa_media': float(np.dot(rates, rung_values) / total) if total else None,
+        })
+
+    allocations = candidates.iloc[chosen].assign(**{ALLOCATION_COLUMN: allocated})
+    if not allocations.empty:
+        allocations = allocations.sort_values(['Vencimento', ALLOCATION_COLUMN], ascending=[True, False])
+    total = round(sum(allocated), 2)
+    weighted = (float(np.dot(allocations[rank_by].to_numpy(dtype=float), allocations[ALLOCATION_COLUMN].to_numpy()) / total)
+                if total else None)
+    summary = {
+        'valor': round(float(amount), 2), 'alocado': total, 'nao_alocado': round(float(amount) - total, 2),
+        'taxa_media': weighted, 'coluna_taxa': rank_by, 'limite_emissor': issuer_limit, 'por_ano': per_year,
+    }
+    return allocations, summary
@@ -0,0 +1,32 @@
+import logging
+
+class KeyValueFormatter(logging.Formatter):
+    """
+    Formatter estruturado: acrescenta à mensagem os campos passados em
+    `extra={"fields": {...}}`, no formato chave=valor (fácil de filtrar com grep
+    ou de ingerir em agregadores de log).
+    """
+
+    def format(self, record):
+        message = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            message += " " + " ".join(f"{key}={_format_field(value)}" for key, value in fields.items())
+        return message
+
+def _format_field(value):
+    if isinstance(value, float):
+        return f"{value:.4f}"
+    text = str(value)
+    return f'"{text}"' if (" " in text or not text) else text
+
+def configure_logging(level=logging.INFO):
+    """Configura o logger 'app' (uma única vez) com saída estruturada em stderr."""
+    logger = logging.getLogger("app")
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(KeyValueFormatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+    logger.setLevel(level)
+    return logger
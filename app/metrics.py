@@ -0,0 +1,149 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# --- Instrumentação (métricas no formato texto do Prometheus) ---
+# Implementação mínima, sem dependências externas: contadores e histogramas
+# com rótulos, mantidos em memória por processo e expostos em '/metrics'.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry_lock = threading.Lock()
+_registry = []
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(label_key):
+    if not label_key:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in label_key) + "}"
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Contador monotônico com rótulos."""
+    kind = "counter"
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        self._values = {}
+        with _registry_lock:
+            _registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(_label_key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in sorted(self._values.items())]
+
+
+class Histogram:
+    """Histograma cumulativo com rótulos (buckets fixos)."""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._lock = threading.Lock()
+        self._values = {}
+        with _registry_lock:
+            _registry.append(self)
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, upper in enumerate(self.buckets):
+                if value <= upper:
+                    state["counts"][i] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    def samples(self):
+        rows = []
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                for upper, count in zip(self.buckets, state["counts"]):
+                    rows.append((f"{self.name}_bucket", key + (("le", _format_value(upper)),), count))
+                rows.append((f"{self.name}_sum", key, state["sum"]))
+                rows.append((f"{self.name}_count", key, state["count"]))
+        return rows
+
+
+class _Timing:
+    __slots__ = ("elapsed",)
+
+    def __init__(self):
+        self.elapsed = 0.0
+
+
+@contextmanager
+def timer(histogram, **labels):
+    """
+    Mede a duração de um bloco e a registra em `histogram`. O objeto devolvido
+    expõe `elapsed` (segundos) após o término, útil para logs estruturados.
+    """
+    result = _Timing()
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result.elapsed = time.perf_counter() - start
+        histogram.observe(result.elapsed, **labels)
+
+def render_prometheus():
+    """Gera o texto de exposição (formato 0.0.4) de todas as métricas registradas."""
+    with _registry_lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, key, value in metric.samples():
+            lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# --- Métricas da ingestão de relatórios ---
+INGESTION_STAGE_SECONDS = Histogram(
+    "ingestion_stage_seconds",
+    "Tempo gasto em cada etapa da ingestão (read_excel, header_detection, public_bonds_alignment ou "
+    "read_excel_data, processor, enrichment).",
+)
+INGESTION_PROCESSOR_SECONDS = Histogram(
+    "ingestion_processor_seconds",
+    "Tempo gasto por cada processador especialista.",
+)
+INGESTION_ROWS_IN = Counter("ingestion_rows_in_total", "Linhas recebidas por etapa da ingestão.")
+INGESTION_ROWS_OUT = Counter("ingestion_rows_out_total", "Linhas entregues por etapa da ingestão.")
+INGESTION_ROWS_DROPPED = Counter("ingestion_rows_dropped_total", "Linhas descartadas por etapa da ingestão.")
+INGESTION_FILES = Counter("ingestion_files_total", "Arquivos processados, por processador e resultado.")
+
+def record_rows(stage, rows_in, rows_out):
+    """Registra os contadores de linhas de entrada/saída/descartadas de uma etapa."""
+    INGESTION_ROWS_IN.inc(rows_in, stage=stage)
+    INGESTION_ROWS_OUT.inc(rows_out, stage=stage)
+    INGESTION_ROWS_DROPPED.inc(max(rows_in - rows_out, 0), stage=stage)
@@ -4,9 +4,10 @@ import pandas as pd
 import os
 
 class PDF(FPDF):
-    def __init__(self, logo_path, *args, **kwargs):
+    def __init__(self, logo_path, *args, report_title="Relatório de Ativos de Renda Fixa", **kwargs):
         super().__init__(*args, **kwargs)
         self.logo_path = logo_path
+        self.report_title = report_title
         self.set_auto_page_break(auto=True, margin=15)
 
     def header(self):
@@ -17,7 +18,7 @@ class PDF(FPDF):
             self.set_font("Arial", "B", 16); self.set_text_color(*ethimos_blue_dark)
             self.cell(0, 10, "Ethimos Investimentos", 0, 1, "L")
         self.set_font("Arial", "B", 18); self.set_text_color(*ethimos_blue_dark)
-        self.cell(0, 20, "Relatório de Ativos de Renda Fixa", 0, 1, "C")
+        self.cell(0, 20, self.report_title, 0, 1, "C")
         self.ln(5)
 
     def footer(self):
@@ -26,7 +27,10 @@ class PDF(FPDF):
         self.set_x(-75)
         self.cell(0, 10, f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M')}", 0, 0, "R")
 
-def create_pdf_report(data: pd.DataFrame, include_roa: bool, logo_path: str):
+def create_pdf_report(data, include_roa: bool, logo_path: str):
+    """`data` é o DataFrame de find_best_assets ou o ResultView já montado (view_models)."""
+    from .view_models import as_result_view
+    view = as_result_view(data, include_roa)
     pdf = PDF(logo_path=logo_path, orientation='L', unit='mm', format='A4')
     pdf.add_page()
 
@@ -37,44 +41,125 @@ def create_pdf_report(data: pd.DataFrame, include_roa: bool, logo_path: str):
     else:
         col_widths = {"Produto": 65, "Emissor": 65, "Vencimento": 25, "Taxa": 35, "IR": 20, "Apl. Mínima": 35}
 
-    def render_table(df_group, is_advisor):
+    def render_table(rows, is_advisor):
         pdf.set_font("Arial", "B", 9); pdf.set_fill_color(*ethimos_blue_medium); pdf.set_text_color(255, 255, 255)
         for header, width in col_widths.items():
             pdf.cell(width, 8, header, 0, 0, "C", fill=True)
         pdf.ln()
 
         pdf.set_font("Arial", "", 8); pdf.set_text_color(0, 0, 0)
-        for _, row in df_group.iterrows():
-            pdf.cell(col_widths["Produto"], 8, str(row["Produto"])[:35], 1, 0, "L")
-            pdf.cell(col_widths["Emissor"], 8, str(row["Emissor_Display"])[:35], 1, 0, "L")
-            pdf.cell(col_widths["Vencimento"], 8, row["Vencimento"].strftime("%d/%m/%Y"), 1, 0, "C")
-            pdf.cell(col_widths["Taxa"], 8, str(row["Taxa_str"]), 1, 0, "C")
-            pdf.cell(col_widths["IR"], 8, str(row["IR"]), 1, 0, "C")
-            app_min_str = f"R$ {row['Aplicacao_Minima']:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") if pd.notna(row['Aplicacao_Minima']) else ""
-            pdf.cell(col_widths["Apl. Mínima"], 8, app_min_str, 1, 0, "R")
+        for row in rows:
+            pdf.cell(col_widths["Produto"], 8, row.produto[:35], 1, 0, "L")
+            pdf.cell(col_widths["Emissor"], 8, row.emissor[:35], 1, 0, "L")
+            pdf.cell(col_widths["Vencimento"], 8, row.vencimento, 1, 0, "C")
+            pdf.cell(col_widths["Taxa"], 8, row.taxa, 1, 0, "C")
+            pdf.cell(col_widths["IR"], 8, row.ir, 1, 0, "C")
+            pdf.cell(col_widths["Apl. Mínima"], 8, row.aplicacao_minima, 1, 0, "R")
             if is_advisor:
-                roa_percent = f"{row['Roa']*100:.2f}%".replace(".", ",") if pd.notna(row['Roa']) else ""
-                pdf.cell(col_widths["ROA"], 8, roa_percent, 1, 0, "C")
+                pdf.cell(col_widths["ROA"], 8, row.roa, 1, 0, "C")
             pdf.ln()
 
-    liquidez_imediata_assets = data[data.Sem_Carencia == True]
-    liquidez_diaria_assets = data[(data.Liquidez_Diaria == True) & (data.Sem_Carencia == False)]
-    prazo_assets = data[data.Liquidez_Diaria == False]
-    
-    if not liquidez_imediata_assets.empty:
+    for section in view.secoes:
         pdf.ln(5); pdf.set_font("Arial", "B", 14); pdf.set_text_color(*ethimos_blue_dark)
-        pdf.cell(0, 12, "Liquidez Imediata (sem carência)", 0, 1, "L"); pdf.ln(2)
-        render_table(liquidez_imediata_assets, include_roa)
+        pdf.cell(0, 12, section.titulo, 0, 1, "L"); pdf.ln(2)
+        render_table(section.linhas, include_roa)
 
-    if not liquidez_diaria_assets.empty:
+    return pdf.output(dest="S").encode("latin-1")
+
+def create_diff_pdf_report(diff: dict, base_label: str, target_label: str, logo_path: str):
+    """PDF com as mudanças entre dois relatórios (saída de report_diff.diff_reports)."""
+    pdf = PDF(logo_path=logo_path, orientation='L', unit='mm', format='A4', report_title="Mudanças entre Relatórios")
+    pdf.add_page()
+
+    ethimos_blue_dark = (0, 32, 96); ethimos_blue_medium = (0, 51, 153)
+
+    pdf.set_font("Arial", "", 10); pdf.set_text_color(0, 0, 0)
+    pdf.cell(0, 8, f"Anterior: {base_label}    Atual: {target_label}", 0, 1, "C")
+
+    def render_section(title, df, columns):
         pdf.ln(5); pdf.set_font("Arial", "B", 14); pdf.set_text_color(*ethimos_blue_dark)
-        pdf.cell(0, 12, "Ativos com Liquidez Diária", 0, 1, "L"); pdf.ln(2)
-        render_table(liquidez_diaria_assets, include_roa)
+        pdf.cell(0, 12, f"{title} ({len(df)})", 0, 1, "L"); pdf.ln(2)
+        if df.empty:
+            pdf.set_font("Arial", "I", 9); pdf.set_text_color(100, 100, 100)
+            pdf.cell(0, 8, "Nenhum ativo.", 0, 1, "L")
+            return
+        pdf.set_font("Arial", "B", 9); pdf.set_fill_color(*ethimos_blue_medium); pdf.set_text_color(255, 255, 255)
+        for header, width, _, _ in columns:
+            pdf.cell(width, 8, header, 0, 0, "C", fill=True)
+        pdf.ln()
+        pdf.set_font("Arial", "", 8); pdf.set_text_color(0, 0, 0)
+        for _, row in df.iterrows():
+            for _, width, render, align in columns:
+                pdf.cell(width, 8, render(row), 1, 0, align)
+            pdf.ln()
+
+    def text(col, limit=40):
+        return lambda row: str(row[col])[:limit] if pd.notna(row[col]) else ""
+    def date(row):
+        return row["Vencimento"].strftime("%d/%m/%Y")
+    def delta(row):
+        return f"{row['Delta_Taxa']:+.2f} p.p.".replace(".", ",")
+
+    asset_columns = [("Produto", 70, text("Produto"), "L"), ("Emissor", 70, text("Emissor_Display"), "L"),
+                     ("Vencimento", 30, date, "C"), ("Taxa", 40, text("Taxa_str"), "C"), ("IR", 30, text("IR"), "C")]
+    repricing_columns = [("Produto", 60, text("Produto", 35), "L"), ("Emissor", 60, text("Emissor_Display", 35), "L"),
+                         ("Vencimento", 25, date, "C"), ("Taxa Anterior", 40, text("Taxa_str_Anterior"), "C"),
+                         ("Taxa Atual", 40, text("Taxa_str_Atual"), "C"), ("Variação", 30, delta, "C")]
+
+    render_section("Ativos Reprecificados", diff["reprecificados"], repricing_columns)
+    render_section("Novos Ativos", diff["novos"], asset_columns)
+    render_section("Ativos Removidos", diff["removidos"], asset_columns)
 
-    if not prazo_assets.empty:
-        for year, group in prazo_assets.groupby('Ano_Vencimento'):
-            pdf.ln(5); pdf.set_font("Arial", "B", 14); pdf.set_text_color(*ethimos_blue_dark)
-            pdf.cell(0, 12, f"Ano de Vencimento: {int(year)}", 0, 1, "L"); pdf.ln(2)
-            render_table(group, include_roa)
+    return pdf.output(dest="S").encode("latin-1")
+
+def create_ladder_pdf_report(allocations: pd.DataFrame, summary: dict, logo_path: str):
+    """PDF da escada de vencimentos (saída de ladder.build_ladder)."""
+    pdf = PDF(logo_path=logo_path, orientation='L', unit='mm', format='A4', report_title="Escada de Vencimentos")
+    pdf.add_page()
+
+    ethimos_blue_dark = (0, 32, 96); ethimos_blue_medium = (0, 51, 153)
+
+    def brl(value):
+        return f"R$ {value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    def pct(value):
+        return f"{value:.2f}%".replace(".", ",") if value is not None and pd.notna(value) else "-"
+
+    pdf.set_font("Arial", "", 10); pdf.set_text_color(0, 0, 0)
+    line = f"Valor: {brl(summary['valor'])}    Alocado: {brl(summary['alocado'])}    Taxa média ponderada: {pct(summary['taxa_media'])}"
+    if summary.get('limite_emissor'):
+        line += f"    Limite por emissor: {brl(summary['limite_emissor'])}"
+    pdf.cell(0, 8, line, 0, 1, "C")
+    if summary['nao_alocado'] >= 0.01:
+        pdf.set_text_color(187, 45, 59)
+        pdf.cell(0, 8, f"{brl(summary['nao_alocado'])} sem ativo elegível.", 0, 1, "C")
+
+    columns = [("Produto", 55, lambda row: str(row["Produto"])[:32], "L"),
+               ("Emissor", 55, lambda row: str(row["Emissor_Display"])[:32], "L"),
+               ("Vencimento", 25, lambda row: row["Vencimento"].strftime("%d/%m/%Y"), "C"),
+               ("Taxa", 35, lambda row: str(row["Taxa_str"]), "C"),
+               ("Taxa Anual", 25, lambda row: pct(row[summary['coluna_taxa']]), "C"),
+               ("IR", 20, lambda row: str(row["IR"]), "C"),
+               ("Valor Alocado", 35, lambda row: brl(row["Valor_Alocado"]), "R")]
+
+    for rung in summary['por_ano']:
+        pdf.ln(5); pdf.set_font("Arial", "B", 14); pdf.set_text_color(*ethimos_blue_dark)
+        title = f"{rung['ano']}: {brl(rung['alocado'])}"
+        if rung['taxa_media'] is not None:
+            title += f" a {pct(rung['taxa_media'])}"
+        pdf.cell(0, 12, title, 0, 1, "L"); pdf.ln(2)
+        group = allocations[allocations['Ano_Vencimento'] == rung['ano']] if not allocations.empty else allocations
+        if group.empty:
+            pdf.set_font("Arial", "I", 9); pdf.set_text_color(100, 100, 100)
+            pdf.cell(0, 8, "Nenhum ativo elegível para este ano.", 0, 1, "L")
+            continue
+        pdf.set_font("Arial", "B", 9); pdf.set_fill_color(*ethimos_blue_medium); pdf.set_text_color(255, 255, 255)
+        for header, width, _, _ in columns:
+            pdf.cell(width, 8, header, 0, 0, "C", fill=True)
+        pdf.ln()
+        pdf.set_font("Arial", "", 8); pdf.set_text_color(0, 0, 0)
+        for _, row in group.iterrows():
+            for _, width, render, align in columns:
+                pdf.cell(width, 8, render(row), 1, 0, align)
+            pdf.ln()
 
-    return pdf.output(dest="S").encode("latin-1")
\ No newline at end of file
+    return pdf.output(dest="S").encode("latin-1")
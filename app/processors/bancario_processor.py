@@ -1,5 +1,8 @@
 import pandas as pd
 import re
+import logging
+
+logger = logging.getLogger(__name__)
 
 def process(df):
     """
@@ -13,7 +16,7 @@ def process(df):
     if not (is_bancario_candidate):
         raise ValueError("Este não parece ser um relatório de Crédito Bancário.")
 
-    print("INFO: Usando o processador de Crédito Bancário.")
+    logger.info("Usando o processador de Crédito Bancário.")
     
     column_map = {'produto': 'produto', 'taxa': 'taxa', 'prazo/vencimento': 'prazovencimento', 'aplicação mínima': 'aplicaominima', 'roa': 'roa'}
 
@@ -1,5 +1,8 @@
 import pandas as pd
 import re
+import logging
+
+logger = logging.getLogger(__name__)
 
 def process(df):
     """
@@ -8,7 +11,7 @@ def process(df):
     if df.to_string().upper().count('COMPROMISSADA') == 0:
          raise ValueError("Não é um relatório de Compromissadas.")
          
-    print("INFO: Usando o processador de Compromissadas.")
+    logger.info("Usando o processador de Compromissadas.")
     df.dropna(how='all', inplace=True)
     
     # **CORREÇÃO: As chaves agora são o nome exato do cabeçalho em minúsculas.**
@@ -1,9 +1,12 @@
 import pandas as pd
 import re
+import logging
+
+logger = logging.getLogger(__name__)
 
 def process(df):
     """Processador especializado para relatórios de Debêntures."""
-    print("INFO: Usando o processador de Debêntures.")
+    logger.info("Usando o processador de Debêntures.")
     df.dropna(how='all', inplace=True)
     column_map = {'ativo': 'produto','vencimento': 'vencimento','rentabilidade anual': 'taxa','ir': 'ir','aplicação mínima': 'aplicaominima','roa': 'roa'}
     new_columns = {col: column_map[str(col).lower().strip()] for col in df.columns if str(col).lower().strip() in column_map}
@@ -1,5 +1,8 @@
 import pandas as pd
 import re
+import logging
+
+logger = logging.getLogger(__name__)
 
 def process(df):
     """
@@ -9,7 +12,7 @@ def process(df):
     if df.to_string().upper().count('CRA') + df.to_string().upper().count('CRI') == 0:
          raise ValueError("Arquivo não contém 'CRA' ou 'CRI'.")
 
-    print("INFO: Usando o processador de Crédito Privado.")
+    logger.info("Usando o processador de Crédito Privado.")
     df.dropna(how='all', inplace=True)
     
     # **CORREÇÃO: As chaves agora são o nome exato do cabeçalho em minúsculas.**
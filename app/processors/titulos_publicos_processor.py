@@ -1,12 +1,15 @@
 import pandas as pd
 import re
+import logging
+
+logger = logging.getLogger(__name__)
 
 def process(df):
     """
     Processador especializado para relatórios de Títulos Públicos.
     O DataFrame já deve vir alinhado pelo data_processor.
     """
-    print("INFO: Usando o processador de Títulos Públicos.")
+    logger.info("Usando o processador de Títulos Públicos.")
     
     df.dropna(how='all', inplace=True)
 
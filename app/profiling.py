@@ -0,0 +1,100 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import time
+import uuid
+from flask import Response, current_app, g, request
+from .metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Latência das requisições por rota, método e status.",
+)
+
+# Valores aceitos em '?profile=' ou no cabeçalho 'X-Profile'.
+#   text  -> a resposta é substituída pelo relatório do cProfile (texto)
+#   store -> o perfil é gravado em PROFILE_DIR e o id volta no cabeçalho 'X-Profile-Id'
+PROFILE_MODES = ('text', 'store')
+
+def get_profile_dir():
+    return current_app.config.get('PROFILE_DIR') or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'profiles')
+
+def _requested_profile_mode():
+    if not current_app.config.get('PROFILING_ENABLED'):
+        return None
+    mode = request.args.get('profile') or request.headers.get('X-Profile')
+    if mode in ('1', 'true'):
+        mode = 'store'
+    return mode if mode in PROFILE_MODES else None
+
+def _before_request():
+    g._request_started_at = time.perf_counter()
+    mode = _requested_profile_mode()
+    if mode:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Outro profiler já está ativo (ex.: requisição concorrente perfilada).
+            logger.warning("Profiler já ativo; requisição não será perfilada.", extra={"fields": {"rota": request.path}})
+            return
+        g._profiler = profiler
+        g._profile_mode = mode
+        g._profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{(request.endpoint or 'rota').replace('.', '_')}-{uuid.uuid4().hex[:8]}"
+
+def _after_request(response):
+    profiler = g.get('_profiler')
+    if profiler is not None:
+        if g._profile_mode == 'text':
+            # Único caso que precisa da resposta: ela é trocada pelo relatório.
+            profiler.disable()
+            g.pop('_profiler')
+            response = _text_profile_response(profiler, response.status_code)
+        else:
+            # O perfil é gravado em _teardown_request, que roda mesmo se a view falhar.
+            response.headers['X-Profile-Id'] = g._profile_id
+
+    started_at = g.pop('_request_started_at', None)
+    if started_at is not None:
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started_at,
+            endpoint=request.endpoint or 'desconhecido', method=request.method, status=response.status_code,
+        )
+    return response
+
+def _teardown_request(exc):
+    # after_request não roda quando a view levanta uma exceção não tratada; aqui
+    # o profiler é sempre desligado (senão continuaria ativo nesta thread) e o
+    # perfil gravado, inclusive o de uma requisição 'text' que falhou.
+    profiler = g.pop('_profiler', None)
+    if profiler is None:
+        return
+    profiler.disable()
+    profile_dir = get_profile_dir()
+    os.makedirs(profile_dir, exist_ok=True)
+    path = os.path.join(profile_dir, f"{g._profile_id}.prof")
+    profiler.dump_stats(path)
+    fields = {"rota": request.path, "arquivo": path}
+    if exc is not None:
+        fields["erro"] = type(exc).__name__
+    logger.info("Perfil da requisição gravado.", extra={"fields": fields})
+
+def _text_profile_response(profiler, status):
+    limit = current_app.config.get('PROFILE_TOP_N', 50)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(limit)
+    return Response(out.getvalue(), status=status, content_type='text/plain; charset=utf-8')
+
+def install_request_hooks(blueprint):
+    """
+    Registra no blueprint os ganchos de latência por rota e de perfilamento sob
+    demanda. O perfilamento só é ativado com PROFILING_ENABLED=True na config.
+    """
+    blueprint.before_request(_before_request)
+    blueprint.after_request(_after_request)
+    blueprint.teardown_request(_teardown_request)
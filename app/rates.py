@@ -0,0 +1,121 @@
+import re
+import unicodedata
+
+# --- Motor de taxas ---
+# 'Taxa' guarda só o primeiro número de 'Taxa_str', então "110% CDI",
+# "IPCA + 6,5%" e "13% a.a." não são comparáveis entre si. Aqui a expressão
+# completa é interpretada (indexador + valor) e convertida numa taxa nominal
+# anual estimada, a partir de premissas de mercado configuráveis.
+#
+# Colunas acrescentadas por add_yield_columns (todas em % a.a.):
+#   Indexador               'CDI%', 'CDI+', 'IPCA+', 'SELIC+', 'PRE' ou None
+#   Taxa_Anual              taxa nominal anual estimada
+#   Aliquota_IR             alíquota da tabela regressiva pelo prazo até o vencimento
+#   Taxa_Liquida            taxa anual líquida de IR (igual a Taxa_Anual se isento)
+#   Taxa_Bruta_Equivalente  taxa que um ativo tributado precisaria pagar para
+#                           render o mesmo líquido (igual a Taxa_Anual se tributado)
+
+# Premissas anuais (% a.a.) usadas na projeção dos indexadores.
+ASSUMPTIONS = {'CDI': 14.90, 'IPCA': 5.00, 'SELIC': 15.00}
+
+# Tabela regressiva de IR: (dias corridos até o vencimento, alíquota %).
+IR_REGRESSIVE_TABLE = ((180, 22.5), (360, 20.0), (720, 17.5), (None, 15.0))
+
+INDEXERS = ('CDI%', 'CDI+', 'IPCA+', 'SELIC+', 'PRE')
+YIELD_COLUMNS = ['Indexador', 'Taxa_Anual', 'Aliquota_IR', 'Taxa_Liquida', 'Taxa_Bruta_Equivalente']
+
+_NUMBER = r'(\d+(?:[.,]\d+)?)'
+# Spread sobre indexador ("CDI + 1,40%", "SELIC - 0,06%") é testado antes de
+# "% do CDI", senão "CDI + 1,40%" casaria como 1,40% do CDI.
+_SPREAD = re.compile(r'(cdi|ipca|selic)\s*([+-])\s*' + _NUMBER)
+_PERCENT_OF_CDI = re.compile(_NUMBER + r'\s*%\s*(?:do\s+)?cdi')
+_PREFIXED = re.compile(_NUMBER + r'\s*%\s*a\.?\s*a')
+
+def _normalize(value):
+    text = unicodedata.normalize('NFKD', str(value)).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'\s+', ' ', text).strip().lower()
+
+def parse_rate(taxa_str):
+    """Interpreta uma expressão de taxa. Retorna (indexador, valor) ou (None, None)."""
+    text = _normalize(taxa_str)
+    match = _SPREAD.search(text)
+    if match:
+        value = float(match.group(3).replace(',', '.'))
+        return f"{match.group(1).upper()}+", -value if match.group(2) == '-' else value
+    for indexer, pattern in (('CDI%', _PERCENT_OF_CDI), ('PRE', _PREFIXED)):
+        match = pattern.search(text)
+        if match:
+            return indexer, float(match.group(1).replace(',', '.'))
+    return None, None
+
+def parse_rates(taxa_str):
+    """
+    Versão vetorizada de parse_rate para uma Series: cada expressão distinta é
+    interpretada uma única vez. Retorna um DataFrame com 'Indexador' e 'Valor'.
+    """
+    import numpy as np
+    import pandas as pd
+    codes, uniques = pd.factorize(taxa_str, use_na_sentinel=False)
+    parsed = [parse_rate(v) for v in uniques]
+    indexers = np.array([p[0] for p in parsed] or [None], dtype=object)
+    values = np.array([np.nan if p[1] is None else p[1] for p in parsed] or [np.nan], dtype=float)
+    return pd.DataFrame({'Indexador': indexers[codes], 'Valor': values[codes]}, index=taxa_str.index)
+
+def annualized_yield(indexador, valor, assumptions=None):
+    """Taxa nominal anual estimada (% a.a.) a partir de indexador e valor, vetorizada (arrays numpy)."""
+    import numpy as np
+    premissas = {**ASSUMPTIONS, **(assumptions or {})}
+    indexador = np.asarray(indexador, dtype=object)
+    valor = np.asarray(valor, dtype=float) / 100
+
+    def compound(base):
+        return ((1 + base / 100) * (1 + valor) - 1) * 100
+
+    return np.select(
+        [indexador == 'CDI%', indexador == 'CDI+', indexador == 'IPCA+', indexador == 'SELIC+', indexador == 'PRE'],
+        [valor * premissas['CDI'], compound(premissas['CDI']), compound(premissas['IPCA']),
+         compound(premissas['SELIC']), valor * 100],
+        default=np.nan,
+    )
+
+def is_tax_exempt(ir):
+    """Máscara booleana dos ativos isentos de IR ('Isento', mas não 'Não Isento')."""
+    import numpy as np
+    import pandas as pd
+    codes, uniques = pd.factorize(ir, use_na_sentinel=False)
+    exempt = np.array([('isento' in t and 'nao isento' not in t) for t in map(_normalize, uniques)] or [False])
+    return pd.Series(exempt[codes], index=ir.index)
+
+def regressive_ir_rate(days):
+    """Alíquota (%) da tabela regressiva para cada prazo em dias, vetorizada."""
+    import numpy as np
+    limits = np.array([limit for limit, _ in IR_REGRESSIVE_TABLE if limit is not None])
+    rates = np.array([rate for _, rate in IR_REGRESSIVE_TABLE])
+    # Prazo até 180 dias cai na primeira faixa, 181 a 360 na segunda, e assim por diante.
+    return rates[np.searchsorted(limits, np.asarray(days), side='left')]
+
+def add_yield_columns(df, assumptions=None, reference_date=None):
+    """
+    Acrescenta a `df` (in place) as colunas de YIELD_COLUMNS, calculadas para o
+    DataFrame inteiro de uma vez. O prazo do IR é contado de `reference_date`
+    (padrão: hoje) até 'Vencimento'. Retorna o próprio `df`.
+    """
+    import numpy as np
+    import pandas as pd
+    if df.empty:
+        for col in YIELD_COLUMNS:
+            df[col] = None
+        return df
+    parsed = parse_rates(df['Taxa_str'])
+    df['Indexador'] = parsed['Indexador']
+    df['Taxa_Anual'] = annualized_yield(parsed['Indexador'], parsed['Valor'], assumptions)
+
+    reference = pd.Timestamp(reference_date or pd.Timestamp.today().normalize())
+    days = (df['Vencimento'] - reference).dt.days.fillna(0).clip(lower=0).to_numpy()
+    aliquota = regressive_ir_rate(days)
+    exempt = is_tax_exempt(df['IR']).to_numpy()
+    taxa = df['Taxa_Anual'].to_numpy(dtype=float)
+    df['Aliquota_IR'] = np.where(exempt, 0.0, aliquota)
+    df['Taxa_Liquida'] = np.where(exempt, taxa, taxa * (1 - aliquota / 100))
+    df['Taxa_Bruta_Equivalente'] = np.where(exempt, taxa / (1 - aliquota / 100), taxa)
+    return df
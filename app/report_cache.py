@@ -0,0 +1,209 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from datetime import date
+from . import cache_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+class ReportCache:
+    """
+    Cache em memória dos relatórios processados, seguro para servidores com threads.
+
+    - Um lock por chave garante "single-flight": se várias requisições pedem o
+      mesmo relatório ao mesmo tempo, apenas uma executa o carregamento e as
+      demais aguardam o resultado.
+    - As entradas são despejadas em ordem LRU quando a memória ocupada pelos
+      DataFrames passa de `max_bytes`.
+    - A geração do cache compartilhado (cache_store) é verificada a cada
+      acesso, para que limpezas feitas por outros workers sejam respeitadas.
+    - As entradas valem só para a data de referência em que foram carregadas
+      (`reference_date`): a alíquota de IR e as taxas líquidas dependem do prazo
+      até o vencimento, então na virada do dia o cache local é descartado e os
+      relatórios são recarregados (do cache compartilhado, sem reprocessar).
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._key_locks = {}
+        self._total_bytes = 0
+        self._generation = None
+        self._reference_date = None
+
+    @property
+    def generation(self):
+        """Geração do cache compartilhado vista na última sincronização deste processo."""
+        return self._generation
+
+    @property
+    def reference_date(self):
+        """Data de referência (prazos até o vencimento) das entradas atuais."""
+        return self._reference_date
+
+    def _sync_generation(self):
+        generation = cache_store.get_generation()
+        today = date.today()
+        with self._lock:
+            if generation != self._generation or today != self._reference_date:
+                self._entries.clear()
+                self._total_bytes = 0
+                self._generation = generation
+                self._reference_date = today
+        return generation
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, df, generation, reference_date=None):
+        """
+        Armazena o DataFrame, a menos que o cache tenha sido limpo (ou o dia tenha
+        virado) durante o carregamento.
+        """
+        size = int(df.memory_usage(deep=True).sum())
+        with self._lock:
+            if generation != self._generation or (reference_date is not None and reference_date != self._reference_date):
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old[1]
+            self._entries[key] = (df, size)
+            self._total_bytes += size
+            # Mantém pelo menos a entrada recém-inserida, mesmo que ela sozinha passe do limite.
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                evicted_key, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+                logger.info("Relatório removido da memória (LRU).", extra={"fields": {"chave": evicted_key, "bytes": evicted_size}})
+
+    def get_or_load(self, key, loader):
+        """
+        Retorna a entrada `key`, chamando `loader(generation)` uma única vez em caso
+        de ausência. Se o loader devolver None, nada é armazenado.
+        """
+        generation = self._sync_generation()
+        reference_date = self._reference_date
+        df = self.get(key)
+        if df is not None:
+            return df
+
+        # Lock da chave com contagem de interessados: quando a última thread o
+        # libera, ele sai de _key_locks, que não cresce com cada chave já vista.
+        with self._lock:
+            slot = self._key_locks.get(key)
+            if slot is None:
+                slot = self._key_locks[key] = [threading.Lock(), 0]
+            slot[1] += 1
+
+        try:
+            with slot[0]:
+                # Outra thread pode ter carregado a entrada enquanto esperávamos o lock.
+                df = self.get(key)
+                if df is not None:
+                    return df
+                df = loader(generation)
+                if df is not None:
+                    self.put(key, df, generation, reference_date)
+                return df
+        finally:
+            with self._lock:
+                slot[1] -= 1
+                if slot[1] == 0 and self._key_locks.get(key) is slot:
+                    del self._key_locks[key]
+
+    def invalidate(self, *keys):
+        """Descarta apenas as entradas `keys` deste processo (sem mexer na geração compartilhada)."""
+        with self._lock:
+            for key in keys:
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    self._total_bytes -= entry[1]
+
+    def clear(self, purge_contents=False):
+        """Limpa o cache local e avança a geração compartilhada."""
+        generation = cache_store.bump_generation(purge_contents=purge_contents)
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+            self._generation = generation
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._total_bytes, "max_bytes": self.max_bytes}
+
+
+# Instância única compartilhada por routes e data_manager.
+report_cache = ReportCache()
+
+def load_or_process(file_path, key, generation):
+    """
+    Resultado de process_data para `file_path` pelo cache compartilhado: primeiro
+    pela chave + assinatura do arquivo, depois pelo hash do conteúdo; só processa
+    a planilha se esse conteúdo nunca foi visto.
+    """
+    from .data_processor import process_data
+    from . import history_store
+    signature = cache_store.get_file_signature(file_path)
+    df = cache_store.load_frame(key, signature)
+    if df is not None:
+        return df
+    digest = cache_store.file_digest(key, file_path)
+    df = cache_store.load_content(digest)
+    # Sem resultado gravado, só processa quem conseguir marcar o conteúdo; quem não
+    # conseguir (upload, observador ou outro worker processando) espera o resultado.
+    while df is None and not cache_store.claim_content(digest):
+        logger.info("Conteúdo em processamento por outro processo; aguardando.", extra={"fields": {"arquivo": key}})
+        df = cache_store.wait_for_content(digest)
+    if df is None:
+        try:
+            logger.info("Processando o arquivo do zero.", extra={"fields": {"arquivo": key}})
+            df = process_data(file_path)
+            # Resultado vazio (falha ou planilha sem dados) não vai para o cache
+            # compartilhado: senão o mesmo conteúdo nunca seria reprocessado.
+            if df.empty:
+                return df
+            cache_store.store_content(digest, df)
+        finally:
+            cache_store.release_content(digest)
+    else:
+        logger.info("Conteúdo já processado; reaproveitando o resultado.", extra={"fields": {"arquivo": key}})
+    cache_store.store_frame(key, signature, df, generation)
+    history_store.record_report(file_path, df)
+    return df
+
+def get_processed_report(file_path, key=None):
+    """
+    Retorna o DataFrame processado de `file_path`, consultando primeiro a memória,
+    depois o cache compartilhado entre workers e, por último, process_data.
+    Retorna None se o arquivo não existir.
+    """
+    key = key or os.path.basename(file_path)
+
+    def loader(generation):
+        from .rates import add_yield_columns
+        from .issuers import canonical_names
+        from . import search_index
+        if not os.path.exists(file_path):
+            return None
+        df = load_or_process(file_path, key, generation)
+        # Reaplica o registro de emissores (idempotente), que pode ter crescido
+        # depois que o DataFrame foi para o cache compartilhado.
+        if not df.empty:
+            df['Emissor'] = canonical_names(df['Emissor'])
+            df['Emissor_Display'] = df['Emissor']
+        # As taxas anualizadas dependem das premissas atuais e do prazo até o
+        # vencimento, então não vão para o cache compartilhado: são recalculadas
+        # (de uma vez, vetorizadas) a cada carga, na data de referência do cache.
+        df = add_yield_columns(df, reference_date=report_cache.reference_date)
+        search_index.update(key, df, file_path)
+        return df
+
+    return report_cache.get_or_load(key, loader)
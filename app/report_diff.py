@@ -0,0 +1,54 @@
+import pandas as pd
+
+# Identidade de um ativo entre dois snapshots do mesmo relatório.
+DIFF_KEYS = ['Produto_Completo', 'Vencimento']
+DIFF_COLUMNS = ['Produto', 'Emissor_Display', 'Tipo_Taxa', 'Taxa_str', 'Taxa', 'IR', 'Aplicacao_Minima']
+# Ordinal dentro da chave: algumas planilhas (ex.: LFs no crédito bancário) repetem
+# produto e vencimento com indexadores diferentes; essas linhas são pareadas pela
+# ordem de 'Tipo_Taxa' em vez de descartadas.
+_ORDINAL = '_ordem'
+
+def _prepare(df):
+    columns = DIFF_KEYS + [c for c in DIFF_COLUMNS if c in df.columns]
+    sort_by = DIFF_KEYS + (['Tipo_Taxa'] if 'Tipo_Taxa' in df.columns else [])
+    prepared = df[columns].sort_values(sort_by, kind='stable')
+    prepared[_ORDINAL] = prepared.groupby(DIFF_KEYS, sort=False).cumcount()
+    # Categóricos (histórico) viram texto para que o merge compare valores, não códigos.
+    for col in prepared.columns:
+        if isinstance(prepared[col].dtype, pd.CategoricalDtype):
+            prepared[col] = prepared[col].astype(object)
+    return prepared
+
+def diff_reports(base_df, target_df, tolerance=1e-9):
+    """
+    Compara dois relatórios processados (anterior x atual) com um único merge
+    por hash em (Produto_Completo, Vencimento). Retorna um dicionário com:
+      - 'novos':          ativos presentes só no atual
+      - 'removidos':      ativos presentes só no anterior
+      - 'reprecificados': ativos em ambos cuja 'Taxa' mudou, com 'Taxa_Anterior',
+                          'Taxa_Atual' e 'Delta_Taxa' (ordenados pelo maior |delta|)
+    """
+    base = _prepare(base_df)
+    target = _prepare(target_df)
+    merged = base.merge(target, on=DIFF_KEYS + [_ORDINAL], how='outer', suffixes=('_anterior', '_atual'), indicator=True)
+
+    def side(mask, suffix):
+        part = merged.loc[mask, DIFF_KEYS + [f"{c}{suffix}" for c in DIFF_COLUMNS if f"{c}{suffix}" in merged.columns]]
+        return part.rename(columns=lambda c: c[:-len(suffix)] if c.endswith(suffix) else c).reset_index(drop=True)
+
+    novos = side(merged['_merge'] == 'right_only', '_atual')
+    removidos = side(merged['_merge'] == 'left_only', '_anterior')
+
+    both = merged[merged['_merge'] == 'both']
+    delta = both['Taxa_atual'] - both['Taxa_anterior']
+    changed = both[delta.abs() > tolerance]
+    reprecificados = side(changed.index, '_atual').drop(columns=['Taxa', 'Taxa_str'])
+    reprecificados['Taxa_str_Anterior'] = changed['Taxa_str_anterior'].to_numpy()
+    reprecificados['Taxa_str_Atual'] = changed['Taxa_str_atual'].to_numpy()
+    reprecificados['Taxa_Anterior'] = changed['Taxa_anterior'].to_numpy()
+    reprecificados['Taxa_Atual'] = changed['Taxa_atual'].to_numpy()
+    reprecificados['Delta_Taxa'] = reprecificados['Taxa_Atual'] - reprecificados['Taxa_Anterior']
+    order = reprecificados['Delta_Taxa'].abs().sort_values(ascending=False, kind='stable').index
+    reprecificados = reprecificados.loc[order].reset_index(drop=True)
+
+    return {"novos": novos, "removidos": removidos, "reprecificados": reprecificados}
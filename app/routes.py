@@ -1,47 +1,46 @@
-from flask import Blueprint, render_template, make_response, request, redirect, url_for, Response, flash
-from .data_processor import process_data
-from .analysis import find_best_assets
-from .pdf_generator import create_pdf_report
+from flask import Blueprint, render_template, make_response, request, redirect, url_for, Response, flash, jsonify, current_app
+from .report_cache import report_cache, get_processed_report
+from .profiling import install_request_hooks
+from . import data_watcher
 import os
-import io
-import pandas as pd
+import math
+import logging
 
-main_bp = Blueprint('main', __name__)
+logger = logging.getLogger(__name__)
+
+# pandas, fpdf (pdf_generator) e analysis são importados dentro das rotas que os
+# usam, para que create_app() e scripts que importam 'app' iniciem rapidamente.
 
-_cached_data = {} 
+main_bp = Blueprint('main', __name__)
+install_request_hooks(main_bp)
 
 def get_data_dir():
-    return os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+    return os.environ.get('REPORTS_DATA_DIR') or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
 
 def get_base_path():
     return os.path.dirname(os.path.abspath(__file__))
 
-def clear_caches():
-    global _cached_data
-    _cached_data = {}
-    print("INFO: Cache de dados limpo.")
+def clear_caches(purge_contents=False):
+    # Avança a geração compartilhada para que os outros workers também descartem seus caches.
+    report_cache.clear(purge_contents=purge_contents)
+    # Atualiza já a listagem do observador; o processamento fica para o próximo acesso.
+    if data_watcher.list_reports() is not None:
+        data_watcher.refresh(get_data_dir(), reprocess=False)
+    logger.info("Cache de dados limpo.")
 
 def get_report_data(filename):
-    global _cached_data
-    if filename in _cached_data:
-        return _cached_data[filename]
-
-    file_path = os.path.join(get_data_dir(), filename)
-    if os.path.exists(file_path):
-        print(f"INFO: Processando o arquivo do zero: {filename}")
-        df = process_data(file_path)
-        _cached_data[filename] = df
-        return df
-    return pd.DataFrame()
+    import pandas as pd
+    df = get_processed_report(os.path.join(get_data_dir(), filename), key=filename)
+    return df if df is not None else pd.DataFrame()
 
 def get_available_reports():
-    data_dir = get_data_dir()
-    if os.path.exists(data_dir):
-        return sorted([f for f in os.listdir(data_dir) if f.endswith('.xlsx')])
-    return []
+    # Com o observador ativo a listagem vem da memória, sem os.listdir por requisição.
+    from .data_manager import list_data_files
+    return list_data_files()
 
 @main_bp.route('/', methods=['GET'])
 def index():
+    import pandas as pd
     try:
         available_reports = get_available_reports()
         active_report = request.args.get('report')
@@ -74,25 +73,133 @@ def index():
         return render_template('index.html', error=f"Erro crítico ao carregar a página: {e}", available_reports=get_available_reports())
 
 
+@main_bp.route('/ready', methods=['GET'])
+def ready():
+    """Endpoint de prontidão: informa o progresso do pré-carregamento do cache."""
+    from .warmup import get_warmup_status
+    status = get_warmup_status()
+    status["cache"] = report_cache.stats()
+    # 'failed': o pré-carregamento parou, mas os relatórios seguem carregando sob demanda.
+    is_ready = status["status"] in ("idle", "ready", "failed")
+    return jsonify(status), (200 if is_ready else 503)
+
+
+@main_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Métricas de instrumentação deste processo no formato texto do Prometheus."""
+    from .metrics import render_prometheus
+    return Response(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@main_bp.route('/api/history', methods=['GET'])
+def api_history():
+    """Histórico de taxas de um produto: ?produto_completo=&produto=&emissor=&inicio=AAAA-MM-DD&fim=AAAA-MM-DD"""
+    from datetime import date
+    from .history_store import rate_history
+    try:
+        inicio = date.fromisoformat(request.args['inicio']) if request.args.get('inicio') else None
+        fim = date.fromisoformat(request.args['fim']) if request.args.get('fim') else None
+    except ValueError:
+        return jsonify({"erro": "Datas devem estar no formato AAAA-MM-DD."}), 400
+    filtros = {k: request.args.get(k) for k in ('produto_completo', 'produto', 'emissor')}
+    if not any(filtros.values()):
+        return jsonify({"erro": "Informe produto_completo, produto ou emissor."}), 400
+
+    history = rate_history(start=inicio, end=fim, **filtros)
+    records = [
+        {"data": row.Data_Snapshot.date().isoformat(), "produto_completo": row.Produto_Completo,
+         "vencimento": row.Vencimento.date().isoformat(), "taxa_str": row.Taxa_str, "taxa": row.Taxa}
+        for row in history.itertuples()
+    ]
+    return jsonify({"total": len(records), "historico": records})
+
+
+@main_bp.route('/api/facets', methods=['GET'])
+def api_facets():
+    """
+    Contagem de ativos por valor de cada filtro, dada a seleção atual:
+    ?report=&anos=&emissores=&produtos=&taxas=&tipos_ir=&liquidez_diaria=on
+    (mesmos nomes de campo do formulário da página inicial).
+    """
+    from .filter_index import get_filter_index
+    active_report = request.args.get('report')
+    if not active_report:
+        return jsonify({"erro": "Informe o relatório em 'report'."}), 400
+    df = get_report_data(active_report)
+    if df.empty:
+        return jsonify({"erro": f"O relatório '{active_report}' não contém dados processáveis."}), 404
+
+    profile = {
+        'anos': request.args.getlist('anos'),
+        'emissores': request.args.getlist('emissores'),
+        'produtos': request.args.getlist('produtos'),
+        'taxas': request.args.getlist('taxas'),
+        'ir': request.args.getlist('tipos_ir'),
+        'liquidez_diaria': request.args.get('liquidez_diaria') == 'on',
+    }
+    try:
+        total, counts = get_filter_index(active_report, df).facet_counts(profile)
+    except ValueError:
+        return jsonify({"erro": "Anos devem ser números inteiros."}), 400
+    counts['tipos_ir'] = counts.pop('ir')
+    return jsonify({"report": active_report, "total": total, "facetas": counts})
+
+
+@main_bp.route('/api/search', methods=['GET'])
+def api_search():
+    """Busca por prefixo, sem acentos, em produtos e emissores de todos os relatórios: ?q=&limite="""
+    from .search_index import search, MAX_RESULTS
+    query = request.args.get('q', '')
+    try:
+        limit = min(int(request.args.get('limite', MAX_RESULTS)), 100)
+    except ValueError:
+        return jsonify({"erro": "'limite' deve ser um número inteiro."}), 400
+    total, matches, pending = search(query, limit=limit)
+    results = []
+    for report, row in matches:
+        diaria = bool(row['Liquidez_Diaria'])
+        results.append({
+            "relatorio": report, "produto_completo": row['Produto_Completo'], "produto": row['Produto'],
+            "emissor": row['Emissor_Display'], "vencimento": row['Vencimento'].date().isoformat(),
+            "taxa_str": row['Taxa_str'], "liquidez_diaria": diaria,
+            "url": url_for('main.show_results', report=report, emissor=row['Emissor'], report_type='cliente',
+                           liquidez_diaria='on' if diaria else 'off'),
+        })
+    # 'indexando': relatórios ainda sendo carregados em segundo plano (entram nas próximas buscas).
+    return jsonify({"q": query, "total": total, "indexando": pending, "resultados": results})
+
+
 @main_bp.route('/add-data', methods=['POST'])
 def add_data():
-    if 'new_data_file' not in request.files or request.files['new_data_file'].filename == '':
+    files = [f for f in request.files.getlist('new_data_file') if f.filename]
+    if not files:
         flash('Nenhum arquivo selecionado.', 'error')
         return redirect(url_for('main.index'))
-    file = request.files['new_data_file']
-    if file and file.filename.endswith('.xlsx'):
-        try:
-            data_dir = get_data_dir()
-            os.makedirs(data_dir, exist_ok=True)
-            file_path = os.path.join(data_dir, file.filename)
-            file.save(file_path)
+    from .uploads import save_uploads, process_uploads
+    try:
+        data_dir = get_data_dir()
+        results, skipped = save_uploads(files, data_dir)
+        for name, reason in skipped:
+            flash(f'Arquivo "{name}" ignorado: {reason}', 'error')
+        if not results:
+            return redirect(url_for('main.index'))
+
+        changed = [r for r in results if r['status'] != 'identico']
+        if changed:
+            # Tudo é processado antes e entra no cache de uma vez, numa única troca de geração.
+            process_uploads(changed, data_dir, max_workers=current_app.config.get('UPLOAD_WORKERS'))
             clear_caches()
-            flash(f'Relatório "{file.filename}" foi salvo/atualizado com sucesso!', 'success')
-            return redirect(url_for('main.index', report=file.filename))
-        except Exception as e:
-            flash(f'Ocorreu um erro ao salvar o arquivo: {e}', 'error')
-    else:
-        flash('Formato de arquivo inválido. Por favor, envie um arquivo .xlsx.', 'error')
+        if len(results) == 1:
+            result = results[0]
+            if result['status'] == 'identico':
+                flash(f'Relatório "{result["arquivo"]}" é idêntico ao já carregado; nada foi reprocessado.', 'info')
+            else:
+                flash(f'Relatório "{result["arquivo"]}" foi salvo/atualizado com sucesso!', 'success')
+            return redirect(url_for('main.index', report=result['arquivo']))
+        flash(f'{len(changed)} de {len(results)} relatórios foram salvos/atualizados '
+              f'({len(results) - len(changed)} idênticos aos já carregados).', 'success')
+    except Exception as e:
+        flash(f'Ocorreu um erro ao salvar os arquivos: {e}', 'error')
     return redirect(url_for('main.index'))
 
 @main_bp.route('/clear-data', methods=['POST'])
@@ -103,7 +210,7 @@ def clear_data():
             for filename in os.listdir(data_dir):
                 if filename.endswith('.xlsx'):
                     os.remove(os.path.join(data_dir, filename))
-            clear_caches()
+            clear_caches(purge_contents=True)
             flash('Todos os relatórios foram removidos com sucesso.', 'success')
         else:
             flash('A pasta de dados não existe.', 'info')
@@ -113,6 +220,7 @@ def clear_data():
 
 @main_bp.route('/process-filters', methods=['POST'])
 def process_filters():
+    from .analysis import SCORE_CRITERIA
     active_report = request.form.get('active_report')
     form_data = {
         'report': active_report,
@@ -123,7 +231,15 @@ def process_filters():
         'ir': request.form.getlist('tipos_ir'),
         'report_type': request.form.get('report_type'),
         'liquidez_diaria': request.form.get('liquidez_diaria', 'off'),
+        'ordenacao': request.form.get('ordenacao', 'bruta'),
     }
+    # Pesos e limite por emissor só vão para a URL quando preenchidos.
+    for field in ['max_por_emissor'] + [f'peso_{criterion}' for criterion in SCORE_CRITERIA]:
+        if request.form.get(field):
+            form_data[field] = request.form.get(field)
+    if form_data['report_type'] == 'escada':
+        form_data.update(valor=request.form.get('valor'), limite_emissor=request.form.get('limite_emissor') or None)
+        return redirect(url_for('main.show_ladder', **form_data))
     return redirect(url_for('main.show_results', **form_data))
 
 def filter_dataframe(df, args):
@@ -145,6 +261,37 @@ def filter_dataframe(df, args):
     if emissores: df_filtrado = df_filtrado[df_filtrado['Emissor'].isin(emissores)]
     return df_filtrado
 
+def _load_result_view(active_report, df, args):
+    """
+    Ranking pedido em `args` já convertido em ResultView (view_models). A
+    visualização fica em cache por relatório e filtros enquanto o cache de
+    relatórios devolver o mesmo DataFrame, então a página de resultados e os
+    downloads do PDF/Excel com os mesmos parâmetros ranqueiam e formatam uma vez.
+    Retorna (visualização, é_relatório_de_assessor).
+    """
+    from .view_models import get_result_view, build_result_view
+    is_advisor_report = (args.get('report_type') == 'assessor')
+
+    # **CORREÇÃO: Se o relatório for o de Compromissadas, força o modo "cliente" (sem ROA)**
+    if active_report and 'compromissada' in active_report.lower():
+        is_advisor_report = False
+
+    from .analysis import scoring_from_args
+    weights, max_per_issuer, problems = scoring_from_args(args)
+    for problem in problems:
+        flash(f"{problem} O valor foi ignorado.", 'error')
+
+    def build():
+        from .analysis import find_best_assets, rank_column
+        df_filtrado = filter_dataframe(df, args)
+        top_n = 8 if is_advisor_report else 5
+        analysis_result = find_best_assets(df_filtrado, top_n=top_n, rank_by=rank_column(args.get('ordenacao')),
+                                           weights=weights, max_per_issuer=max_per_issuer)
+        return build_result_view(analysis_result, include_roa=is_advisor_report)
+
+    key = (active_report, tuple(sorted(args.items(multi=True))))
+    return get_result_view(key, df, build), is_advisor_report
+
 @main_bp.route('/results', methods=['GET'])
 def show_results():
     try:
@@ -156,25 +303,9 @@ def show_results():
         if df.empty:
             return f"<h1>Erro ao processar o relatório '{active_report}'.</h1><p>Por favor, verifique o arquivo e tente carregá-lo novamente.</p>"
         
-        df_filtrado = filter_dataframe(df, request.args)
-        report_type = request.args.get('report_type')
-        is_advisor_report = (report_type == 'assessor')
-        
-        # **CORREÇÃO: Se o relatório for o de Compromissadas, força o modo "cliente" (sem ROA)**
-        if active_report and 'compromissada' in active_report.lower():
-            is_advisor_report = False
-
-        top_n = 8 if is_advisor_report else 5
-        analysis_result = find_best_assets(df_filtrado, top_n=top_n)
-        
-        liquidez_imediata_assets = analysis_result[analysis_result['Sem_Carencia'] == True]
-        liquidez_diaria_assets = analysis_result[(analysis_result['Liquidez_Diaria'] == True) & (analysis_result['Sem_Carencia'] == False)]
-        prazo_assets = analysis_result[analysis_result['Liquidez_Diaria'] == False]
-        
+        view, is_advisor_report = _load_result_view(active_report, df, request.args)
         return render_template('results.html', 
-                               liquidez_imediata_assets=liquidez_imediata_assets,
-                               liquidez_diaria_assets=liquidez_diaria_assets,
-                               prazo_assets=prazo_assets,
+                               view=view,
                                is_advisor=is_advisor_report,
                                download_url_params=request.query_string.decode('utf-8'))
     except Exception as e:
@@ -182,39 +313,24 @@ def show_results():
 
 @main_bp.route('/download/<file_format>', methods=['GET'])
 def download_file(file_format):
+    from .pdf_generator import create_pdf_report
     try:
         active_report = request.args.get('report')
         if not active_report:
             return "Erro: Relatório não especificado.", 400
             
         df = get_report_data(active_report)
-        df_filtrado = filter_dataframe(df, request.args)
-        report_type = request.args.get('report_type')
-        is_advisor_report = (report_type == 'assessor')
-
-        # **CORREÇÃO: Se o relatório for o de Compromissadas, força o modo "cliente" (sem ROA)**
-        if active_report and 'compromissada' in active_report.lower():
-            is_advisor_report = False
-
-        top_n = 8 if is_advisor_report else 5
-        analysis_result = find_best_assets(df_filtrado, top_n=top_n)
+        view, is_advisor_report = _load_result_view(active_report, df, request.args)
         
-        if analysis_result.empty: return "Nenhum dado encontrado.", 404
+        if not view.secoes: return "Nenhum dado encontrado.", 404
             
         if file_format == 'excel' and is_advisor_report:
-            cols_to_keep = ['Produto', 'Emissor_Display', 'Vencimento', 'Taxa_str', 'IR', 'Aplicacao_Minima', 'Roa']
-            df_excel = analysis_result[cols_to_keep].copy()
-            df_excel.rename(columns={'Taxa_str': 'Taxa', 'Aplicacao_Minima': 'Aplicação Mínima', 'Emissor_Display': 'Emissor'}, inplace=True)
-            df_excel['Vencimento'] = df_excel['Vencimento'].dt.strftime('%d/%m/%Y')
-            if 'Roa' in df_excel.columns: df_excel['Roa'] = (df_excel['Roa'] * 100).map('{:,.2f}%'.format)
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer: df_excel.to_excel(writer, index=False, sheet_name='Relatorio')
-            output.seek(0)
-            return Response(output, mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", headers={"Content-Disposition": "attachment; filename=relatorio_assessores.xlsx"})
+            from .excel_export import create_excel_report
+            return Response(create_excel_report(view), mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", headers={"Content-Disposition": "attachment; filename=relatorio_assessores.xlsx"})
         else:
             base_path = get_base_path()
             logo_path = os.path.join(base_path, 'static', 'logo.png')
-            pdf_bytes = create_pdf_report(analysis_result, include_roa=is_advisor_report, logo_path=logo_path)
+            pdf_bytes = create_pdf_report(view, include_roa=is_advisor_report, logo_path=logo_path)
             filename = "relatorio_assessores.pdf" if is_advisor_report else "relatorio_clientes.pdf"
             response = make_response(pdf_bytes)
             response.headers['Content-Type'] = 'application/pdf'
@@ -223,42 +339,194 @@ def download_file(file_format):
     except Exception as e:
         return f"<h1>Ocorreu um erro ao gerar o arquivo:</h1><p>{str(e)}</p>", 500
     
+def _load_report_diff(args):
+    """
+    Monta o diff pedido em `args`: 'alvo' é o relatório atual e a base é outro
+    relatório ('base') ou o snapshot histórico do próprio alvo em 'base_data'.
+    Retorna (diff, rótulo_base, rótulo_alvo) ou levanta ValueError.
+    """
+    from datetime import date
+    from .report_diff import diff_reports
+    alvo = args.get('alvo')
+    base = args.get('base')
+    base_data = args.get('base_data')
+    if not alvo or not (base or base_data):
+        raise ValueError("Informe o relatório atual ('alvo') e a base ('base' ou 'base_data').")
+
+    target_df = get_report_data(alvo)
+    if target_df.empty:
+        raise ValueError(f"O relatório '{alvo}' não pôde ser processado.")
+
+    if base_data:
+        from .history_store import load_history
+        snapshot_date = date.fromisoformat(base_data)
+        base_df = load_history(start=snapshot_date, end=snapshot_date)
+        if not base_df.empty:
+            base_df = base_df[base_df['Arquivo_Origem'] == alvo].copy()
+            base_df['Emissor_Display'] = base_df['Emissor']
+        base_label = f"{alvo} em {snapshot_date.strftime('%d/%m/%Y')}"
+    else:
+        base_df = get_report_data(base)
+        base_label = base
+    if base_df.empty:
+        raise ValueError(f"Não há dados para a base '{base_label}'.")
+
+    return diff_reports(base_df, target_df), base_label, alvo
+
+@main_bp.route('/diff', methods=['GET'])
+def show_diff():
+    """O que mudou entre dois relatórios: novos, removidos e reprecificados."""
+    try:
+        diff, base_label, target_label = _load_report_diff(request.args)
+    except ValueError as e:
+        flash(str(e), 'error')
+        return redirect(url_for('main.index'))
+    return render_template('diff.html', diff=diff, base_label=base_label, target_label=target_label,
+                           download_url_params=request.query_string.decode('utf-8'))
+
+@main_bp.route('/diff/pdf', methods=['GET'])
+def download_diff():
+    from .pdf_generator import create_diff_pdf_report
+    try:
+        diff, base_label, target_label = _load_report_diff(request.args)
+        logo_path = os.path.join(get_base_path(), 'static', 'logo.png')
+        pdf_bytes = create_diff_pdf_report(diff, base_label, target_label, logo_path=logo_path)
+        response = make_response(pdf_bytes)
+        response.headers['Content-Type'] = 'application/pdf'
+        response.headers['Content-Disposition'] = 'attachment; filename=mudancas_relatorio.pdf'
+        return response
+    except ValueError as e:
+        return f"Erro: {e}", 400
+    except Exception as e:
+        return f"<h1>Ocorreu um erro ao gerar o arquivo:</h1><p>{str(e)}</p>", 500
+
+def _parse_amount(value):
+    """
+    Valor em reais vindo do formulário ("250.000,00", "250000" ou "250000.5").
+    Levanta ValueError se não for um número finito e positivo ("inf", "nan", "0", "-5").
+    """
+    text = str(value or '').replace('R$', '').strip()
+    if ',' in text:
+        text = text.replace('.', '').replace(',', '.')
+    amount = float(text)
+    if not math.isfinite(amount) or amount <= 0:
+        raise ValueError(f"Valor inválido: '{value}'.")
+    return amount
+
+def _load_ladder(args):
+    """
+    Escada de vencimentos para a query string: ?report= (opcional; sem ele usa o
+    consolidado) &valor= &ano=...&limite_emissor= &ordenacao= e os demais filtros de /results.
+    Levanta ValueError com uma mensagem para o usuário se algo estiver faltando.
+    """
+    from .analysis import rank_column
+    from .ladder import build_ladder
+    from .data_manager import get_all_processed_data
+    try:
+        amount = _parse_amount(args.get('valor'))
+        issuer_limit = _parse_amount(args.get('limite_emissor')) if args.get('limite_emissor') else None
+    except ValueError:
+        raise ValueError("Valores devem ser números, como 100000 ou 100.000,00.")
+    active_report = args.get('report')
+    df = get_report_data(active_report) if active_report else get_all_processed_data()
+    if df.empty:
+        raise ValueError(f"O relatório '{active_report or 'consolidado'}' não contém dados processáveis.")
+    df_filtrado = filter_dataframe(df, args)
+    return build_ladder(df_filtrado, amount, args.getlist('ano'),
+                        rank_by=rank_column(args.get('ordenacao')), issuer_limit=issuer_limit)
+
+@main_bp.route('/ladder', methods=['GET'])
+def show_ladder():
+    """Escada de vencimentos: distribui um valor entre os anos escolhidos nos ativos de maior taxa."""
+    try:
+        allocations, summary = _load_ladder(request.args)
+    except ValueError as e:
+        flash(str(e), 'error')
+        return redirect(url_for('main.index', report=request.args.get('report')))
+    return render_template('ladder.html', allocations=allocations, summary=summary,
+                           download_url_params=request.query_string.decode('utf-8'))
+
+@main_bp.route('/ladder/pdf', methods=['GET'])
+def download_ladder():
+    from .pdf_generator import create_ladder_pdf_report
+    try:
+        allocations, summary = _load_ladder(request.args)
+        logo_path = os.path.join(get_base_path(), 'static', 'logo.png')
+        pdf_bytes = create_ladder_pdf_report(allocations, summary, logo_path=logo_path)
+        response = make_response(pdf_bytes)
+        response.headers['Content-Type'] = 'application/pdf'
+        response.headers['Content-Disposition'] = 'attachment; filename=escada_vencimentos.pdf'
+        return response
+    except ValueError as e:
+        return f"Erro: {e}", 400
+    except Exception as e:
+        return f"<h1>Ocorreu um erro ao gerar o arquivo:</h1><p>{str(e)}</p>", 500
+
+@main_bp.route('/batch-reports', methods=['POST'])
+def batch_reports():
+    """
+    Gera os PDFs de vários clientes de uma vez. Recebe a lista de perfis como
+    JSON no corpo ou como arquivo no campo 'perfis'; devolve um zip.
+    """
+    import json
+    from .batch_reports import generate_batch
+    try:
+        upload = request.files.get('perfis')
+        profiles = json.load(upload.stream) if upload else request.get_json(silent=True)
+        data = generate_batch(profiles, max_workers=current_app.config.get('BATCH_REPORT_WORKERS'))
+    except ValueError as e:
+        return f"Erro: {e}", 400
+    except Exception as e:
+        return f"<h1>Ocorreu um erro ao gerar os relatórios:</h1><p>{str(e)}</p>", 500
+    return Response(data, mimetype='application/zip',
+                    headers={"Content-Disposition": "attachment; filename=relatorios_clientes.zip"})
+
 @main_bp.route('/download_all/<report_type>', methods=['GET'])
 def download_all(report_type):
+    from .data_manager import get_all_processed_data, CONSOLIDATED_KEY
+    from .analysis import scoring_from_args
+    from .view_models import get_result_view, build_result_view
+    from .pdf_generator import create_pdf_report
     try:
         available_reports = get_available_reports()
         if not available_reports:
             flash('Nenhum relatório disponível para gerar o consolidado.', 'error')
             return redirect(url_for('main.index'))
 
-        all_dfs = []
-        for report_file in available_reports:
-            df = get_report_data(report_file)
-            if not df.empty:
-                all_dfs.append(df)
+        # Consolidado do cache de relatórios: o mesmo objeto entre requisições,
+        # então a visualização abaixo é reaproveitada enquanto ele não mudar.
+        consolidated_df = get_all_processed_data()
 
-        if not all_dfs:
+        if consolidated_df.empty:
             flash('Nenhum dado processável encontrado em todos os relatórios.', 'error')
             return redirect(url_for('main.index'))
 
-        consolidated_df = pd.concat(all_dfs, ignore_index=True)
-        consolidated_df.drop_duplicates(inplace=True)
-
         is_advisor_report = (report_type == 'assessor')
         
         top_n = 8 if is_advisor_report else 5
         
         # A análise é feita sobre todos os ativos de todos os relatórios
-        analysis_result = find_best_assets(consolidated_df, top_n=top_n)
+        weights, max_per_issuer, problems = scoring_from_args(request.args)
+        for problem in problems:
+            flash(f"{problem} O valor foi ignorado.", 'error')
+
+        def build():
+            from .analysis import find_best_assets, rank_column
+            analysis_result = find_best_assets(consolidated_df, top_n=top_n, rank_by=rank_column(request.args.get('ordenacao')),
+                                               weights=weights, max_per_issuer=max_per_issuer)
+            return build_result_view(analysis_result, include_roa=is_advisor_report)
+
+        key = (CONSOLIDATED_KEY, report_type, tuple(sorted(request.args.items(multi=True))))
+        view = get_result_view(key, consolidated_df, build)
 
-        if analysis_result.empty:
+        if not view.secoes:
             flash('Nenhum ativo encontrado para o relatório consolidado.', 'info')
             return redirect(url_for('main.index'))
 
         # Geração do PDF
         base_path = get_base_path()
         logo_path = os.path.join(base_path, 'static', 'logo.png')
-        pdf_bytes = create_pdf_report(analysis_result, include_roa=is_advisor_report, logo_path=logo_path)
+        pdf_bytes = create_pdf_report(view, include_roa=is_advisor_report, logo_path=logo_path)
         
         filename = f"relatorio_consolidado_{report_type}.pdf"
         
@@ -0,0 +1,176 @@
+import os
+import re
+import threading
+import unicodedata
+import weakref
+from bisect import bisect_left
+
+# --- Busca de produtos e emissores ---
+# Índice invertido por prefixo sobre 'Produto_Completo', 'Produto' e 'Emissor'
+# de todos os relatórios. Cada relatório tem a sua parte, montada quando o
+# DataFrame é carregado no cache (report_cache) e remontada quando o cache passa
+# a devolver outro DataFrame para a mesma chave. Uma parte guarda:
+#   - o vocabulário ordenado de termos (sem acentos, minúsculos);
+#   - para cada termo, as linhas (np.ndarray ordenado) em que ele aparece;
+#   - só as colunas exibidas nos resultados (RESULT_COLUMNS), não o DataFrame:
+#     o relatório continua podendo sair da memória pelo LRU do cache.
+# Um termo da consulta vira um intervalo do vocabulário (bisect), e os termos
+# são combinados com E (interseção das linhas).
+#
+# A busca nunca carrega planilhas na thread da requisição: relatórios sem parte
+# (ainda não carregados, ou alterados desde a montagem) são carregados por uma
+# thread de fundo e entram nas buscas seguintes.
+
+SEARCH_COLUMNS = ['Produto_Completo', 'Produto', 'Emissor']
+RESULT_COLUMNS = ['Produto_Completo', 'Produto', 'Emissor', 'Emissor_Display', 'Vencimento', 'Taxa_str', 'Liquidez_Diaria']
+MAX_RESULTS = 20
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+def tokenize(text):
+    """Termos de busca de um texto: sem acentos, minúsculos, só letras e dígitos."""
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode('ascii').lower()
+    return _TOKEN.findall(text)
+
+class ReportIndex:
+    """Parte do índice referente a um DataFrame de relatório."""
+
+    def __init__(self, df, generation=None, signature=None):
+        import numpy as np
+        import pandas as pd
+        # Referência fraca: só para reconhecer o mesmo DataFrame no cache.
+        self.source = weakref.ref(df)
+        self.generation, self.signature = generation, signature
+        # Cópia rasa das colunas dos resultados (os textos são compartilhados com o DataFrame).
+        self.rows = df[RESULT_COLUMNS].copy()
+        postings = {}
+        for column in SEARCH_COLUMNS:
+            codes, uniques = pd.factorize(df[column])
+            # Linhas agrupadas por valor distinto: cada texto é tokenizado uma vez só.
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            for code, value in enumerate(uniques):
+                rows = order[bounds[code]:bounds[code + 1]]
+                for token in set(tokenize(value)):
+                    postings.setdefault(token, []).append(rows)
+        self.vocabulary = sorted(postings)
+        self.postings = [np.unique(np.concatenate(postings[token])) for token in self.vocabulary]
+
+    def _rows_for(self, term):
+        import numpy as np
+        lo = bisect_left(self.vocabulary, term)
+        hi = bisect_left(self.vocabulary, term + '\x7f', lo)
+        if hi - lo == 1:
+            return self.postings[lo]
+        if hi == lo:
+            return np.empty(0, dtype=np.intp)
+        return np.unique(np.concatenate(self.postings[lo:hi]))
+
+    def search(self, terms):
+        """Linhas (posições) em que todos os `terms` casam como prefixo de algum termo."""
+        import numpy as np
+        rows = None
+        for term in terms:
+            matched = self._rows_for(term)
+            rows = matched if rows is None else np.intersect1d(rows, matched, assume_unique=True)
+            if not len(rows):
+                break
+        return rows
+
+_lock = threading.Lock()
+_parts = {}
+_pending = set()
+_loader_thread = None
+
+def update(key, df, file_path=None):
+    """(Re)monta a parte do relatório `key`; chamado pelo loader do cache de relatórios."""
+    from .report_cache import report_cache
+    from .cache_store import get_file_signature
+    part = None
+    if df is not None and not df.empty:
+        signature = get_file_signature(file_path) if file_path and os.path.exists(file_path) else None
+        part = ReportIndex(df, report_cache.generation, signature)
+    with _lock:
+        _parts[key] = part
+    return part
+
+def _is_current(part, file_path):
+    from .report_cache import report_cache
+    from .cache_store import get_file_signature
+    return (part.generation == report_cache.generation and part.signature is not None
+            and os.path.exists(file_path) and part.signature == get_file_signature(file_path))
+
+def _part_for(key, data_dir):
+    """
+    (parte atual de `key` ou None, se o relatório está aguardando indexação).
+    Sem parte válida e fora do cache em memória, o carregamento vai para a thread de fundo.
+    """
+    from .report_cache import report_cache
+    file_path = os.path.join(data_dir, key)
+    df = report_cache.get(key)
+    with _lock:
+        part = _parts.get(key)
+    if df is not None:
+        if df.empty:
+            return None, False
+        if part is not None and part.source() is df:
+            return part, False
+        return update(key, df, file_path), False
+    if part is not None and _is_current(part, file_path):
+        return part, False
+    _schedule(data_dir, key)
+    return None, True
+
+def _schedule(data_dir, key):
+    global _loader_thread
+    with _lock:
+        _pending.add(key)
+        if _loader_thread is None or not _loader_thread.is_alive():
+            _loader_thread = threading.Thread(target=_load_pending, args=(data_dir,), name="search-index", daemon=True)
+            _loader_thread.start()
+
+def _load_pending(data_dir):
+    import logging
+    from .report_cache import get_processed_report
+    while True:
+        with _lock:
+            if not _pending:
+                return
+            key = _pending.pop()
+        try:
+            # O loader do cache monta a parte (update) ao carregar.
+            df = get_processed_report(os.path.join(data_dir, key), key=key)
+            with _lock:
+                part = _parts.get(key)
+            # Já estava no cache em memória (o loader não rodou): monta a parte aqui.
+            if df is not None and not df.empty and (part is None or part.source() is not df):
+                update(key, df, os.path.join(data_dir, key))
+        except Exception as e:
+            logging.getLogger(__name__).error(f"Falha ao indexar relatório: {e}", extra={"fields": {"arquivo": key}})
+
+def search(query, limit=MAX_RESULTS):
+    """
+    Busca `query` em todos os relatórios. Retorna (total de linhas encontradas,
+    [(relatório, linha)], relatórios ainda sendo indexados) com no máximo
+    `limit` linhas, na ordem dos relatórios.
+    """
+    from .data_manager import list_data_files, get_data_dir
+    terms = tokenize(query)
+    if not terms:
+        return 0, [], 0
+    data_dir = get_data_dir()
+    reports = list_data_files()
+    with _lock:
+        for key in [k for k in _parts if k not in reports]:
+            del _parts[key]
+    total, results, pending = 0, [], 0
+    for key in reports:
+        part, waiting = _part_for(key, data_dir)
+        pending += waiting
+        if part is None:
+            continue
+        rows = part.search(terms)
+        total += len(rows)
+        for row in rows[:max(limit - len(results), 0)]:
+            results.append((key, part.rows.iloc[row]))
+    return total, results, pending
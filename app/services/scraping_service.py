@@ -1,42 +1,86 @@
 import asyncio
+import heapq
 import pandas as pd
 import json
 import re
 import os
 import random
-from playwright.async_api import async_playwright, TimeoutError
-from bs4 import BeautifulSoup
+import time
 from app.data_processor import extract_product_and_issuer
+from app.issuers import canonical_names, issuer_slug
+
+# --- Checkpoint e novas tentativas ---
+# Cada emissor concluído vira uma linha no arquivo JSONL de checkpoint (ao lado
+# do JSON final), gravada e sincronizada em disco na hora. Se a execução cair,
+# a próxima retoma a partir dele e só visita os emissores que faltam. Emissores
+# que dão timeout voltam para uma fila com espera exponencial (com jitter) até
+# MAX_ATTEMPTS tentativas. O checkpoint é apagado quando todos os emissores
+# terminam; se algum esgotar as tentativas ele fica, e a próxima execução tenta
+# só esses de novo.
+MAX_ATTEMPTS = 4
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 600
+
+# Status finais no checkpoint: 'ok' (com dados) e 'sem_dados' (página sem o layout esperado).
+DONE_STATUSES = ('ok', 'sem_dados')
+
+class ScrapeTimeout(Exception):
+    """A página do emissor não carregou a tempo; vale tentar de novo mais tarde."""
+
+def get_checkpoint_path(bancodata_json_path):
+    return os.path.splitext(bancodata_json_path)[0] + '.checkpoint.jsonl'
+
+def load_checkpoint(checkpoint_path):
+    """
+    Lê o checkpoint e retorna {emissor: último registro}. Uma última linha
+    truncada (queda no meio da gravação) é ignorada.
+    """
+    records = {}
+    if not os.path.exists(checkpoint_path):
+        return records
+    with open(checkpoint_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            records[record['emissor']] = record
+    return records
+
+def append_checkpoint(f, record):
+    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    f.flush()
+    os.fsync(f.fileno())
+
+def backoff_delay(attempt):
+    """Espera antes da tentativa `attempt + 1`: exponencial a partir de BACKOFF_BASE_SECONDS, com jitter."""
+    delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempt - 1), BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+def write_results(records, bancodata_json_path):
+    """Grava o JSON final (só emissores com dados) de forma atômica."""
+    all_bank_data = {issuer: r['dados'] for issuer, r in sorted(records.items()) if r['status'] == 'ok'}
+    tmp_path = f"{bancodata_json_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(all_bank_data, f, ensure_ascii=False, indent=4)
+    os.replace(tmp_path, bancodata_json_path)
+    return all_bank_data
 
-# (As funções auxiliares como get_project_root, clean_issuer_name_for_url, etc. permanecem as mesmas)
 def get_project_root():
     return os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 def clean_issuer_name_for_url(name):
-    # Mapeamento para URLs específicas do bancodata.com.br
-    mapping = {
-        "BANCO NACIONAL DE DESENVOLVIMENTO ECONOMICO E SOCI": "bndes",
-        "Agrolend SCFI": "agrolend",
-        "Banco ABC": "banco-abc-brasil",
-        "C6": "banco-c6",
-        "Banco Randon": "banco-randon"
-    }
-    # Verifica se o nome exato está no mapeamento
-    for key, value in mapping.items():
-        if key.lower() in name.lower():
-            return value
-            
-    # Lógica padrão para os outros casos
-    name = re.sub(r'banco', '', name, flags=re.IGNORECASE).strip()
-    name = name.lower()
-    name = re.sub(r'[^a-z0-9\s-]', '', name)
-    name = re.sub(r'\s+', '-', name)
-    return name
+    # Slugs específicos do bancodata.com.br ficam no registro de emissores (app/issuers.py).
+    return issuer_slug(name)
 
 async def fetch_bank_data_robust(page, original_name):
     """
     Tenta extrair dados de um emissor usando técnicas avançadas para evitar bloqueios.
     """
+    # playwright e BeautifulSoup só são carregados quando o scraping realmente roda.
+    from playwright.async_api import TimeoutError
+    from bs4 import BeautifulSoup
+
     issuer_slug = clean_issuer_name_for_url(original_name)
     url = f"https://bancodata.com.br/relatorio/{issuer_slug}/"
     print(f"INFO: [Scraper] Tentando emissor '{original_name}' na URL: {url}")
@@ -83,12 +127,52 @@ async def fetch_bank_data_robust(page, original_name):
         
     except TimeoutError:
         print(f"WARN: [Scraper] Timeout para '{original_name}'. O site pode estar bloqueando o acesso, ou a página/relatório não existe.")
-        return None
+        raise ScrapeTimeout(original_name)
     except Exception as e:
         print(f"ERROR: [Scraper] Erro inesperado ao processar '{original_name}': {e}")
         return None
 
-async def run_scraping_async(product_data_path, bancodata_json_path):
+async def scrape_issuers(page, issuers, checkpoint_path, fetch=None):
+    """
+    Visita os `issuers` gravando cada resultado no checkpoint assim que sai.
+    Timeouts voltam para a fila com backoff exponencial. Retorna {emissor: registro}
+    com o que já estava no checkpoint mais o desta execução.
+    """
+    fetch = fetch or fetch_bank_data_robust
+    records = load_checkpoint(checkpoint_path)
+    pending = [issuer for issuer in issuers if records.get(issuer, {}).get('status') not in DONE_STATUSES]
+    if len(pending) < len(issuers):
+        print(f"INFO: [Scraper] Retomando do checkpoint: {len(issuers) - len(pending)} emissores já concluídos, {len(pending)} pendentes.")
+
+    # Fila (pronto_em, ordem, emissor, tentativas): os novos entram prontos; os que deram timeout, adiados.
+    queue = [(0.0, i, issuer, 0) for i, issuer in enumerate(pending)]
+    heapq.heapify(queue)
+    order = len(queue)
+    with open(checkpoint_path, 'a', encoding='utf-8') as checkpoint:
+        while queue:
+            ready_at, _, issuer, attempts = heapq.heappop(queue)
+            wait = ready_at - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            attempts += 1
+            try:
+                data = await fetch(page, issuer)
+                record = {"emissor": issuer, "status": 'ok' if data else 'sem_dados', "dados": data, "tentativas": attempts}
+            except ScrapeTimeout:
+                if attempts < MAX_ATTEMPTS:
+                    delay = backoff_delay(attempts)
+                    print(f"INFO: [Scraper] '{issuer}' volta para a fila em {delay:.0f}s (tentativa {attempts} de {MAX_ATTEMPTS}).")
+                    heapq.heappush(queue, (time.monotonic() + delay, order, issuer, attempts))
+                    order += 1
+                    continue
+                record = {"emissor": issuer, "status": 'timeout', "dados": None, "tentativas": attempts}
+            append_checkpoint(checkpoint, record)
+            records[issuer] = record
+            await asyncio.sleep(random.uniform(1, 3))
+    return records
+
+async def run_scraping_async(product_data_path, bancodata_json_path, resume=True):
+    from playwright.async_api import async_playwright
     try:
         # 1. Ler o arquivo Excel
         df_raw = pd.read_excel(product_data_path, header=2, dtype=str)
@@ -107,14 +191,17 @@ async def run_scraping_async(product_data_path, bancodata_json_path):
         df_raw.dropna(subset=['produto'], inplace=True)
         # **FIM DA CORREÇÃO**
 
-        emissores = df_raw['produto'].apply(extract_product_and_issuer).apply(lambda x: x[1])
+        emissores = canonical_names(df_raw['produto'].apply(extract_product_and_issuer).apply(lambda x: x[1]))
         emissores_unicos = sorted(emissores[emissores != 'N/A'].dropna().unique())
         print(f"INFO: Emissores únicos encontrados para scraping: {emissores_unicos}")
     except Exception as e:
         print(f"ERROR: Falha ao ler e processar o arquivo Excel para extrair emissores: {e}")
         return
 
-    all_bank_data = {}
+    checkpoint_path = get_checkpoint_path(bancodata_json_path)
+    if not resume and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=True)
         context = await browser.new_context(
@@ -123,24 +210,26 @@ async def run_scraping_async(product_data_path, bancodata_json_path):
         )
         page = await context.new_page()
 
-        for issuer in emissores_unicos:
-            data = await fetch_bank_data_robust(page, issuer)
-            if data:
-                all_bank_data[issuer] = data
-            await asyncio.sleep(random.uniform(1, 3))
+        try:
+            records = await scrape_issuers(page, emissores_unicos, checkpoint_path)
+        finally:
+            await browser.close()
 
-        await browser.close()
+    records = {issuer: records[issuer] for issuer in emissores_unicos if issuer in records}
+    all_bank_data = write_results(records, bancodata_json_path)
+    failed = [issuer for issuer, r in records.items() if r['status'] not in DONE_STATUSES]
+    if failed:
+        print(f"WARN: [Scraper] {len(failed)} emissores esgotaram as tentativas: {failed}. O checkpoint foi mantido em {checkpoint_path}; a próxima execução tenta só esses.")
+    else:
+        os.remove(checkpoint_path)
 
-    with open(bancodata_json_path, 'w', encoding='utf-8') as f:
-        json.dump(all_bank_data, f, ensure_ascii=False, indent=4)
-        
     print(f"\nSUCCESS: Scraping concluído! Dados de {len(all_bank_data)} de {len(emissores_unicos)} emissores foram salvos em {bancodata_json_path}")
 
-def run_scraping_service(project_root):
+def run_scraping_service(project_root, resume=True):
     product_path = os.path.join(project_root, 'data', 'credito bancario.xlsx')
     json_path = os.path.join(project_root, 'data', 'dados_bancodata.json')
     os.makedirs(os.path.dirname(json_path), exist_ok=True)
     if not os.path.exists(product_path):
         print(f"ERROR: [Scraping Service] O arquivo de produtos não foi encontrado em '{product_path}'. Abortando.")
         return
-    asyncio.run(run_scraping_async(product_path, json_path))
\ No newline at end of file
+    asyncio.run(run_scraping_async(product_path, json_path, resume=resume))
\ No newline at end of file
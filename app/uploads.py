@@ -0,0 +1,152 @@
+import os
+import logging
+import tempfile
+import zipfile
+from . import cache_store
+
+logger = logging.getLogger(__name__)
+
+# Limites de um .zip enviado, conferidos antes de descompactar (proteção contra
+# "zip bombs"): quantidade de planilhas e tamanho descompactado de cada uma e do total.
+ZIP_MAX_MEMBERS = 200
+ZIP_MAX_MEMBER_BYTES = 100 * 1024 * 1024
+ZIP_MAX_TOTAL_BYTES = 500 * 1024 * 1024
+
+def save_upload(stream, data_dir, filename):
+    """
+    Grava a planilha enviada em `data_dir`, calculando o SHA-256 enquanto copia.
+
+    Retorna um dicionário com 'arquivo', 'digest' e 'status':
+      - 'identico':   já existia um arquivo com esse nome e o mesmo conteúdo;
+                      nada foi alterado em disco e não há o que reprocessar
+      - 'novo' / 'atualizado': o arquivo foi gravado; 'reaproveitado' indica se
+                      esse conteúdo já tinha sido processado antes (sem reprocessamento)
+    """
+    filename = os.path.basename(filename)
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, filename)
+    # O arquivo temporário começa com '.', então não aparece como relatório enquanto é
+    # gravado, e tem nome único: dois envios simultâneos do mesmo arquivo não se misturam.
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{filename}.", suffix=".upload", dir=data_dir)
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            digest = cache_store.hash_stream(stream, sink=out)
+
+        existed = os.path.exists(path)
+        if existed and cache_store.file_digest(filename, path) == digest:
+            os.remove(tmp_path)
+            logger.info("Upload idêntico ao arquivo existente; nada a reprocessar.", extra={"fields": {"arquivo": filename}})
+            return {"arquivo": filename, "digest": digest, "status": "identico", "reaproveitado": True}
+
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    cache_store.record_digest(filename, cache_store.get_file_signature(path), digest)
+    reused = cache_store.has_content(digest)
+    logger.info("Upload gravado.", extra={"fields": {"arquivo": filename, "digest": digest[:12], "reaproveitado": reused}})
+    return {"arquivo": filename, "digest": digest, "status": "atualizado" if existed else "novo", "reaproveitado": reused}
+
+class ZipLimitError(ValueError):
+    """O .zip enviado passa dos limites de membros ou de tamanho descompactado."""
+
+def _zip_workbook_members(archive):
+    members = []
+    for member in archive.infolist():
+        name = os.path.basename(member.filename)
+        if member.is_dir() or not name.endswith('.xlsx') or name.startswith(('.', '~$')) or '__MACOSX' in member.filename:
+            continue
+        members.append(member)
+    return members
+
+def iter_zip_workbooks(stream):
+    """
+    Percorre as planilhas .xlsx de um .zip, devolvendo (nome, fluxo) de cada uma.
+    Os membros são descompactados sob demanda, um por vez, direto para o disco.
+
+    Antes de descompactar qualquer coisa, confere no diretório do zip a
+    quantidade de planilhas e o tamanho descompactado declarado de cada uma e do
+    total (ZIP_MAX_MEMBERS, ZIP_MAX_MEMBER_BYTES, ZIP_MAX_TOTAL_BYTES); acima
+    disso levanta ZipLimitError. O zipfile não lê além do tamanho declarado,
+    então um membro não consegue crescer depois da verificação.
+    """
+    with zipfile.ZipFile(stream) as archive:
+        members = _zip_workbook_members(archive)
+        if len(members) > ZIP_MAX_MEMBERS:
+            raise ZipLimitError(f"o .zip tem {len(members)} planilhas (máximo {ZIP_MAX_MEMBERS}).")
+        for member in members:
+            if member.file_size > ZIP_MAX_MEMBER_BYTES:
+                raise ZipLimitError(f"'{os.path.basename(member.filename)}' tem {member.file_size // 2**20} MB "
+                                    f"descompactado (máximo {ZIP_MAX_MEMBER_BYTES // 2**20} MB por planilha).")
+        total = sum(member.file_size for member in members)
+        if total > ZIP_MAX_TOTAL_BYTES:
+            raise ZipLimitError(f"o conteúdo descompactado soma {total // 2**20} MB (máximo {ZIP_MAX_TOTAL_BYTES // 2**20} MB).")
+        for member in members:
+            with archive.open(member) as member_stream:
+                yield os.path.basename(member.filename), member_stream
+
+def save_uploads(files, data_dir):
+    """
+    Grava vários uploads (FileStorage do Flask): planilhas .xlsx e arquivos .zip
+    com planilhas. Retorna (resultados de save_upload, [(nome ignorado, motivo)]).
+    """
+    results, skipped = [], []
+    for file in files:
+        if not file or not file.filename:
+            continue
+        if file.filename.lower().endswith('.zip'):
+            try:
+                for name, member_stream in iter_zip_workbooks(file.stream):
+                    results.append(save_upload(member_stream, data_dir, name))
+            except zipfile.BadZipFile:
+                skipped.append((file.filename, "o .zip está corrompido."))
+            except ZipLimitError as e:
+                skipped.append((file.filename, str(e)))
+        elif file.filename.endswith('.xlsx'):
+            results.append(save_upload(file.stream, data_dir, file.filename))
+        else:
+            skipped.append((file.filename, "envie planilhas .xlsx ou um .zip com planilhas."))
+    return results, skipped
+
+def _process_content(file_path, digest):
+    """Executado nos processos do pool: processa a planilha e grava o resultado pelo conteúdo."""
+    from .data_processor import process_data
+    # O observador da pasta (ou outro worker) pode já ter visto a planilha nova e
+    # estar processando o mesmo conteúdo: nesse caso basta esperar o resultado.
+    while not cache_store.has_content(digest):
+        if not cache_store.claim_content(digest):
+            if cache_store.wait_for_content(digest) is not None:
+                break
+            continue
+        try:
+            df = process_data(file_path)
+            # Resultado vazio não é gravado: o conteúdo volta a ser processado no próximo acesso.
+            if not df.empty:
+                cache_store.store_content(digest, df)
+        finally:
+            cache_store.release_content(digest)
+        break
+    return digest
+
+def process_uploads(results, data_dir, max_workers=None):
+    """
+    Processa, antes da troca de geração, as planilhas cujo conteúdo ainda não
+    foi visto: em um pool de processos quando houver mais de uma. Como os
+    resultados ficam endereçados pelo conteúdo, valem para a geração seguinte.
+    """
+    pending = {r["digest"]: os.path.join(data_dir, r["arquivo"])
+               for r in results if r["status"] != "identico" and not r["reaproveitado"]}
+    from .worker_pool import process_pool
+    if len(pending) > 1:
+        try:
+            with process_pool(max_workers) as executor:
+                futures = [executor.submit(_process_content, path, digest) for digest, path in pending.items()]
+                for future in futures:
+                    future.result()
+            return len(pending)
+        except Exception as e:
+            logger.warning(f"Pool de processamento falhou ({e}). Processando localmente.")
+    for digest, path in pending.items():
+        _process_content(path, digest)
+    return len(pending)
@@ -0,0 +1,103 @@
+import threading
+import weakref
+from collections import OrderedDict, namedtuple
+
+# --- Modelos de visualização do ranking ---
+# O resultado de find_best_assets é convertido uma única vez em seções de
+# tuplas com os textos já formatados (datas, reais, percentuais). A mesma
+# estrutura alimenta results.html, o PDF e a planilha, então a formatação fica
+# num lugar só e nenhum deles percorre DataFrames linha a linha.
+#
+# Os valores numéricos ('aplicacao_minima_valor', 'taxa_anual_valor' e
+# 'roa_valor') seguem junto para a planilha, que mantém a sua própria formatação,
+# assim como 'ordem', a posição da linha no resultado de find_best_assets.
+
+AssetRow = namedtuple('AssetRow', ['produto', 'emissor', 'vencimento', 'taxa', 'ir', 'aplicacao_minima', 'roa',
+                                   'taxa_anual', 'aplicacao_minima_valor', 'taxa_anual_valor', 'roa_valor', 'ordem'])
+Section = namedtuple('Section', ['titulo', 'linhas'])
+ResultView = namedtuple('ResultView', ['secoes', 'inclui_roa'])
+
+# Quantas visualizações manter em memória (uma por combinação de filtros).
+MAX_VIEWS = 128
+
+def format_brl(value):
+    if value is None or value != value:
+        return ""
+    return f"R$ {value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+def format_percent(value, scale=1.0):
+    if value is None or value != value:
+        return ""
+    return f"{value * scale:.2f}%".replace(".", ",")
+
+def _rows(df):
+    """Converte as linhas de `df` em AssetRow, formatando coluna a coluna."""
+    if df.empty:
+        return []
+    minimums = df['Aplicacao_Minima'].astype(float).tolist()
+    annual = df['Taxa_Anual'].astype(float).tolist() if 'Taxa_Anual' in df.columns else [None] * len(df)
+    roa = df['Roa'].astype(float).tolist() if 'Roa' in df.columns else [None] * len(df)
+    columns = zip(
+        df['Produto'].astype(str).tolist(),
+        df['Emissor_Display'].astype(str).tolist(),
+        df['Vencimento'].dt.strftime('%d/%m/%Y').tolist(),
+        df['Taxa_str'].astype(str).tolist(),
+        df['IR'].astype(str).tolist(),
+        [format_brl(v) for v in minimums],
+        [format_percent(v, 100) for v in roa],
+        [format_percent(v) for v in annual],
+        minimums,
+        annual,
+        roa,
+        df['_ordem'].tolist(),
+    )
+    return [AssetRow(*values) for values in columns]
+
+def build_result_view(data, include_roa):
+    """
+    Seções do relatório na ordem exibida: liquidez imediata, liquidez diária e
+    um bloco por ano de vencimento. Seções vazias são omitidas.
+    """
+    sections = []
+    if data.empty:
+        return ResultView(sections, include_roa)
+    data = data.assign(_ordem=range(len(data)))
+    immediate = data[data['Sem_Carencia'] == True]
+    daily = data[(data['Liquidez_Diaria'] == True) & (data['Sem_Carencia'] == False)]
+    term = data[data['Liquidez_Diaria'] == False]
+    if not immediate.empty:
+        sections.append(Section("Liquidez Imediata (sem carência)", _rows(immediate)))
+    if not daily.empty:
+        sections.append(Section("Ativos com Liquidez Diária", _rows(daily)))
+    for year, group in term.groupby('Ano_Vencimento'):
+        sections.append(Section(f"Ano de Vencimento: {int(year)}", _rows(group)))
+    return ResultView(sections, include_roa)
+
+def as_result_view(data, include_roa):
+    """Aceita um ResultView pronto ou o DataFrame de find_best_assets."""
+    return data if isinstance(data, ResultView) else build_result_view(data, include_roa)
+
+_lock = threading.Lock()
+_views = OrderedDict()
+
+def get_result_view(key, source, build):
+    """
+    Visualização em cache para `key`, válida enquanto o DataFrame de origem
+    (`source`, devolvido pelo cache de relatórios) for o mesmo objeto. `build()`
+    só é chamado na ausência e deve retornar um ResultView.
+
+    A origem é guardada por referência fraca: uma visualização em cache não
+    impede que o cache de relatórios libere o DataFrame (despejo LRU ou limpeza).
+    """
+    with _lock:
+        entry = _views.get(key)
+        if entry is not None and entry[0]() is source:
+            _views.move_to_end(key)
+            return entry[1]
+    view = build()
+    with _lock:
+        _views[key] = (weakref.ref(source), view)
+        _views.move_to_end(key)
+        while len(_views) > MAX_VIEWS:
+            _views.popitem(last=False)
+    return view
@@ -0,0 +1,93 @@
+import os
+import logging
+import threading
+from concurrent.futures import as_completed
+from datetime import datetime
+from .report_cache import get_processed_report, load_or_process
+from . import cache_store
+
+logger = logging.getLogger(__name__)
+
+# --- Estado do pré-carregamento (consultado pelo endpoint de prontidão) ---
+_state_lock = threading.Lock()
+_state = {"status": "idle", "total": 0, "done": 0, "failed": [], "started_at": None, "finished_at": None}
+
+def get_warmup_status():
+    """Retorna uma cópia do estado atual do pré-carregamento."""
+    with _state_lock:
+        status = dict(_state)
+        status["failed"] = list(_state["failed"])
+    return status
+
+def _update_state(**changes):
+    with _state_lock:
+        _state.update(changes)
+
+def _load_local(data_dir, report, loaded):
+    try:
+        # Traz o relatório do cache compartilhado para a memória deste processo.
+        get_processed_report(os.path.join(data_dir, report), key=report)
+    except Exception as e:
+        logger.error(f"Falha ao pré-carregar: {e}", extra={"fields": {"arquivo": report}})
+        with _state_lock:
+            _state["failed"].append(report)
+    loaded.add(report)
+    with _state_lock:
+        _state["done"] += 1
+
+def warm_report(file_path, key):
+    """
+    Executado em um processo separado: processa o arquivo e grava o resultado
+    no cache compartilhado (e no histórico). Nada é devolvido para evitar
+    serializar o DataFrame de volta; o processo principal o lê do cache_store.
+    """
+    load_or_process(file_path, key, cache_store.get_generation())
+    return key
+
+def _run_warmup(data_dir, reports, max_workers):
+    from .worker_pool import process_pool
+    logger.info("Pré-carregando relatórios em segundo plano...", extra={"fields": {"relatorios": len(reports)}})
+    loaded = set()
+    # O estado sempre termina como 'ready' ou 'failed', mesmo que algo escape
+    # abaixo; senão /ready ficaria respondendo 503 para sempre.
+    status = "failed"
+    try:
+        try:
+            with process_pool(max_workers) as executor:
+                futures = {executor.submit(warm_report, os.path.join(data_dir, r), r): r for r in reports}
+                for future in as_completed(futures):
+                    report = futures[future]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        # Se o processo auxiliar falhar, o relatório é processado nesta thread mesmo.
+                        logger.warning(f"Processo auxiliar falhou ({e}). Processando localmente.", extra={"fields": {"arquivo": report}})
+                    _load_local(data_dir, report, loaded)
+        except Exception as e:
+            # Pool indisponível (não subiu ou quebrou no meio): o que faltou é carregado nesta thread.
+            logger.warning(f"Pool de pré-carregamento falhou ({e}). Carregando localmente.")
+            for report in reports:
+                if report not in loaded:
+                    _load_local(data_dir, report, loaded)
+        status = "ready"
+        logger.info("Pré-carregamento concluído.")
+    except Exception as e:
+        logger.error(f"Pré-carregamento interrompido: {e}")
+    finally:
+        _update_state(status=status, finished_at=datetime.now().isoformat(timespec='seconds'))
+
+def start_warmup(data_dir, reports, max_workers=None):
+    """
+    Inicia, em uma thread de fundo, o processamento paralelo de todos os
+    relatórios informados. Retorna a thread criada (ou None se não houver nada a fazer).
+    """
+    if not reports:
+        _update_state(status="ready", total=0, done=0)
+        return None
+
+    _update_state(status="warming", total=len(reports), done=0, failed=[],
+                  started_at=datetime.now().isoformat(timespec='seconds'), finished_at=None)
+    thread = threading.Thread(target=_run_warmup, args=(data_dir, list(reports), max_workers),
+                              name="cache-warmup", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,57 @@
+import os
+
+# --- Pools de processos auxiliares ---
+# Pré-carregamento, PDFs em lote, uploads e 'python -m app ingest' processam em
+# pools 'spawn' (evita herdar locks de outras threads do servidor no fork). Os
+# processos auxiliares não executam create_app: recebem pelo initializer apenas
+# as configurações que afetam o processamento (histórico, premissas de taxas,
+# apelidos de emissores, deduplicação) e aplicam nos módulos, como create_app
+# faz no processo principal. Assim a planilha processada num auxiliar sai igual
+# à processada pelo servidor.
+
+_settings = {}
+
+def settings_from_config(config):
+    """Configurações repassadas aos auxiliares, a partir da config da aplicação (ou das variáveis de ambiente)."""
+    return {
+        'HISTORY_ENABLED': config.get('HISTORY_ENABLED', os.environ.get('HISTORY_ENABLED', '1') == '1'),
+        'HISTORY_DIR': config.get('HISTORY_DIR', os.environ.get('REPORTS_HISTORY_DIR')),
+        'RATE_ASSUMPTIONS': dict(config.get('RATE_ASSUMPTIONS', {})),
+        'ISSUER_ALIASES': dict(config.get('ISSUER_ALIASES', {})),
+        'DEDUPE_PRECEDENCE': config.get('DEDUPE_PRECEDENCE', os.environ.get('DEDUPE_PRECEDENCE', 'recente')),
+        'DEDUPE_SOURCE_ORDER': list(config.get('DEDUPE_SOURCE_ORDER', [])),
+    }
+
+def apply_settings(settings):
+    """Aplica as configurações nos módulos deste processo e as guarda para os pools criados depois."""
+    global _settings
+    from . import history_store, rates, issuers, dedupe
+    history_store.ENABLED = settings['HISTORY_ENABLED']
+    history_store.HISTORY_DIR = settings['HISTORY_DIR']
+    rates.ASSUMPTIONS.update(settings['RATE_ASSUMPTIONS'])
+    for issuer_id, entry in settings['ISSUER_ALIASES'].items():
+        issuers.register(issuer_id, entry['nome'], entry.get('apelidos', ()), entry.get('slug'))
+    dedupe.PRECEDENCE = settings['DEDUPE_PRECEDENCE']
+    dedupe.SOURCE_ORDER = list(settings['DEDUPE_SOURCE_ORDER'])
+    _settings = settings
+
+def _init_worker(settings, log_level):
+    from .logging_config import configure_logging
+    configure_logging(log_level)
+    apply_settings(settings)
+
+def in_worker_process():
+    """True dentro de um processo criado por multiprocessing (auxiliar de algum pool)."""
+    import multiprocessing
+    return multiprocessing.parent_process() is not None
+
+def process_pool(max_workers=None):
+    """ProcessPoolExecutor 'spawn' cujos processos recebem as configurações atuais deste processo."""
+    import logging
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    settings = _settings or settings_from_config({})
+    # O nível de log também segue o do processo principal (ex.: 'python -m app -q').
+    log_level = logging.getLogger('app').getEffectiveLevel()
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=_init_worker, initargs=(settings, log_level))
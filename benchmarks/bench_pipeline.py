@@ -0,0 +1,141 @@
+"""
+Benchmark do pipeline com planilhas sintéticas (ver benchmarks/synthetic.py).
+
+Para cada layout e tamanho mede vazão (linhas/s) e pico de memória de:
+process_data, filter_dataframe, find_best_assets e create_pdf_report.
+
+Uso:
+    python benchmarks/bench_pipeline.py                          # 1k, 10k e 100k linhas
+    python benchmarks/bench_pipeline.py --sizes 1000 --layouts bancario titulos
+    python benchmarks/bench_pipeline.py --json atual.json        # salva os resultados
+    python benchmarks/bench_pipeline.py --baseline base.json     # falha se houver regressão
+
+As planilhas geradas ficam em benchmarks/.data e são reaproveitadas entre execuções.
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+import warnings
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from werkzeug.datastructures import MultiDict
+
+from benchmarks.synthetic import LAYOUTS, write_workbook
+from app.data_processor import process_data
+from app.analysis import find_best_assets
+from app.pdf_generator import create_pdf_report
+from app.routes import filter_dataframe
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DATA_DIR = os.path.join(PROJECT_ROOT, 'benchmarks', '.data')
+LOGO_PATH = os.path.join(PROJECT_ROOT, 'app', 'static', 'logo.png')
+
+def measure(func, repeat):
+    """Executa `func` `repeat` vezes (mediana do tempo) e mais uma vez sob tracemalloc (pico de memória)."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, statistics.median(timings), peak
+
+def typical_filter_args(df):
+    """Seleção parecida com a de um assessor: metade dos anos, todos os tipos, sem liquidez diária."""
+    anos = sorted(df.loc[~df['Liquidez_Diaria'], 'Ano_Vencimento'].unique())
+    args = MultiDict([('ano', str(a)) for a in anos[::2]])
+    for produto in sorted(df['Tipo_Produto_Base'].unique()):
+        args.add('produto', produto)
+    for ir in sorted(df['IR'].unique()):
+        args.add('ir', ir)
+    return args
+
+def bench_layout(layout, size, repeat):
+    path = write_workbook(layout, size, DATA_DIR)
+    rows = {}
+
+    df, seconds, peak = measure(lambda: process_data(path), max(1, repeat // 2))
+    rows['process_data'] = (size, seconds, peak)
+    if df.empty:
+        raise RuntimeError(f"process_data não retornou dados para o layout '{layout}' ({size} linhas).")
+
+    args = typical_filter_args(df)
+    df_filtrado, seconds, peak = measure(lambda: filter_dataframe(df, args), repeat)
+    rows['filter_dataframe'] = (len(df), seconds, peak)
+
+    analysis, seconds, peak = measure(lambda: find_best_assets(df_filtrado, top_n=8), repeat)
+    rows['find_best_assets'] = (len(df_filtrado), seconds, peak)
+
+    _, seconds, peak = measure(lambda: create_pdf_report(analysis, include_roa=True, logo_path=LOGO_PATH), repeat)
+    rows['create_pdf_report'] = (len(analysis), seconds, peak)
+
+    return [
+        {"layout": layout, "size": size, "stage": stage, "rows": n, "seconds": seconds,
+         "rows_per_second": (n / seconds) if seconds > 0 else None, "peak_bytes": peak}
+        for stage, (n, seconds, peak) in rows.items()
+    ]
+
+def compare(results, baseline_path, tolerance):
+    """Retorna a lista de regressões (tempo acima de baseline * (1 + tolerance))."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(r["layout"], r["size"], r["stage"]): r for r in json.load(f)}
+    regressions = []
+    for r in results:
+        base = baseline.get((r["layout"], r["size"], r["stage"]))
+        if base and base["seconds"] > 0 and r["seconds"] > base["seconds"] * (1 + tolerance):
+            regressions.append(f"{r['layout']}/{r['size']}/{r['stage']}: {base['seconds']:.4f}s -> {r['seconds']:.4f}s")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--layouts', nargs='+', choices=LAYOUTS, default=list(LAYOUTS))
+    parser.add_argument('--repeat', type=int, default=3, help="Repetições por medição (usa-se a mediana).")
+    parser.add_argument('--json', dest='json_path', help="Grava os resultados neste arquivo JSON.")
+    parser.add_argument('--baseline', help="JSON de uma execução anterior para detectar regressões.")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Regressão tolerada sobre a baseline (0.25 = 25%%).")
+    args = parser.parse_args(argv)
+
+    logging.getLogger('app').setLevel(logging.WARNING)
+    warnings.filterwarnings('ignore')
+
+    print(f"{'layout':<15}{'linhas':>8}  {'etapa':<18}{'entrada':>9}{'tempo (s)':>11}{'linhas/s':>12}{'pico (MB)':>11}")
+    results = []
+    for layout in args.layouts:
+        for size in args.sizes:
+            for r in bench_layout(layout, size, args.repeat):
+                results.append(r)
+                rate = f"{r['rows_per_second']:,.0f}" if r['rows_per_second'] else '-'
+                print(f"{layout:<15}{size:>8}  {r['stage']:<18}{r['rows']:>9}{r['seconds']:>11.4f}{rate:>12}"
+                      f"{r['peak_bytes'] / 1024 / 1024:>11.1f}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        if regressions:
+            print("\nREGRESSÕES:")
+            for line in regressions:
+                print(f" - {line}")
+            return 1
+        print("\nOK: nenhuma regressão acima da tolerância.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
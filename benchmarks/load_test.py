@@ -0,0 +1,289 @@
+"""
+Teste de carga das rotas do Flask com combinações aleatórias de filtros.
+
+Cada requisição sorteia um relatório e uma seleção de filtros a partir de
+data_manager.get_filter_options() (anos, tipos de produto e de taxa, emissores,
+IR, ordenação, tipo de relatório), como um assessor faria no formulário. As
+rotas são medidas uma de cada vez, com `--concurrency` threads em paralelo, e
+para cada uma saem vazão, latências p50/p95/p99, erros e memória (RSS) do processo.
+
+Uso:
+    python benchmarks/load_test.py                                # pasta data/ atual
+    python benchmarks/load_test.py --synthetic 10000              # planilhas sintéticas, offline
+    python benchmarks/load_test.py --routes results pdf --requests 500 --concurrency 8
+    python benchmarks/load_test.py --config REPORT_CACHE_MAX_BYTES=67108864 --json pequeno.json
+    python benchmarks/load_test.py --baseline atual.json          # falha se o p95 piorar
+    python benchmarks/load_test.py --url http://localhost:5000    # servidor já rodando (sem RSS)
+
+Com --synthetic, as planilhas ficam em benchmarks/.data (reaproveitadas) e o
+cache vai para uma pasta temporária, sem tocar em data/ e cache/. O histórico
+de taxas e o observador da pasta ficam sempre desligados durante o teste.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+SYNTHETIC_DIR = os.path.join(PROJECT_ROOT, 'benchmarks', '.data')
+
+# Rota medida -> caminho. 'results' e 'pdf' usam os filtros sorteados.
+ROUTES = {
+    'index': '/',
+    'results': '/results',
+    'pdf': '/download/pdf',
+    'facets': '/api/facets',
+    'search': '/api/search',
+}
+DEFAULT_ROUTES = ('results', 'pdf')
+
+def current_rss():
+    """RSS atual do processo em bytes (Linux); fora do Linux, o pico (ru_maxrss)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return peak_rss()
+
+def peak_rss():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def percentile(sorted_values, p):
+    """Percentil pelo método do posto mais próximo."""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(p / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def _subset(rng, values, keep_all_probability=0.5, minimum=1):
+    """Todos os valores (lista vazia = sem filtro) ou um subconjunto aleatório."""
+    values = list(values)
+    if not values or rng.random() < keep_all_probability:
+        return []
+    return rng.sample(values, rng.randint(min(minimum, len(values)), len(values)))
+
+def random_query(rng, reports, options, route):
+    """Sorteia os parâmetros de uma requisição para `route`."""
+    report = rng.choice(reports)
+    if route == 'search':
+        words = [e for e in options['emissores'] if e != 'N/A'] + options['tipos_produto']
+        word = rng.choice(words) if words else 'cdb'
+        return {'q': word[:rng.randint(2, max(2, len(word)))]}
+    if route == 'index':
+        return {'report': report}
+    if route == 'facets':
+        return {'report': report, 'anos': [str(a) for a in _subset(rng, options['anos'])],
+                'taxas': _subset(rng, options['tipos_taxa'])}
+
+    query = {
+        'report': report,
+        'ano': [str(a) for a in _subset(rng, options['anos'], keep_all_probability=0.2)],
+        'produto': _subset(rng, options['tipos_produto']),
+        'taxa': _subset(rng, options['tipos_taxa']),
+        'ir': _subset(rng, options['tipos_ir'], keep_all_probability=0.7),
+        'emissor': _subset(rng, options['emissores'], keep_all_probability=0.8)[:5],
+        'report_type': rng.choice(['cliente', 'assessor']),
+        'liquidez_diaria': 'on' if rng.random() < 0.15 else 'off',
+        'ordenacao': rng.choice(['bruta', 'liquida', 'equivalente']),
+    }
+    if rng.random() < 0.2:
+        query['max_por_emissor'] = rng.randint(1, 3)
+    if rng.random() < 0.2:
+        query['peso_taxa'], query['peso_aplicacao'] = rng.randint(1, 3), rng.randint(0, 2)
+    return query
+
+class TestClientTarget:
+    """Dispara as requisições pelo test client do Flask, no mesmo processo (RSS medido)."""
+    __test__ = False  # não é uma classe de testes do pytest, apesar do nome
+    measures_memory = True
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def get(self, path, query):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.get(path, query_string=query)
+        response.get_data()
+        return response.status_code
+
+class HttpTarget:
+    """Dispara as requisições contra um servidor já em execução."""
+    measures_memory = False
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def get(self, path, query):
+        url = f"{self.base_url}{path}?{urllib.parse.urlencode(query, doseq=True)}"
+        try:
+            with urllib.request.urlopen(url, timeout=120) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+def run_route(target, route, queries, concurrency):
+    """Executa `queries` em `route` com `concurrency` threads; retorna o resumo da rota."""
+    path = ROUTES[route]
+    latencies, statuses = [], []
+    lock = threading.Lock()
+    rss_before = current_rss() if target.measures_memory else None
+
+    def one(query):
+        start = time.perf_counter()
+        try:
+            status = target.get(path, query)
+        except Exception:
+            status = 599
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            statuses.append(status)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, queries))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    ms = lambda p: percentile(latencies, p) * 1000 if latencies else None
+    return {
+        "route": route, "requests": len(latencies), "concurrency": concurrency,
+        "errors": sum(1 for s in statuses if s >= 500), "seconds": wall,
+        "throughput": len(latencies) / wall if wall > 0 else None,
+        "p50_ms": ms(50), "p95_ms": ms(95), "p99_ms": ms(99), "max_ms": latencies[-1] * 1000 if latencies else None,
+        "rss_before_mb": rss_before / 1024 / 1024 if rss_before is not None else None,
+        "rss_after_mb": current_rss() / 1024 / 1024 if target.measures_memory else None,
+        "rss_peak_mb": peak_rss() / 1024 / 1024 if target.measures_memory else None,
+    }
+
+def prepare_synthetic(rows, layouts):
+    """Gera (ou reaproveita) as planilhas e monta uma pasta de dados temporária só com elas."""
+    from benchmarks.synthetic import write_workbook
+    data_dir = tempfile.mkdtemp(prefix='load_test_data_')
+    for layout in layouts:
+        path = write_workbook(layout, rows, SYNTHETIC_DIR)
+        shutil.copy2(path, os.path.join(data_dir, os.path.basename(path)))
+    return data_dir
+
+def _parse_config(items):
+    config = {}
+    for item in items or []:
+        key, _, value = item.partition('=')
+        try:
+            config[key] = json.loads(value)
+        except json.JSONDecodeError:
+            config[key] = value
+    return config
+
+def compare(results, baseline_path, tolerance):
+    """Regressões de p95 acima de baseline * (1 + tolerance), e rotas que passaram a ter erros."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {r["route"]: r for r in json.load(f)["routes"]}
+    regressions = []
+    for r in results:
+        base = baseline.get(r["route"])
+        if not base:
+            continue
+        if base["p95_ms"] and r["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{r['route']}: p95 {base['p95_ms']:.1f} ms -> {r['p95_ms']:.1f} ms")
+        if r["errors"] > base["errors"]:
+            regressions.append(f"{r['route']}: erros {base['errors']} -> {r['errors']}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--routes', nargs='+', choices=list(ROUTES), default=list(DEFAULT_ROUTES))
+    parser.add_argument('--requests', type=int, default=200, help="Requisições por rota.")
+    parser.add_argument('--concurrency', type=int, default=4, help="Requisições simultâneas.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--synthetic', type=int, metavar='LINHAS', help="Usa planilhas sintéticas com LINHAS ativos por layout.")
+    parser.add_argument('--layouts', nargs='+', default=['bancario', 'privado', 'debentures', 'titulos'])
+    parser.add_argument('--config', action='append', metavar='CHAVE=VALOR', help="Configuração extra do create_app (valor em JSON).")
+    parser.add_argument('--url', help="Mede um servidor já rodando nesta URL, em vez do test client.")
+    parser.add_argument('--no-warmup', action='store_true', help="Não carrega os relatórios antes de medir.")
+    parser.add_argument('--json', dest='json_path', help="Grava os resultados neste arquivo JSON.")
+    parser.add_argument('--baseline', help="JSON de uma execução anterior para detectar regressões.")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Piora de p95 tolerada sobre a baseline (0.25 = 25%%).")
+    args = parser.parse_args(argv)
+
+    temp_dirs = []
+    if args.synthetic:
+        # Definidos antes de importar 'app': pastas de dados e cache só deste teste.
+        os.environ['REPORTS_DATA_DIR'] = prepare_synthetic(args.synthetic, args.layouts)
+        os.environ['REPORTS_CACHE_DIR'] = tempfile.mkdtemp(prefix='load_test_cache_')
+        temp_dirs += [os.environ['REPORTS_DATA_DIR'], os.environ['REPORTS_CACHE_DIR']]
+
+    from app import create_app
+    from app.data_manager import get_filter_options, list_data_files
+
+    config = {'HISTORY_ENABLED': False, 'DATA_WATCH': False, **_parse_config(args.config)}
+    app = create_app(config)
+    logging.getLogger('app').setLevel(logging.WARNING)
+    warnings.filterwarnings('ignore')
+
+    try:
+        with app.app_context():
+            reports = list_data_files()
+            if not reports:
+                print("Nenhuma planilha para testar (use --synthetic ou adicione arquivos em data/).", file=sys.stderr)
+                return 2
+            started = time.perf_counter()
+            options = get_filter_options()
+            print(f"{len(reports)} relatórios; opções de filtro carregadas em {time.perf_counter() - started:.2f}s.")
+
+        target = HttpTarget(args.url) if args.url else TestClientTarget(app)
+        if not args.no_warmup:
+            for report in reports:
+                target.get('/', {'report': report})
+
+        rng = random.Random(args.seed)
+        print(f"\n{'rota':<10}{'req':>6}{'erros':>7}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'RSS MB':>9}{'pico MB':>9}")
+        results = []
+        for route in args.routes:
+            queries = [random_query(rng, reports, options, route) for _ in range(args.requests)]
+            r = run_route(target, route, queries, args.concurrency)
+            results.append(r)
+            mem = (f"{r['rss_after_mb']:>9.0f}{r['rss_peak_mb']:>9.0f}" if r['rss_after_mb'] is not None
+                   else f"{'-':>9}{'-':>9}")
+            print(f"{route:<10}{r['requests']:>6}{r['errors']:>7}{r['throughput']:>9.1f}"
+                  f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}{mem}")
+    finally:
+        for directory in temp_dirs:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({"config": config, "synthetic": args.synthetic, "seed": args.seed, "routes": results}, f, indent=2)
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        if regressions:
+            print("\nREGRESSÕES:")
+            for line in regressions:
+                print(f" - {line}")
+            return 1
+        print("\nOK: nenhuma regressão acima da tolerância.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Benchmark de inicialização: mede, com `python -X importtime`, o custo de
+importar o pacote 'app' e criar a aplicação Flask, e falha (código de saída 1)
+se o orçamento de tempo for estourado ou se alguma dependência pesada for
+carregada antes da hora.
+
+O orçamento é o acréscimo sobre uma linha de base medida na mesma máquina (a
+importação só das dependências obrigatórias do cenário, como o Flask), e não um
+tempo absoluto: assim ele não depende da velocidade do disco ou da CPU. Se as
+próprias medições da linha de base variarem demais (máquina ocupada), a
+comparação não é feita. tests/test_startup.py executa as mesmas verificações.
+
+Uso:
+    python benchmarks/startup_importtime.py [--budget-ms N] [--runs 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cenários medidos: código executado em um interpretador novo, código da linha
+# de base, acréscimo permitido sobre ela (ms) e módulos que não podem ser
+# carregados nesse ponto. Hoje os acréscimos medidos ficam em torno de 10 ms
+# (create_app) e 50 ms (scraping_service); os orçamentos deixam folga para ruído.
+SCENARIOS = {
+    "create_app": (
+        "import app; app.create_app()",
+        "import flask",
+        75,
+        ["pandas", "numpy", "fpdf", "openpyxl", "playwright", "bs4"],
+    ),
+    "scraping_service": (
+        # O scraper usa pandas para ler a planilha, mas não deve abrir o navegador nem o parser HTML.
+        "import app.services.scraping_service",
+        "import flask, pandas",
+        200,
+        ["playwright", "bs4", "fpdf"],
+    ),
+}
+
+# Razão máxima entre a maior e a menor medição da linha de base; acima disso o
+# ambiente está ruidoso demais para comparar tempos.
+MAX_BASELINE_SPREAD = 1.5
+
+def parse_importtime(stderr):
+    """Converte a saída de -X importtime em uma lista (módulo, self_us, cumulativo_us, nível)."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        level = (len(name) - len(name.lstrip(" "))) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), level))
+    return rows
+
+def measure(code):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    rows = parse_importtime(result.stderr)
+    # Soma apenas as importações de primeiro nível disparadas pelo código medido.
+    total_us = sum(cumulative for _, _, cumulative, level in rows if level == 0)
+    return total_us, rows
+
+def sample(code, runs):
+    """Executa `code` `runs` vezes; retorna os totais em ms (ordenados) e as linhas da última execução."""
+    samples = []
+    rows = []
+    for _ in range(runs):
+        total_us, rows = measure(code)
+        samples.append(total_us / 1000)
+    return sorted(samples), rows
+
+def median(samples):
+    return samples[len(samples) // 2]
+
+def eager_imports(rows, forbidden):
+    """Dependências de `forbidden` que aparecem na saída de -X importtime."""
+    loaded = {name.split(".")[0] for name, *_ in rows}
+    return sorted(loaded.intersection(forbidden))
+
+def check_scenario(scenario, runs, budget_ms=None):
+    """
+    Mede um cenário e sua linha de base. Retorna um dicionário com as medianas,
+    o acréscimo, o orçamento, se a linha de base foi ruidosa demais
+    ('ruidoso') e as dependências pesadas carregadas antes da hora.
+    """
+    code, baseline_code, default_budget_ms, forbidden = SCENARIOS[scenario]
+    baseline, _ = sample(baseline_code, runs)
+    samples, rows = sample(code, runs)
+    overhead_ms = median(samples) - median(baseline)
+    return {
+        "mediana_ms": median(samples),
+        "linha_de_base_ms": median(baseline),
+        "acrescimo_ms": overhead_ms,
+        "orcamento_ms": default_budget_ms if budget_ms is None else budget_ms,
+        "ruidoso": baseline[-1] > baseline[0] * MAX_BASELINE_SPREAD,
+        "antecipadas": eager_imports(rows, forbidden),
+        "rows": rows,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=None, help="Substitui o acréscimo permitido (mediana, em ms) de todos os cenários.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="Quantos módulos mais lentos exibir.")
+    args = parser.parse_args(argv)
+
+    failures = []
+    for scenario in SCENARIOS:
+        result = check_scenario(scenario, args.runs, args.budget_ms)
+        print(f"\n== {scenario}: mediana {result['mediana_ms']:.1f} ms, linha de base {result['linha_de_base_ms']:.1f} ms, "
+              f"acréscimo {result['acrescimo_ms']:.1f} ms (orçamento {result['orcamento_ms']:.0f} ms, {args.runs} execuções)")
+        for name, self_us, cumulative_us, _ in sorted(result['rows'], key=lambda r: r[1], reverse=True)[:args.top]:
+            print(f"   {self_us / 1000:8.1f} ms self  {cumulative_us / 1000:8.1f} ms cumul.  {name}")
+
+        if result['ruidoso']:
+            print("   aviso: medições da linha de base variaram demais; tempo não comparado.")
+        elif result['acrescimo_ms'] > result['orcamento_ms']:
+            failures.append(f"{scenario}: acréscimo de {result['acrescimo_ms']:.1f} ms > {result['orcamento_ms']:.0f} ms")
+        if result['antecipadas']:
+            failures.append(f"{scenario}: dependências pesadas importadas na inicialização: {', '.join(result['antecipadas'])}")
+
+    if failures:
+        print("\nFALHA:")
+        for failure in failures:
+            print(f" - {failure}")
+        return 1
+    print("\nOK: inicialização dentro do orçamento.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
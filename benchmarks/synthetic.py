@@ -0,0 +1,151 @@
+"""
+Geradores de planilhas sintéticas que reproduzem o layout de cada relatório
+suportado pelo data_processor (linhas em branco no topo, colunas vazias à
+esquerda, cabeçalho na posição original e os mesmos formatos de texto).
+
+    from benchmarks.synthetic import write_workbook
+    path = write_workbook('bancario', 10_000, '/tmp/bench')
+"""
+import os
+import random
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+LAYOUTS = ('bancario', 'privado', 'debentures', 'compromissadas', 'titulos')
+
+_BASE_DATE = datetime(2025, 9, 5)
+
+# Nomes escolhidos para não conter palavras-chave de outros layouts (ex.: 'lca', 'cdb'),
+# assim a seleção de processador é a mesma dos arquivos reais.
+_BANKS = ['Banco BTG Pactual', 'BANCO MASTER S/A', 'Banco Voiter', 'Banco Digimais', 'Banco Pine', 'Banco BMG',
+          'Banco Daycoval', 'Banco Agibank', 'Banco Caixa Geral', 'Will Bank CFI', 'Andbank', 'Banco Rodobens']
+_PRIVATE_ISSUERS = ['ACP BIOENERGIA', 'BANCO PAN', "REDE D'OR", 'BTG', 'RAIZEN', 'SAO MARTINHO', 'MINERVA', 'JBS', 'VAMOS']
+_DEBENTURE_ISSUERS = ['BRAVA ENERGIA S.A.', 'ENEVA S.A.', 'RAIZEN ENERGIA S.A', 'SENDAS DISTRIBUIDORA S/A',
+                      'RUMO S.A.', 'EQUATORIAL S.A.', 'VALE S.A.', 'IGUATEMI S.A.']
+_TREASURIES = [('Tesouro Selic (LFT)', 'SELIC', 'SELIC {sign} {x:.2f}%'),
+               ('Tesouro Prefixado (LTN)', 'PRÉ', '{x:.2f}% a.a.'),
+               ('Tesouro IPCA+ (NTN-B Principal)', 'IPCA', 'IPCA + {x:.2f}%')]
+
+def _br(value):
+    """Formata um número com vírgula decimal, como nas planilhas originais."""
+    return f"{value:.2f}".replace('.', ',')
+
+def _rate(rng):
+    kind = rng.random()
+    if kind < 0.4:
+        return 'PÓS-FIXADO', f"{_br(rng.uniform(90, 125))}% CDI"
+    if kind < 0.75:
+        return 'PRÉ-FIXADO', f"{_br(rng.uniform(10, 19))}% a.a."
+    return 'PRÉ-FIXADA-ÍNDICE', f"IPCA+ {_br(rng.uniform(5, 10))}% a.a."
+
+def _maturity(rng):
+    return _BASE_DATE + timedelta(days=rng.randint(3, 365 * 10))
+
+def _grid(header, rows, top_blank_rows, left_blank_cols, data_shift=0):
+    """
+    Monta a grade bruta da planilha: linhas vazias no topo, colunas vazias à
+    esquerda e, opcionalmente, os dados deslocados `data_shift` colunas à
+    direita do cabeçalho (caso dos Títulos Públicos).
+    """
+    width = left_blank_cols + len(header) + data_shift
+    blank = [None] * width
+    grid = [list(blank) for _ in range(top_blank_rows)]
+    grid.append([None] * left_blank_cols + list(header) + [None] * data_shift)
+    for row in rows:
+        if row is None:
+            grid.append(list(blank))
+        else:
+            padded = [None] * (left_blank_cols + data_shift) + list(row)
+            grid.append(padded + [None] * (width - len(padded)))
+    return pd.DataFrame(grid)
+
+def make_bancario(n, rng):
+    """Crédito Bancário: cada ativo ocupa uma linha de produto, uma linha com a data e uma linha vazia."""
+    header = ['Risco', None, 'Produto', 'Prazo/Vencimento\xa0', 'Taxa', 'Taxa Eq. CDB', 'Juros',
+              'Estoque Disponível', 'Aplicação Mínima', 'Roa']
+    rows = []
+    for _ in range(n):
+        product = rng.choice(['CDB', 'CDB', 'CDB', 'LCA', 'LCI', 'LF'])
+        indexer, rate = _rate(rng)
+        liquidity = rng.choice(['No vencimento S', 'No vencimento S', 'No vencimento', 'Diária', 'Diária Carência 90d'])
+        maturity = _maturity(rng)
+        days = (maturity - _BASE_DATE).days
+        rows.append([None, None, f"{product} - {indexer}{rng.choice(_BANKS)}{liquidity}", f"{days} dias", rate, rate,
+                     'No vencimento', round(rng.uniform(1e3, 5e6), 2), round(rng.uniform(500, 50000), 2),
+                     round(rng.uniform(0.0002, 0.02), 6)])
+        rows.append([None, None, None, maturity] + [None] * 6)
+        rows.append(None)
+    return _grid(header, rows, top_blank_rows=1, left_blank_cols=1)
+
+def make_privado(n, rng):
+    header = ['Risco', None, 'Produto e Ativo', 'Vencimento', 'Rentabilidade Anual', 'IR', 'Horário Limite',
+              'Juros', 'Amortizacão', 'Aplicação Mínima', 'Roa']
+    rows = []
+    for i in range(n):
+        kind = rng.choice(['CRA', 'CRI'])
+        code = f"{kind}0{rng.randint(2200000, 2599999)}{i % 100:02d}"
+        rate = rng.choice([f"{_br(rng.uniform(88, 110))}% do CDI", f"IPCA + {_br(rng.uniform(5, 9))}%",
+                           f"CDI + {_br(rng.uniform(0.3, 3))}%", f"{_br(rng.uniform(11, 16))}% a.a."])
+        rows.append([None, None, f"{kind} - {rng.choice(_PRIVATE_ISSUERS)}{code}", _maturity(rng), rate, 'Isento',
+                     '16:00:00', rng.choice(['Semestral', 'Mensal', 'No vencimento']), 'No vencimento',
+                     round(rng.uniform(1000, 1500), 2), round(rng.uniform(0.001, 0.04), 4)])
+    return _grid(header, rows, top_blank_rows=1, left_blank_cols=1)
+
+def make_debentures(n, rng):
+    header = ['Risco', None, 'Ativo', 'Vencimento', 'Rentabilidade Anual', 'IR', 'Horário Limite', 'Juros',
+              'Amortizacão', 'Aplicação Mínima', 'Roa']
+    rows = []
+    for i in range(n):
+        issuer = rng.choice(_DEBENTURE_ISSUERS)
+        ticker = ''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(4)) + f"{i % 100:02d}"
+        rate = rng.choice([f"IPCA + {_br(rng.uniform(5, 9))}%", f"CDI + {_br(rng.uniform(0.3, 2))}%"])
+        rows.append([None, None, f"{issuer}{ticker}", _maturity(rng), rate, rng.choice(['Isento', 'Não isento']),
+                     '16:00:00', 'Semestral', 'No vencimento', round(rng.uniform(1000, 1300), 2),
+                     round(rng.uniform(0.005, 0.05), 4)])
+    return _grid(header, rows, top_blank_rows=2, left_blank_cols=2)
+
+def make_compromissadas(n, rng):
+    header = ['Risco', 'Produto', 'Vencimento', 'Rentabilidade Anual', 'IR', 'Horário Limite', 'Aplicação Mínima']
+    variants = [('COMPROMISSADA ISENTA DE IOF E IR', 'Isento'), ('COMPROMISSADA ISENTA DE IOF', 'Não Isento'),
+                ('COMPROMISSADA COM CARÊNCIA DE 30 DIAS ISENTA DE IOF E IR', 'Isento')]
+    rows = []
+    for _ in range(n):
+        name, ir = rng.choice(variants)
+        rows.append([None, f"{name}BANCO BTG PACTUAL S/A", _maturity(rng), f"{_br(rng.uniform(70, 95))}% do CDI", ir,
+                     '17:30:00', rng.choice([200000, 1000000, 1069000, 30000000])])
+    return _grid(header, rows, top_blank_rows=2, left_blank_cols=1)
+
+def make_titulos(n, rng):
+    """Títulos Públicos: o cabeçalho começa duas colunas à esquerda dos dados (colunas desalinhadas)."""
+    header = ['Produto', 'Vencimento', 'Rentabilidade Anual', 'Indexador', 'Preço unitário', 'Horário Limite']
+    rows = []
+    for _ in range(n):
+        name, indexer, template = rng.choice(_TREASURIES)
+        x = rng.uniform(0, 0.1) if indexer == 'SELIC' else rng.uniform(5, 14)
+        rate = template.format(sign=rng.choice('+-'), x=x).replace('.', ',')
+        rows.append([name, _maturity(rng), rate, indexer, round(rng.uniform(500, 17500), 2), '15:30:00'])
+    return _grid(header, rows, top_blank_rows=1, left_blank_cols=1, data_shift=2)
+
+GENERATORS = {
+    'bancario': make_bancario,
+    'privado': make_privado,
+    'debentures': make_debentures,
+    'compromissadas': make_compromissadas,
+    'titulos': make_titulos,
+}
+
+def make_layout(layout, n, seed=0):
+    """Gera a grade bruta (sem cabeçalho pandas) com `n` ativos no layout informado."""
+    return GENERATORS[layout](n, random.Random(f"{layout}-{n}-{seed}"))
+
+def write_workbook(layout, n, directory, seed=0):
+    """
+    Grava a planilha sintética em `directory` e retorna o caminho. Se o arquivo
+    já existir, ele é reaproveitado (gerar 100k linhas com openpyxl é lento).
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{layout}_{n}_{seed}.xlsx")
+    if not os.path.exists(path):
+        make_layout(layout, n, seed).to_excel(path, header=False, index=False)
+    return path
@@ -1,6 +1,9 @@
 from app import create_app
 
-app = create_app()
+# Os pools 'spawn' (pré-carregamento, PDFs em lote, uploads) reimportam este
+# módulo como '__mp_main__' em cada processo auxiliar; eles não sobem a aplicação.
+if __name__ != '__mp_main__':
+    app = create_app()
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
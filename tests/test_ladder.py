@@ -0,0 +1,17 @@
+import pytest
+
+from app.routes import _parse_amount
+
+@pytest.mark.parametrize("text, expected", [
+    ("250000", 250000.0),
+    ("250.000,00", 250000.0),
+    ("R$ 1.500,50", 1500.5),
+    ("250000.5", 250000.5),
+])
+def test_parse_amount(text, expected):
+    assert _parse_amount(text) == expected
+
+@pytest.mark.parametrize("text", ["", "abc", "inf", "-inf", "nan", "0", "-5", "1e400"])
+def test_parse_amount_rejects_non_positive_or_non_finite(text):
+    with pytest.raises(ValueError):
+        _parse_amount(text)
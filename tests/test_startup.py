@@ -0,0 +1,32 @@
+"""
+Orçamento de inicialização (benchmarks/startup_importtime.py) como testes.
+
+A verificação das dependências pesadas é determinística e sempre roda. A de
+tempo compara o acréscimo sobre a linha de base medida na própria máquina e é
+pulada quando essas medições variam demais (máquina ocupada) ou com
+STARTUP_TIMING=0.
+"""
+import os
+
+import pytest
+
+from benchmarks import startup_importtime as startup
+
+RUNS = 5
+
+@pytest.mark.parametrize("scenario", sorted(startup.SCENARIOS))
+def test_heavy_dependencies_load_lazily(scenario):
+    code, _, _, forbidden = startup.SCENARIOS[scenario]
+    _, rows = startup.measure(code)
+    assert startup.eager_imports(rows, forbidden) == []
+
+@pytest.mark.skipif(os.environ.get('STARTUP_TIMING', '1') == '0', reason="STARTUP_TIMING=0")
+@pytest.mark.parametrize("scenario", sorted(startup.SCENARIOS))
+def test_startup_within_budget(scenario):
+    result = startup.check_scenario(scenario, RUNS)
+    if result['ruidoso']:
+        pytest.skip("medições da linha de base variaram demais; ambiente ruidoso para medir tempo")
+    assert result['acrescimo_ms'] <= result['orcamento_ms'], (
+        f"{scenario}: acréscimo de {result['acrescimo_ms']:.1f} ms sobre a linha de base "
+        f"({result['linha_de_base_ms']:.1f} ms) passa do orçamento de {result['orcamento_ms']:.0f} ms"
+    )